@@ -1,9 +1,7 @@
 import streamlit as st
 from authlib.integrations.requests_client import OAuth2Session
-import requests
-import gspread
-import pandas as pd
-from google.oauth2.service_account import Credentials
+from identity import resolve_identity
+from sheets import get_users_directory
 
 # Auto-redirect here if forced from logout
 if st.session_state.get("force_login"):
@@ -25,36 +23,17 @@ st.title("🔐 OIS Teacher Appraisal Login")
 # =========================
 # CONFIG
 # =========================
-SPREADSHEET_ID = "1kqcfnMx4KhqQvFljsTwSOcmuEHnkLAdwp_pUJypOjpY"
-SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
-
 CLIENT_ID = st.secrets["oauth"]["client_id"]
 CLIENT_SECRET = st.secrets["oauth"]["client_secret"]
 REDIRECT_URI = st.secrets["oauth"]["redirect_uri"]
 
 AUTHORIZE_URL = "https://accounts.google.com/o/oauth2/v2/auth"
 TOKEN_URL = "https://oauth2.googleapis.com/token"
-USERINFO_ENDPOINT = "https://openidconnect.googleapis.com/v1/userinfo"
 
 # =========================
-# Google Sheets: load Users
+# Google Sheets: Users directory (shared, cached per process)
 # =========================
-def get_users_df():
-    """Load Users sheet for login; normalise Email (and Campus if present)."""
-    creds = Credentials.from_service_account_info(st.secrets["google"], scopes=SCOPES)
-    client = gspread.authorize(creds)
-    ws = client.open_by_key(SPREADSHEET_ID).worksheet("Users")
-    df = pd.DataFrame(ws.get_all_records())
-
-    if not df.empty:
-        if "Email" in df.columns:
-            df["Email"] = df["Email"].astype(str).str.strip().str.lower()
-        if "Campus" in df.columns:
-            df["Campus"] = df["Campus"].astype(str).str.strip()
-
-    return df
-
-users_df = get_users_df()
+users_directory = get_users_directory()
 
 
 # =========================
@@ -72,20 +51,18 @@ oauth = OAuth2Session(
 # =========================
 if "token" in st.session_state and st.session_state["token"]:
     token = st.session_state["token"]
-    resp = requests.get(USERINFO_ENDPOINT, headers={"Authorization": f"Bearer {token['access_token']}"})
-    if resp.status_code == 200:
-        user_info = resp.json()
-        email = user_info["email"].lower()
+    # Cached per token; verifies the ID token locally before falling back to userinfo
+    user_info = resolve_identity(token, CLIENT_ID)
+    if user_info is not None:
+        email = user_info["email"]
 
-        # 🔄 Always reload Users sheet fresh
-        users_df = get_users_df()
-        match = users_df[users_df["Email"].str.lower() == email]
+        # Unknown emails trigger a fresh reload inside the directory
+        row = users_directory.lookup(email)
 
-        if match.empty:
+        if row is None:
             st.error("❌ Your email is not registered in the OIS Users sheet.")
             st.stop()
 
-        row = match.iloc[0]
         role = str(row.get("Role", "user")).lower().strip()
         name = row.get("Name", email)
         campus = str(row.get("Campus", "")).strip()
@@ -0,0 +1,115 @@
+# autosave.py
+# Local append-only journal for self-assessment draft edits, flushed to the Drafts sheet in the background.
+
+import logging
+import sqlite3
+import threading
+import time
+
+from mirror import connect_private
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL_SECONDS = 20
+TICK_SECONDS = 1.0
+
+class DraftJournal:
+    """
+    SQLite (WAL) journal of field edits. Recording an edit is a local insert,
+    so widget callbacks never wait on Google Sheets.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = connect_private(path)   # teachers' unsubmitted drafts
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS draft_changes ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " email TEXT NOT NULL, field TEXT NOT NULL, value TEXT NOT NULL, ts REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_draft_changes_email ON draft_changes(email, id)")
+
+    def record(self, email, field, value):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO draft_changes (email, field, value, ts) VALUES (?, ?, ?, ?)",
+                (email, field, "" if value is None else str(value), time.time()),
+            )
+
+    def dirty_emails(self):
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT DISTINCT email FROM draft_changes")]
+
+    def pending(self, email):
+        """(latest value per field, highest journal id) for edits not yet flushed."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, field, value FROM draft_changes WHERE email = ? ORDER BY id", (email,)
+            ).fetchall()
+        changes = {field: value for _, field, value in rows}
+        return changes, (rows[-1][0] if rows else 0)
+
+    def mark_flushed(self, email, up_to_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM draft_changes WHERE email = ? AND id <= ?", (email, up_to_id))
+
+class DraftAutosaver:
+    """
+    Coalesces journalled edits and writes each teacher's draft row at most
+    once every `interval` seconds from a daemon thread.
+    """
+
+    def __init__(self, journal, store, interval=FLUSH_INTERVAL_SECONDS):
+        self.journal = journal
+        self._store = store
+        self._interval = interval
+        self._flush_lock = threading.Lock()
+        self._last_flush = {}
+        # email -> (store generation, last payload written), so flushes don't need a read;
+        # any other load or save of that draft bumps the generation and retires the copy
+        self._base = {}
+        self._thread = threading.Thread(target=self._run, name="draft-autosave", daemon=True)
+        self._thread.start()
+
+    def record(self, email, field, value):
+        self.journal.record(email, field, value)
+
+    def pending(self, email):
+        return self.journal.pending(email)[0]
+
+    def flush(self, email):
+        with self._flush_lock:
+            changes, up_to_id = self.journal.pending(email)
+            if not changes:
+                return False
+            cached = self._base.get(email)
+            if cached is not None and cached[0] == self._store.generation(email):
+                base = cached[1]
+            else:
+                base = {k: v for k, v in self._store.load(email).items() if k != "Email"}
+            payload = {**base, **changes}
+            self._store.save(email, payload)
+            self.journal.mark_flushed(email, up_to_id)
+            self._base[email] = (self._store.generation(email), payload)
+            self._last_flush[email] = time.monotonic()
+            return True
+
+    def _run(self):
+        while True:
+            time.sleep(TICK_SECONDS)
+            now = time.monotonic()
+            try:
+                emails = self.journal.dirty_emails()
+            except sqlite3.Error:
+                logger.exception("Draft journal unreadable")
+                continue
+            for email in emails:
+                if now - self._last_flush.get(email, 0.0) < self._interval:
+                    continue
+                try:
+                    self.flush(email)
+                except Exception:
+                    # Edits stay in the journal and are retried on the next tick.
+                    logger.exception("Draft autosave flush failed for %s", email)
+                    self._last_flush[email] = now
@@ -0,0 +1,2 @@
+# benchmarks
+# Synthetic data generator and timing harness; run from the repo root with `python -m benchmarks.run`.
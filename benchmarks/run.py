@@ -0,0 +1,208 @@
+# benchmarks/run.py
+# Times the app's hot paths on a synthetic campus and writes JSON results.
+#
+#   python -m benchmarks.run --teachers 600 --repeat 7 --output bench_output.txt
+#   python -m benchmarks.run --only responses_parse,teacher_summary
+
+import argparse
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from io import StringIO
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_campus, seed_spreadsheet
+from comparison import teacher_comparison
+from comparison_html import render_comparison_html, write_campus_comparison_html
+from final_eval import FINAL_EVAL_HEADERS, build_final_eval_df, build_final_eval_states
+from grid import grid_columns, grid_page, grid_rows, highlight_ratings
+from letters import final_evaluation_letter_record, generate_final_evaluation_docx
+from mirror import MirrorSync, SheetMirror
+from pdf_reports import final_evaluation_pdf
+from responses import build_responses_index
+from rubric import DOMAINS
+from sheets import build_users_df
+from storage import LocalSpreadsheet
+from summary import build_teacher_summary
+from users_index import UsersIndex
+
+GRID_PAGE_SIZE = 50
+
+def measure(fn, repeat, warmup=1):
+    """Seconds per call for `repeat` timed calls, after `warmup` untimed ones."""
+    for _ in range(warmup):
+        fn()
+    gc.collect()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+class Fixture:
+    """Parsed campus shared by the benchmarks; parsing itself is measured separately."""
+
+    def __init__(self, campus):
+        self.campus = campus
+        self.index = build_responses_index(campus["Responses"])
+        header, *rows = campus["Users"]
+        self.users_df = build_users_df({h: [r[i] for r in rows] for i, h in enumerate(header)})
+        self.users_index = UsersIndex(self.users_df)
+        self.teachers = self.users_index.frame(self.users_index.with_role("user"))
+        self.emails = self.teachers["Email"].tolist()
+        self.final_eval_df = build_final_eval_df(campus["FinalEvaluation"], list(FINAL_EVAL_HEADERS))
+        self.states = build_final_eval_states(self.final_eval_df)
+        signed = [e for e, s in self.states.items() if s.teacher_signed_off] or list(self.states)
+        self.letter = final_evaluation_letter_record(self.states[signed[0]].record, "Synthetic Teacher", "appraiser")
+
+    def comparisons(self):
+        for name, email in zip(self.teachers["Name"], self.emails):
+            if self.index.has(email):
+                yield (
+                    name, email, "", "", "",
+                    teacher_comparison(self.index, email),
+                )
+
+# =========================
+# Benchmarks: name -> fn(fixture) returning the callable to time
+# =========================
+def bench_responses_parse(fx):
+    return lambda: build_responses_index(fx.campus["Responses"])
+
+def bench_final_eval_parse(fx):
+    return lambda: build_final_eval_states(build_final_eval_df(fx.campus["FinalEvaluation"], list(FINAL_EVAL_HEADERS)))
+
+def bench_users_index(fx):
+    return lambda: UsersIndex(fx.users_df)
+
+def bench_comparison_all_teachers(fx):
+    def run():
+        for email in fx.emails:
+            teacher_comparison(fx.index, email)
+    return run
+
+def bench_teacher_summary(fx):
+    return lambda: build_teacher_summary(fx.teachers, fx.index.df, fx.states)
+
+def bench_grid_page_style(fx):
+    def run():
+        labels = grid_rows(fx.index, fx.emails)
+        columns, rating_cols = grid_columns(DOMAINS)
+        page = grid_page(fx.index.df, labels, columns, rating_cols, 1, GRID_PAGE_SIZE)
+        page.style.map(highlight_ratings, subset=rating_cols).to_html()
+    return run
+
+def bench_comparison_html_one(fx):
+    _, email, *_, df = next(fx.comparisons())
+    return lambda: render_comparison_html(df)
+
+def bench_comparison_html_campus(fx):
+    return lambda: write_campus_comparison_html(fx.comparisons(), StringIO())
+
+def bench_final_eval_docx(fx):
+    return lambda: generate_final_evaluation_docx(fx.letter)
+
+def bench_final_eval_pdf(fx):
+    return lambda: final_evaluation_pdf(fx.letter)
+
+def bench_mirror_full_sync(fx):
+    spreadsheet = seed_spreadsheet(LocalSpreadsheet(), fx.campus)
+    def run():
+        sync = MirrorSync(SheetMirror(":memory:"), {"Responses": spreadsheet.worksheet("Responses")}, call=_direct)
+        sync.sync("Responses")
+    return run
+
+def bench_mirror_tail_sync(fx):
+    spreadsheet = seed_spreadsheet(LocalSpreadsheet(), fx.campus)
+    sync = MirrorSync(
+        SheetMirror(":memory:"), {"Responses": spreadsheet.worksheet("Responses")},
+        call=_direct, append_only={"Responses"},
+    )
+    sync.sync("Responses")
+    return lambda: sync.sync("Responses")
+
+def _direct(fn, *args, **kwargs):
+    return fn(*args, **kwargs)
+
+BENCHMARKS = {
+    name[len("bench_"):]: fn for name, fn in sorted(globals().items()) if name.startswith("bench_")
+}
+
+# =========================
+# CLI
+# =========================
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run(params, names, repeat):
+    campus = generate_campus(**params)
+    fixture = Fixture(campus)
+    results = []
+    for name in names:
+        samples = measure(BENCHMARKS[name](fixture), repeat)
+        results.append({
+            "benchmark": name,
+            "repeat": repeat,
+            "min_ms": round(min(samples) * 1000, 3),
+            "median_ms": round(statistics.median(samples) * 1000, 3),
+            "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+            "max_ms": round(max(samples) * 1000, 3),
+        })
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "params": params,
+            "rows": {title: len(values) - 1 for title, values in campus.items()},
+        },
+        "results": results,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the appraisal app's hot paths on synthetic data.")
+    parser.add_argument("--teachers", type=int, default=300)
+    parser.add_argument("--appraisers", type=int, default=15)
+    parser.add_argument("--campuses", type=int, default=2)
+    parser.add_argument("--submissions", type=int, default=2, help="max submissions per teacher per cycle")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="comma-separated benchmark names (default: all)")
+    parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    parser.add_argument("--output", default="-", help="JSON output file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    params = {
+        "teachers": args.teachers, "appraisers": args.appraisers, "campuses": args.campuses,
+        "submissions_per_cycle": args.submissions, "seed": args.seed,
+    }
+    report = json.dumps(run(params, names, args.repeat), indent=2)
+    if args.output == "-":
+        print(report)
+    else:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(report + "\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+# benchmarks/synthetic.py
+# Deterministic synthetic campus: Users, Responses and FinalEvaluation in get_all_values() shape.
+#
+#   python -m benchmarks.synthetic --path .local_sheets/sheets.sqlite3 --teachers 300
+# seeds a LocalSpreadsheet so the app can run with SHEETS_BACKEND=local.
+
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from final_eval import FINAL_EVAL_HEADERS, final_eval_domain_rows
+from rubric import DOMAINS, RATINGS, response_headers
+
+USERS_HEADER = ["Email", "Name", "Appraiser", "Role", "Password", "Campus"]
+CYCLES = ["Initial", "Final"]
+
+FIRST_NAMES = [
+    "Aarav", "Priya", "Rohan", "Ananya", "Vikram", "Meera", "Arjun", "Kavya", "Ishaan", "Diya",
+    "Sarah", "James", "Maria", "David", "Emma", "Lucas", "Chloe", "Noah", "Fatima", "Omar",
+]
+LAST_NAMES = [
+    "Sharma", "Iyer", "Patel", "Reddy", "Nair", "Kapoor", "Menon", "Das", "Rao", "Gupta",
+    "Smith", "Garcia", "Müller", "Rossi", "Dubois", "Tanaka", "O'Brien", "Silva", "Kim", "Haddad",
+]
+# Rating mix skewed the way real self-assessments are
+RATING_WEIGHTS = [0.25, 0.5, 0.2, 0.05]
+WORDS = (
+    "students learning feedback planning unit goals assessment classroom routines differentiation "
+    "families collaboration reflection growth evidence rubric inquiry support expectations data"
+).split()
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def _stamp(dt):
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+def generate_campus(teachers=200, appraisers=12, campuses=2, submissions_per_cycle=2,
+                    completion=0.85, enable_reflections=True, seed=7):
+    """
+    {"Users": rows, "Responses": rows, "FinalEvaluation": rows}, header first.
+    Each teacher gets up to `submissions_per_cycle` submissions per cycle (re-submissions),
+    with `completion` the share of teachers who submitted at all. Same seed, same data.
+    """
+    rng = random.Random(seed)
+    campus_names = [f"Campus {i + 1}" for i in range(campuses)]
+
+    users = [USERS_HEADER]
+    appraiser_names = []
+    for i in range(appraisers):
+        first = f"{FIRST_NAMES[i % len(FIRST_NAMES)]}{'' if i < len(FIRST_NAMES) else i}"
+        name = f"{first} {rng.choice(LAST_NAMES)}"
+        appraiser_names.append((first.lower(), name))
+        users.append([f"appraiser{i:03d}@ois.example", name, "", "admin", "pw", campus_names[i % campuses]])
+    for c, campus in enumerate(campus_names):
+        users.append([f"head{c:02d}@ois.example", f"Head {campus}", "", "sadmin", "pw", campus])
+
+    teacher_rows = []
+    for i in range(teachers):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        campus = campus_names[i % campuses]
+        pool = [a for j, a in enumerate(appraiser_names) if j % campuses == i % campuses] or appraiser_names
+        chosen = rng.sample(pool, k=2 if rng.random() < 0.1 and len(pool) > 1 else 1)
+        teacher = {
+            "Email": f"teacher{i:04d}@ois.example", "Name": name,
+            "Appraiser": ", ".join(a[0] for a in chosen), "Campus": campus,
+        }
+        teacher_rows.append(teacher)
+        users.append([teacher["Email"], name, teacher["Appraiser"], "user", "pw", campus])
+
+    header = response_headers(enable_reflections)
+    responses = [header]
+    start = {"Initial": datetime(2025, 9, 1, 8), "Final": datetime(2026, 4, 1, 8)}
+    submitted_final = []
+    for teacher in teacher_rows:
+        if rng.random() > completion:
+            continue
+        for cycle in CYCLES:
+            if cycle == "Final" and rng.random() > completion:
+                continue
+            when = start[cycle] + timedelta(minutes=rng.randrange(0, 60 * 24 * 20))
+            for _ in range(rng.randint(1, submissions_per_cycle)):
+                row = {
+                    "Timestamp": _stamp(when), "Email": teacher["Email"], "Name": teacher["Name"],
+                    "Appraiser": teacher["Appraiser"], "Assessment Cycle": cycle, "Last Edited On": "",
+                }
+                for domain, items in DOMAINS.items():
+                    for code, label in items:
+                        row[f"{code} {label}"] = rng.choices(RATINGS, weights=RATING_WEIGHTS)[0]
+                    if enable_reflections:
+                        row[f"{domain} Reflection"] = _sentence(rng, rng.randint(15, 60))
+                responses.append([row.get(h, "") for h in header])
+                when += timedelta(hours=rng.randint(1, 72))
+            if cycle == "Final":
+                submitted_final.append((teacher, when))
+
+    final_eval = [list(FINAL_EVAL_HEADERS)]
+    for teacher, when in submitted_final:
+        record = {h: "" for h in FINAL_EVAL_HEADERS}
+        stage = rng.random()
+        record.update({
+            "Timestamp": _stamp(when), "Last Edited On": _stamp(when),
+            "Teacher Email": teacher["Email"], "Teacher Name": teacher["Name"],
+            "Appraiser": teacher["Appraiser"], "Subject Area": rng.choice(["English", "Mathematics", "Science", "Design"]),
+            "Student Survey Feedback": _sentence(rng, 80), "Overall Reflection": _sentence(rng, 100),
+            "Teacher Submitted": "Yes", "Teacher Submitted On": _stamp(when),
+        })
+        if stage > 0.3:
+            done = when + timedelta(days=rng.randint(1, 10))
+            record.update({"Appraiser Started": "Yes", "Appraiser Completed": "Yes", "Appraiser Completed On": _stamp(done)})
+            for col_name, _ in final_eval_domain_rows():
+                record[col_name] = rng.choices(RATINGS, weights=RATING_WEIGHTS)[0]
+            record["Overall Rating"] = rng.choices(RATINGS, weights=RATING_WEIGHTS)[0]
+            record["Overall Comments"] = _sentence(rng, 90)
+        if stage > 0.5:
+            record.update({"Evaluator Sign Off": "Yes", "Evaluator Sign Off Date": record["Appraiser Completed On"]})
+        if stage > 0.7:
+            record.update({"Teacher Sign Off": "Yes", "Teacher Sign Off Date": record["Appraiser Completed On"]})
+        final_eval.append([record[h] for h in FINAL_EVAL_HEADERS])
+
+    return {"Users": users, "Responses": responses, "FinalEvaluation": final_eval}
+
+def seed_spreadsheet(spreadsheet, campus):
+    """Write a generated campus into a storage.LocalSpreadsheet (plus an empty Drafts sheet)."""
+    for title, values in campus.items():
+        spreadsheet.seed(title, values)
+    spreadsheet.seed("Drafts", [["Email"]])
+    return spreadsheet
+
+def main(argv=None):
+    from storage import LocalSpreadsheet
+
+    parser = argparse.ArgumentParser(description="Seed a local SQLite spreadsheet with a synthetic campus.")
+    parser.add_argument("--path", required=True, help="SQLite file for LocalSpreadsheet (LOCAL_SHEETS_PATH)")
+    parser.add_argument("--teachers", type=int, default=200)
+    parser.add_argument("--appraisers", type=int, default=12)
+    parser.add_argument("--campuses", type=int, default=2)
+    parser.add_argument("--submissions", type=int, default=2, help="max submissions per teacher per cycle")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+    campus = generate_campus(args.teachers, args.appraisers, args.campuses, args.submissions, seed=args.seed)
+    seed_spreadsheet(LocalSpreadsheet(args.path), campus)
+    print({title: len(values) - 1 for title, values in campus.items()})
+
+if __name__ == "__main__":
+    main()
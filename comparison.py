@@ -0,0 +1,44 @@
+# comparison.py
+# Initial vs Final comparison frame: fixed rubric columns plus vectorised ratings and trends.
+
+from functools import lru_cache
+
+import pandas as pd
+
+from descriptors import DESCRIPTORS
+from ratings import compare_codes
+from rubric import DOMAINS
+
+@lru_cache(maxsize=None)
+def comparison_base():
+    """Domain / Strand / Explanation columns of the comparison table – fixed by the rubric. Do not mutate."""
+    rows = []
+    for domain, items in DOMAINS.items():
+        for code, label in items:
+            strand = f"{code} {label}"
+            rows.append({
+                "Domain": domain.split(":")[0],
+                "Strand": strand,
+                "Explanation": DESCRIPTORS.get(strand, {}).get("HE", ""),
+            })
+    return pd.DataFrame(rows)
+
+def comparison_from_codes(initial_codes, final_codes, initial_text=None, final_text=None):
+    """
+    Comparison for one teacher from two rating-code rows (None = no submission in that cycle).
+    `initial_text`/`final_text` are the rows' non-rating cells (ResponsesIndex.latest_text),
+    shown as entered.
+    """
+    comparison_df = comparison_base().copy()
+    initial, final, trend = compare_codes(initial_codes, final_codes, initial_text, final_text)
+    comparison_df["Initial"] = initial
+    comparison_df["Final"] = final
+    comparison_df["Trend"] = trend
+    return comparison_df
+
+def teacher_comparison(index, email):
+    """comparison_from_codes for one teacher's newest Initial and Final submissions in a ResponsesIndex."""
+    return comparison_from_codes(
+        index.latest_codes(email, "Initial"), index.latest_codes(email, "Final"),
+        index.latest_text(email, "Initial"), index.latest_text(email, "Final"),
+    )
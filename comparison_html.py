@@ -0,0 +1,127 @@
+# comparison_html.py
+# Initial vs Final comparison as HTML, rendered from templates compiled once at import
+# and written through a sink (list.append / StringIO.write) so output grows linearly.
+
+from html import escape
+from io import StringIO
+
+from formatting import safe_text
+
+RATING_BG = {"HE": "#a8e6a1", "E": "#d0f0fd", "IN": "#fff3b0", "DNMS": "#f8a5a5"}
+TREND_BG = {"↑ Improved": "#d9f2d9", "↓ Dropped": "#f8d7da", "→ No change": "#eef2f7", "": "#ffffff"}
+
+_CELL = "border:1px solid #ddd;padding:8px;"
+
+_TABLE_OPEN = (
+    '<div style="overflow-x:auto;">'
+    '<table style="border-collapse:collapse;width:100%;table-layout:fixed;font-family:Arial,sans-serif;font-size:13px;">'
+    '<thead><tr style="background-color:#f5f6f7;">'
+    f'<th style="{_CELL}width:7%;text-align:left;">Domain</th>'
+    f'<th style="{_CELL}width:14%;text-align:left;">Strand</th>'
+    f'<th style="{_CELL}width:49%;text-align:left;">Explanation</th>'
+    f'<th style="{_CELL}width:8%;text-align:center;">Initial</th>'
+    f'<th style="{_CELL}width:8%;text-align:center;">Final</th>'
+    f'<th style="{_CELL}width:14%;text-align:center;">Trend</th>'
+    '</tr></thead><tbody>'
+)
+_TABLE_CLOSE = "</tbody></table></div>"
+_ROW = (
+    "<tr>"
+    f'<td style="{_CELL}vertical-align:top;">{{domain}}</td>'
+    f'<td style="{_CELL}vertical-align:top;">{{strand}}</td>'
+    f'<td style="{_CELL}vertical-align:top;white-space:normal;word-wrap:break-word;'
+    f'overflow-wrap:break-word;line-height:1.4;">{{explanation}}</td>'
+    f'<td style="{_CELL}text-align:center;background:{{initial_bg}};font-weight:bold;">{{initial}}</td>'
+    f'<td style="{_CELL}text-align:center;background:{{final_bg}};font-weight:bold;">{{final}}</td>'
+    f'<td style="{_CELL}text-align:center;background:{{trend_bg}};font-weight:bold;">{{trend}}</td>'
+    "</tr>"
+).format  # bound once; each row is a single C-level format call
+
+_DOC_OPEN = (
+    "<html><head><title>{title}</title><style>"
+    "body{{font-family:Arial,sans-serif;margin:24px;color:#111;}}"
+    "h1{{font-size:24px;margin-bottom:8px;}}"
+    "h2{{font-size:18px;margin-top:0;margin-bottom:20px;color:#444;}}"
+    ".meta{{margin-bottom:20px;line-height:1.6;font-size:14px;}}"
+    ".meta strong{{display:inline-block;min-width:140px;}}"
+    ".print-btn{{margin-bottom:20px;}}"
+    ".teacher + .teacher{{break-before:page;page-break-before:always;margin-top:32px;}}"
+    "@media print{{.print-btn{{display:none;}}body{{margin:10mm;}}}}"
+    "</style></head><body>"
+    '<div class="print-btn"><button onclick="window.print()" '
+    'style="padding:10px 16px;font-size:14px;cursor:pointer;">Print</button></div>'
+).format
+_DOC_CLOSE = "</body></html>"
+_TEACHER = (
+    '<section class="teacher"><h1>{name}</h1>'
+    "<h2>Initial vs Final Self-Assessment Comparison</h2>"
+    '<div class="meta">'
+    "<div><strong>Email:</strong> {email}</div>"
+    "<div><strong>Appraiser:</strong> {appraiser}</div>"
+    "<div><strong>Initial Submitted:</strong> {initial_date}</div>"
+    "<div><strong>Final Submitted:</strong> {final_date}</div>"
+    "</div>"
+).format
+_TEACHER_CLOSE = "</section>"
+
+def _text(value):
+    return escape(safe_text(value), quote=False)
+
+def write_comparison_table(df, write):
+    """Write the comparison table for one teacher through `write` (e.g. `parts.append`)."""
+    if df is None or df.empty:
+        write("<p>No comparison data available.</p>")
+        return
+    write(_TABLE_OPEN)
+    cols = [[safe_text(v) for v in df[c].tolist()] if c in df.columns else [""] * len(df)
+            for c in ("Domain", "Strand", "Explanation", "Initial", "Final", "Trend")]
+    for domain, strand, explanation, initial, final, trend in zip(*cols):
+        write(_ROW(
+            domain=escape(domain, quote=False),
+            strand=escape(strand, quote=False),
+            explanation=escape(explanation, quote=False).replace("\n", "<br>"),
+            initial=escape(initial, quote=False), initial_bg=RATING_BG.get(initial, "#ffffff"),
+            final=escape(final, quote=False), final_bg=RATING_BG.get(final, "#ffffff"),
+            trend=escape(trend, quote=False), trend_bg=TREND_BG.get(trend, "#ffffff"),
+        ))
+    write(_TABLE_CLOSE)
+
+def write_teacher_comparison(write, teacher_name, teacher_email, appraiser, initial_date, final_date, df):
+    write(_TEACHER(
+        name=_text(teacher_name), email=_text(teacher_email), appraiser=_text(appraiser),
+        initial_date=_text(initial_date) or "-", final_date=_text(final_date) or "-",
+    ))
+    write_comparison_table(df, write)
+    write(_TEACHER_CLOSE)
+
+def render_comparison_html(df):
+    parts = []
+    write_comparison_table(df, parts.append)
+    return "".join(parts)
+
+def printable_comparison_html(teacher_name, teacher_email, appraiser, initial_date, final_date, df):
+    parts = [_DOC_OPEN(title=_text(f"{teacher_name} - Initial vs Final Comparison"))]
+    write_teacher_comparison(parts.append, teacher_name, teacher_email, appraiser, initial_date, final_date, df)
+    parts.append(_DOC_CLOSE)
+    return "".join(parts)
+
+def write_campus_comparison_html(teachers, out, title="Initial vs Final Comparisons"):
+    """
+    One printable document, one page-broken section per teacher. `teachers` yields
+    (name, email, appraiser, initial_date, final_date, comparison_df) and may be a
+    generator, so each teacher's frame is built, written to `out` and dropped in turn.
+    Returns the number of teachers written.
+    """
+    write = out.write
+    write(_DOC_OPEN(title=_text(title)))
+    count = 0
+    for teacher in teachers:
+        write_teacher_comparison(write, *teacher)
+        count += 1
+    write(_DOC_CLOSE)
+    return count
+
+def campus_comparison_html(teachers, title="Initial vs Final Comparisons"):
+    out = StringIO()
+    write_campus_comparison_html(teachers, out, title=title)
+    return out.getvalue()
@@ -1,6 +1,8 @@
 # descriptors.py
 # Kim Marshall Teacher Evaluation Rubric – Strand Descriptors (A1–F9)
 
+from ratings import RATING_LABELS, RATING_SHORT
+
 DESCRIPTORS = {
     # Domain A: Planning and Preparation for Learning
     "A1 Expertise": {
@@ -332,3 +334,13 @@ DESCRIPTORS = {
         "DNMS": "Shows no interest in growth."
     },
 }
+
+# Each strand's four descriptors as one markdown block, built once at import and sent
+# only when a teacher opens that strand's descriptors.
+DESCRIPTOR_MARKDOWN = {
+    strand: "\n\n".join(
+        f"**{label} ({short}):** {levels[short]}"
+        for short, label in reversed(list(zip(RATING_SHORT[1:], RATING_LABELS[1:])))
+    )
+    for strand, levels in DESCRIPTORS.items()
+}
@@ -0,0 +1,154 @@
+# drafts.py
+# Self-assessment drafts: one row per teacher in the Drafts sheet, addressed through a cached email -> row index.
+
+import threading
+import time
+
+from gspread.utils import rowcol_to_a1
+
+from mirror import appended_row_number
+from tracing import cache_lookup
+
+DRAFT_INDEX_TTL_SECONDS = 600
+
+def draft_headers(domains, enable_reflections=True):
+    """Fixed Drafts header: Email, then each domain's strands followed by its reflection."""
+    headers = ["Email"]
+    for domain, items in domains.items():
+        for code, label in items:
+            headers.append(f"{code} {label}")
+        if enable_reflections:
+            headers.append(f"Reflection-{domain}")
+    return headers
+
+class DraftsStore:
+    """
+    Reads and writes single draft rows. `call` wraps every worksheet call (retry/backoff).
+    Traffic is one row per save or load, regardless of how many drafts the sheet holds.
+    With a `mirror_sync` (mirror.MirrorSync), loads come from the local mirror, which is
+    re-synced every `index_ttl` seconds, and saves are written through to it.
+    """
+
+    def __init__(self, ws, headers, call, index_ttl=DRAFT_INDEX_TTL_SECONDS, mirror_sync=None, sheet_name="Drafts"):
+        self._ws = ws
+        self._sync = mirror_sync
+        self._sheet_name = sheet_name
+        self._mirror_stale = False
+        self.headers = list(headers)
+        self._call = call
+        self._index_ttl = index_ttl
+        self._lock = threading.Lock()
+        self._rows = None
+        self._loaded_at = 0.0
+        self._generations = {}   # email -> count of loads/saves, so cached copies can tell they're stale
+        self._last_cell = rowcol_to_a1(1, len(self.headers))
+
+    # ── header ──
+    def ensure_headers(self):
+        """Write the fixed header into an empty/bare sheet; return False if a different header is already there."""
+        current = self._call(self._ws.row_values, 1)
+        if current == self.headers:
+            return True
+        if not current or current == ["Email"]:
+            self._call(self._ws.update, f"A1:{self._last_cell}", [self.headers])
+            return True
+        return False
+
+    # ── email -> row index ──
+    def _index(self, force=False):
+        with self._lock:
+            expired = (time.monotonic() - self._loaded_at) > self._index_ttl
+            stale = force or self._rows is None or expired
+            cache_lookup("drafts.index", not stale)
+            if stale:
+                emails = self._call(self._ws.col_values, 1)
+                rows = {}
+                for row_num, value in enumerate(emails[1:], start=2):
+                    key = str(value).strip().lower()
+                    if key and key not in rows:
+                        rows[key] = row_num
+                self._rows = rows
+                self._loaded_at = time.monotonic()
+            return self._rows
+
+    def _remember(self, email, row_num):
+        with self._lock:
+            if self._rows is not None and row_num:
+                self._rows[email] = row_num
+
+    def forget(self, email=None):
+        """Drop one teacher's cached row number, or the whole index when no email is given."""
+        with self._lock:
+            self._mirror_stale = True
+            if email is None:
+                self._rows = None
+            elif self._rows is not None:
+                self._rows.pop(str(email).strip().lower(), None)
+
+    def _touch(self, email):
+        with self._lock:
+            self._generations[email] = self._generations.get(email, 0) + 1
+
+    def generation(self, email):
+        """Bumped on every load or save of `email`'s draft."""
+        with self._lock:
+            return self._generations.get(str(email).strip().lower(), 0)
+
+    def row_for(self, email):
+        return self._index().get(str(email).strip().lower())
+
+    # ── read / write ──
+    def _load_mirrored(self, email):
+        with self._lock:
+            stale, self._mirror_stale = self._mirror_stale, False
+        if stale:
+            self._sync.sync(self._sheet_name)
+        else:
+            self._sync.ensure_fresh(self._sheet_name, self._index_ttl)
+        rows = self._sync.mirror.rows(self._sheet_name, email=email)
+        return dict(zip(self.headers, rows[0][1])) if rows else {}
+
+    def load(self, email):
+        email = str(email).strip().lower()
+        self._touch(email)
+        if self._sync is not None:
+            return self._load_mirrored(email)
+        row_num = self.row_for(email)
+        if row_num is None:
+            return {}
+        values = self._call(self._ws.row_values, row_num)
+        if not values or str(values[0]).strip().lower() != email:
+            # Sheet was edited by hand since the index was built – rebuild once.
+            row_num = self._index(force=True).get(email)
+            if row_num is None:
+                return {}
+            values = self._call(self._ws.row_values, row_num)
+        return dict(zip(self.headers, values))
+
+    def save(self, email, payload):
+        email = str(email).strip().lower()
+        self._touch(email)
+        values = [email] + [payload.get(h, "") for h in self.headers[1:]]
+        row_num = self.row_for(email)
+        if row_num is None:
+            # Confirm against the sheet before appending so a stale index can't duplicate a row.
+            row_num = self._index(force=True).get(email)
+        if row_num is not None:
+            end = rowcol_to_a1(row_num, len(self.headers))
+            self._call(self._ws.update, f"A{row_num}:{end}", [values], value_input_option="USER_ENTERED")
+            self._mirror_row(row_num, values)
+            return row_num
+        response = self._call(self._ws.append_row, values, value_input_option="USER_ENTERED")
+        row_num = appended_row_number(response)
+        if row_num is None:
+            self._index(force=True)
+            with self._lock:
+                self._mirror_stale = True
+        else:
+            self._remember(email, row_num)
+            self._mirror_row(row_num, values)
+        return row_num
+
+    def _mirror_row(self, row_num, values):
+        if self._sync is not None:
+            self._sync.record_write(self._sheet_name, row_num, values)
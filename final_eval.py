@@ -0,0 +1,134 @@
+# final_eval.py
+# FinalEvaluation sheet parsing and in-memory upserts that mirror what was written to Sheets.
+
+import pandas as pd
+
+FINAL_EVAL_HEADERS = [
+    "Timestamp", "Last Edited On", "Teacher Email", "Teacher Name",
+    "Appraiser", "Subject Area", "Student Survey Feedback", "Overall Reflection",
+    "Teacher Submitted", "Teacher Submitted On", "Appraiser Started",
+    "Appraiser Completed", "Appraiser Completed On",
+    "A Rating", "B Rating", "C Rating", "D Rating", "E Rating", "F Rating",
+    "Overall Rating", "Overall Comments",
+    "Evaluator Sign Off", "Evaluator Sign Off Date",
+    "Teacher Sign Off", "Teacher Sign Off Date",
+]
+
+def final_eval_domain_rows():
+    return [
+        ("A Rating", "A. Planning and Preparation for Learning"),
+        ("B Rating", "B. Classroom Management"),
+        ("C Rating", "C. Delivery of Instruction"),
+        ("D Rating", "D. Monitoring, Assessment, and Follow-Up"),
+        ("E Rating", "E. Family and Community Outreach"),
+        ("F Rating", "F. Professional Responsibilities"),
+    ]
+
+def normalise_final_eval_df(df):
+    if "Teacher Email" in df.columns:
+        df["Teacher Email"] = df["Teacher Email"].astype(str).str.strip().str.lower()
+    if "Appraiser" in df.columns:
+        df["Appraiser"] = df["Appraiser"].astype(str).str.strip().str.lower()
+    return df
+
+def build_final_eval_df(vals, expected_headers):
+    """Parse `get_all_values()` output; an empty sheet gives an empty frame with the expected headers."""
+    if not vals:
+        return pd.DataFrame(columns=expected_headers)
+    header, rows = vals[0], vals[1:]
+    df = pd.DataFrame(rows, columns=header) if rows else pd.DataFrame(columns=header)
+    return normalise_final_eval_df(df)
+
+def final_eval_row_number(df, teacher_email):
+    """1-based sheet row of the teacher's first record, or None if they have none yet."""
+    if df.empty or "Teacher Email" not in df.columns:
+        return None
+    teacher_email = str(teacher_email or "").strip().lower()
+    matches = df.index[df["Teacher Email"] == teacher_email]
+    if len(matches) == 0:
+        return None
+    return int(matches[0]) + 2
+
+def upsert_final_eval_row(df, headers, row_values, row_num):
+    """
+    Copy of `df` with `row_values` written at sheet row `row_num`: an update when the
+    row is already in `df`, otherwise an append that landed there (the row number from
+    the append response, which may be past rows added by someone else). Row labels stay
+    equal to (sheet row - 2) so later updates keep addressing the right row. None when
+    `row_num` is unknown, so the snapshot is re-read instead of guessed at.
+    """
+    if row_num is None:
+        return None
+    label = row_num - 2
+    record = dict(zip(headers, row_values))
+    new_row = normalise_final_eval_df(pd.DataFrame([record]))
+    df = df.copy()
+    if label in df.index:
+        for col in headers:
+            if col in df.columns:
+                df.at[label, col] = new_row.at[0, col]
+        return df
+    new_row = new_row.reindex(columns=df.columns, fill_value="")
+    new_row.index = [label]
+    return pd.concat([df, new_row]).sort_index()
+
+# =========================
+# Per-teacher state
+# =========================
+def _yes(value):
+    return str(value or "").strip().lower() == "yes"
+
+def _filled(value):
+    return str(value or "").strip() != ""
+
+class FinalEvaluationState:
+    """Status flags and workflow stage derived once from a teacher's latest FinalEvaluation record."""
+
+    STAGES = [
+        "not_started", "teacher_in_progress", "teacher_submitted",
+        "appraiser_completed", "evaluator_signed_off", "signed_off",
+    ]
+
+    def __init__(self, record=None):
+        self._record = dict(record or {})
+        rec = self._record
+        self.teacher_submitted = _yes(rec.get("Teacher Submitted"))
+        self.appraiser_completed = _yes(rec.get("Appraiser Completed"))
+        self.evaluator_signed_off = _yes(rec.get("Evaluator Sign Off"))
+        self.teacher_signed_off = _yes(rec.get("Teacher Sign Off"))
+        self.teacher_started = bool(rec) and (
+            self.teacher_submitted
+            or _filled(rec.get("Subject Area"))
+            or _filled(rec.get("Student Survey Feedback"))
+            or _filled(rec.get("Overall Reflection"))
+        )
+        if self.teacher_signed_off:
+            self.stage = "signed_off"
+        elif self.evaluator_signed_off:
+            self.stage = "evaluator_signed_off"
+        elif self.appraiser_completed:
+            self.stage = "appraiser_completed"
+        elif self.teacher_submitted:
+            self.stage = "teacher_submitted"
+        elif self.teacher_started:
+            self.stage = "teacher_in_progress"
+        else:
+            self.stage = "not_started"
+
+    @property
+    def record(self):
+        """A fresh copy of the latest record – safe for callers to edit and save back."""
+        return dict(self._record)
+
+EMPTY_FINAL_EVAL_STATE = FinalEvaluationState()
+
+def build_final_eval_states(df):
+    """Teacher email -> FinalEvaluationState from each teacher's newest record (by Timestamp)."""
+    if df.empty or "Teacher Email" not in df.columns:
+        return {}
+    latest = df.sort_values("Timestamp", kind="mergesort") if "Timestamp" in df.columns else df
+    latest = latest.drop_duplicates("Teacher Email", keep="last")
+    return {
+        rec["Teacher Email"]: FinalEvaluationState(rec)
+        for rec in latest.to_dict("records")
+    }
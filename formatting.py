@@ -0,0 +1,27 @@
+# formatting.py
+# Small text helpers shared by the pages and the document generators.
+
+import pandas as pd
+
+def safe_text(value):
+    if value is None:
+        return ""
+    try:
+        if pd.isna(value):
+            return ""
+    except Exception:
+        pass
+    return str(value)
+
+def title_case_name(name: str) -> str:
+    return " ".join(part.capitalize() for part in safe_text(name).split())
+
+def format_age(seconds):
+    """'just now', '45 s ago', '3 min ago', '2 h ago'."""
+    if seconds < 10:
+        return "just now"
+    if seconds < 60:
+        return f"{int(seconds)} s ago"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} min ago"
+    return f"{int(seconds // 3600)} h ago"
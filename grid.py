@@ -0,0 +1,74 @@
+# grid.py
+# Self-Assessment Grid: row filtering, column projection and paging, so only one page is
+# formatted and sent to the browser however many submissions the campus has.
+
+import math
+
+from ratings import shorten_ratings
+
+GRID_KEY_COLUMNS = ["Timestamp", "Email", "Name", "Appraiser", "Assessment Cycle"]
+GRID_PAGE_SIZES = [25, 50, 100]
+
+RATING_CELL_STYLES = {
+    "HE": "background-color: #a8e6a1;",
+    "E": "background-color: #d0f0fd;",
+    "IN": "background-color: #fff3b0;",
+    "DNMS": "background-color: #f8a5a5;",
+    "Highly Effective": "background-color: #a8e6a1;",
+    "Effective": "background-color: #d0f0fd;",
+    "Improvement Necessary": "background-color: #fff3b0;",
+    "Does Not Meet Standards": "background-color: #f8a5a5;",
+}
+
+def highlight_ratings(val):
+    return RATING_CELL_STYLES.get(val, "")
+
+def grid_rows(index, emails, cycles=None, latest_only=True):
+    """
+    Row labels of the submissions to show for `emails`: each teacher's newest row per
+    cycle, or every submission when `latest_only` is False. Sheet order either way.
+    """
+    if latest_only:
+        return index.latest_labels(emails, cycles)
+    df = index.df
+    if df.empty:
+        return []
+    mask = df["Email"].isin({str(e).strip().lower() for e in emails})
+    if cycles is not None:
+        mask &= df["Assessment Cycle"].isin(cycles)
+    return df.index[mask].tolist()
+
+def grid_columns(domains, selected_domains=None, include_reflections=False):
+    """
+    (columns, rating columns) for the chosen domains, from a DOMAINS-shaped mapping
+    {domain: [(code, label), ...]}. None selects every domain.
+    """
+    rating_cols = []
+    columns = list(GRID_KEY_COLUMNS)
+    for domain, items in domains.items():
+        if selected_domains is not None and domain not in selected_domains:
+            continue
+        strands = [f"{code} {label}" for code, label in items]
+        rating_cols += strands
+        columns += strands
+        if include_reflections:
+            columns.append(f"{domain} Reflection")
+    return columns, rating_cols
+
+def page_count(n_rows, page_size):
+    return max(1, math.ceil(n_rows / page_size))
+
+def grid_page(df, labels, columns, rating_cols, page, page_size):
+    """
+    Page `page` (1-based) of the grid: only these rows and columns are copied,
+    and ratings are shortened to HE/E/IN/DNMS on the page alone.
+    """
+    start = (page - 1) * page_size
+    page_labels = labels[start:start + page_size]
+    columns = [c for c in columns if c in df.columns]
+    return shorten_ratings(df.loc[page_labels, columns], rating_cols)
+
+def grid_export(df, labels, columns, rating_cols):
+    """Every filtered row with the projected columns, ratings shortened, for CSV download."""
+    columns = [c for c in columns if c in df.columns]
+    return shorten_ratings(df.loc[labels, columns], rating_cols)
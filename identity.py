@@ -0,0 +1,134 @@
+# identity.py
+# Token -> verified Google identity, cached per process until the token expires.
+
+import threading
+import time
+
+import jwt
+import requests
+import streamlit as st
+
+USERINFO_ENDPOINT = "https://openidconnect.googleapis.com/v1/userinfo"
+GOOGLE_JWKS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+GOOGLE_ISSUERS = ["https://accounts.google.com", "accounts.google.com"]
+
+USERINFO_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+DEFAULT_TOKEN_LIFETIME = 3600
+EXPIRY_SKEW_SECONDS = 30
+
+# =========================
+# Shared HTTP resources
+# =========================
+@st.cache_resource
+def get_http_session():
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("https://", adapter)
+    return session
+
+@st.cache_resource
+def get_jwks_client():
+    # PyJWKClient keeps Google's signing keys in memory and only refetches on an unknown kid.
+    return jwt.PyJWKClient(GOOGLE_JWKS_URL, cache_keys=True, lifespan=6 * 3600)
+
+# =========================
+# Identity cache
+# =========================
+class IdentityCache:
+    """Maps an access token to the identity it was issued for."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, access_token):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(access_token)
+            if entry is None:
+                return None
+            identity, expires_at = entry
+            if now >= expires_at:
+                del self._entries[access_token]
+                return None
+            return identity
+
+    def put(self, access_token, identity, expires_at):
+        now = time.time()
+        with self._lock:
+            # Opportunistically drop expired tokens so the map stays small.
+            for key in [k for k, (_, exp) in self._entries.items() if exp <= now]:
+                del self._entries[key]
+            self._entries[access_token] = (identity, expires_at)
+
+    def discard(self, access_token):
+        with self._lock:
+            self._entries.pop(access_token, None)
+
+@st.cache_resource
+def get_identity_cache():
+    return IdentityCache()
+
+def _token_expiry(token):
+    expires_at = token.get("expires_at")
+    if expires_at is None:
+        expires_at = time.time() + float(token.get("expires_in", DEFAULT_TOKEN_LIFETIME))
+    return float(expires_at) - EXPIRY_SKEW_SECONDS
+
+def _verify_id_token(id_token, client_id):
+    signing_key = get_jwks_client().get_signing_key_from_jwt(id_token)
+    claims = jwt.decode(
+        id_token,
+        signing_key.key,
+        algorithms=["RS256"],
+        audience=client_id,
+        issuer=GOOGLE_ISSUERS,
+    )
+    if not claims.get("email") or not claims.get("email_verified", False):
+        return None
+    return {"email": claims["email"], "name": claims.get("name", ""), "hd": claims.get("hd", "")}
+
+def _fetch_userinfo(access_token):
+    resp = get_http_session().get(
+        USERINFO_ENDPOINT,
+        headers={"Authorization": f"Bearer {access_token}"},
+        timeout=USERINFO_TIMEOUT,
+    )
+    if resp.status_code != 200:
+        return None
+    info = resp.json()
+    if not info.get("email"):
+        return None
+    return {"email": info["email"], "name": info.get("name", ""), "hd": info.get("hd", "")}
+
+def resolve_identity(token, client_id):
+    """
+    Return {"email", "name", "hd"} for an OAuth token, or None if it can't be verified.
+    Uses the cached identity, then the signed ID token, and only then the userinfo endpoint.
+    """
+    access_token = token.get("access_token") if token else None
+    if not access_token:
+        return None
+
+    cache = get_identity_cache()
+    identity = cache.get(access_token)
+    if identity is not None:
+        return identity
+
+    identity = None
+    id_token = token.get("id_token")
+    if id_token:
+        try:
+            identity = _verify_id_token(id_token, client_id)
+        except jwt.PyJWTError:
+            identity = None
+    if identity is None:
+        try:
+            identity = _fetch_userinfo(access_token)
+        except requests.RequestException:
+            identity = None
+
+    if identity is not None:
+        identity["email"] = identity["email"].strip().lower()
+        cache.put(access_token, identity, _token_expiry(token))
+    return identity
@@ -0,0 +1,228 @@
+# letters.py
+# Final Evaluation letters (DOCX) – single letters and bulk "campus packet" ZIP export.
+
+import copy
+import logging
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import types
+import zipfile
+from io import BytesIO
+
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import Pt
+
+from final_eval import final_eval_domain_rows
+from formatting import safe_text, title_case_name
+from tracing import cache_lookup, traced
+
+LETTER_TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Copy of Letter template OIS JVLR.docx")
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# Template cache
+# =========================
+class LetterTemplateError(RuntimeError):
+    """The letterhead template could not be opened; no letter is produced without it."""
+
+_template_lock = threading.Lock()
+_template = None   # (path, mtime, pristine Document)
+
+def _template_mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+def letter_template(path=LETTER_TEMPLATE_PATH):
+    """
+    Fresh copy of the letter template. The .docx is parsed once per process and kept
+    pristine; each letter gets a deep copy of it, which is far cheaper than re-reading
+    the package. Editing the file on disk (new mtime) makes the next call re-parse it.
+    Raises LetterTemplateError if the template is missing or unreadable.
+    """
+    global _template
+    mtime = _template_mtime(path)
+    with _template_lock:
+        hit = _template is not None and _template[0] == path and _template[1] == mtime
+        cache_lookup("letter_template", hit)
+        if not hit:
+            try:
+                pristine = Document(path)
+            except Exception as e:
+                logger.exception("Letter template %s could not be opened", path)
+                raise LetterTemplateError(f"The letter template {os.path.basename(path)} could not be opened: {e}") from e
+            _template = (path, mtime, pristine)
+        return copy.deepcopy(_template[2])
+
+# =========================
+# Single letter
+# =========================
+@traced("docx.final_evaluation")
+def generate_final_evaluation_docx(record: dict):
+    doc = letter_template()
+
+    teacher_name = title_case_name(record.get("Teacher Name", ""))
+    appraiser_name = title_case_name(record.get("Appraiser", ""))
+    subject_area = safe_text(record.get("Subject Area", ""))
+
+    if doc.paragraphs:
+        first_para = doc.paragraphs[0]
+        first_para.paragraph_format.space_before = Pt(0)
+        first_para.paragraph_format.space_after = Pt(0)
+
+    p = doc.add_paragraph()
+    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    p.paragraph_format.space_before = Pt(0)
+    p.paragraph_format.space_after = Pt(3)
+    run = p.add_run("FINAL EVALUATION SUMMARY")
+    run.bold = True
+    run.font.size = Pt(14)
+    doc.add_paragraph("")
+
+    for label_text, field in [
+        ("Teacher: ", "Teacher Name"),
+        ("Appraiser: ", "Appraiser"),
+        ("Subject Area: ", "Subject Area"),
+    ]:
+        p = doc.add_paragraph()
+        p.add_run(label_text).bold = True
+        p.add_run(title_case_name(record.get(field, "")) if field in ["Teacher Name", "Appraiser"] else safe_text(record.get(field, "")))
+
+    doc.add_paragraph("")
+
+    p = doc.add_paragraph()
+    run = p.add_run("Student Survey Feedback")
+    run.bold = True; run.font.size = Pt(12)
+    p = doc.add_paragraph()
+    p.add_run("Administered by the teacher each Semester").italic = True
+    doc.add_paragraph(safe_text(record.get("Student Survey Feedback", "")))
+    doc.add_paragraph("")
+
+    p = doc.add_paragraph()
+    run = p.add_run("Overall Reflection by the teacher on the school year")
+    run.bold = True; run.font.size = Pt(12)
+    doc.add_paragraph(safe_text(record.get("Overall Reflection", "")))
+    doc.add_paragraph("")
+
+    p = doc.add_paragraph()
+    run = p.add_run("Ratings on Individual Rubrics")
+    run.bold = True; run.font.size = Pt(12)
+
+    for col_name, label in final_eval_domain_rows():
+        p = doc.add_paragraph()
+        p.add_run(f"{label}: ").bold = True
+        p.add_run(safe_text(record.get(col_name, "")))
+
+    doc.add_paragraph("")
+
+    p = doc.add_paragraph()
+    run = p.add_run("Overall Rating")
+    run.bold = True; run.font.size = Pt(12)
+    p = doc.add_paragraph()
+    run = p.add_run(safe_text(record.get("Overall Rating", "")))
+    run.bold = True
+    doc.add_paragraph("")
+
+    p = doc.add_paragraph()
+    run = p.add_run("Overall Appraiser Comments")
+    run.bold = True; run.font.size = Pt(12)
+    doc.add_paragraph(safe_text(record.get("Overall Comments", "")))
+    doc.add_paragraph("")
+
+    p = doc.add_paragraph()
+    run = p.add_run("Sign Off")
+    run.bold = True; run.font.size = Pt(12)
+    p = doc.add_paragraph()
+    p.add_run(f"{appraiser_name} signed off on: ").bold = True
+    p.add_run(safe_text(record.get("Evaluator Sign Off Date", "")))
+    p = doc.add_paragraph()
+    p.add_run(f"{teacher_name} signed off on: ").bold = True
+    p.add_run(safe_text(record.get("Teacher Sign Off Date", "")))
+    doc.add_paragraph("")
+    doc.add_paragraph(
+        "The teacher's signature indicates that he or she has seen and discussed the evaluation; "
+        "it does not necessarily denote agreement with the report."
+    )
+
+    out = BytesIO()
+    doc.save(out)
+    out.seek(0)
+    return out
+
+def final_evaluation_letter_record(fe_record, teacher_name, fallback_appraiser=""):
+    """The record the letter is generated from: display teacher name and title-cased appraiser."""
+    record = dict(fe_record)
+    record["Teacher Name"] = teacher_name
+    record["Appraiser"] = title_case_name(fe_record.get("Appraiser", fallback_appraiser) or fallback_appraiser)
+    return record
+
+def letter_filename(teacher_name):
+    return f"{teacher_name}_final_evaluation_summary.docx"
+
+# =========================
+# Bulk export
+# =========================
+def _render_letter(numbered):
+    i, record = numbered
+    return i, generate_final_evaluation_docx(record).getvalue()
+
+_spawn_lock = threading.Lock()
+
+def _start_pool(ctx, processes):
+    """
+    Start every worker up front with `__main__` hidden. Spawned workers re-import
+    `__main__` by path, and Streamlit installs the page script there, so each worker
+    would otherwise run the whole page again before rendering anything.
+    """
+    with _spawn_lock:
+        main = sys.modules.get("__main__")
+        sys.modules["__main__"] = types.ModuleType("__main__")   # no __file__: nothing to re-run
+        try:
+            return ctx.Pool(processes=processes)   # multiprocessing.Pool spawns all workers here
+        finally:
+            sys.modules["__main__"] = main
+
+def _unique_name(name, used):
+    name = re.sub(r'[\\/:*?"<>|]', "_", name)
+    if name not in used:
+        used.add(name)
+        return name
+    stem, ext = os.path.splitext(name)
+    n = 2
+    while f"{stem} ({n}){ext}" in used:
+        n += 1
+    used.add(f"{stem} ({n}){ext}")
+    return f"{stem} ({n}){ext}"
+
+def write_letter_packet(records, out, progress=None, max_workers=None):
+    """
+    Render every record's letter on a process pool and stream each one into a ZIP
+    written to `out` as soon as it is ready, so finished letters aren't held in memory.
+    `progress(done, total)` is called after each letter is added. Returns the count.
+    """
+    records = list(records)
+    total = len(records)
+    if not total:
+        with zipfile.ZipFile(out, "w"):
+            return 0
+    max_workers = min(max_workers or min(8, os.cpu_count() or 1), total)
+    names = [letter_filename(r.get("Teacher Name", "teacher")) for r in records]
+    used_names = set()
+    done = 0
+    ctx = multiprocessing.get_context("spawn")  # never fork the threaded Streamlit server
+    # DOCX files are already deflated; storing them avoids burning CPU for no size gain.
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_STORED) as zf, \
+            _start_pool(ctx, max_workers) as pool:
+        for i, data in pool.imap_unordered(_render_letter, enumerate(records)):
+            zf.writestr(_unique_name(names[i], used_names), data)
+            done += 1
+            if progress:
+                progress(done, total)
+    return done
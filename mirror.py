@@ -0,0 +1,288 @@
+# mirror.py
+# Local SQLite mirror of the app's worksheets. Pages read from here; Google Sheets is read
+# only by MirrorSync and written only by saves.
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from gspread.exceptions import APIError
+from gspread.utils import rowcol_to_a1
+
+from tracing import cache_lookup, span
+
+FULL_RESYNC_SECONDS = 3600
+
+# Indexed lookup columns and the sheet headers they can come from
+KEY_HEADERS = {
+    "email": ("Email", "Teacher Email"),
+    "cycle": ("Assessment Cycle",),
+    "appraiser": ("Appraiser",),
+}
+
+def _digest(values):
+    return hashlib.sha1(json.dumps(values, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def connect_private(path):
+    """
+    Autocommit WAL connection to an SQLite file only this user can read or write.
+    The database is created 0600 before SQLite opens it, and the -wal/-shm sidecars
+    are tightened once WAL mode has created them (SQLite gives later ones the
+    database file's mode). `path` may be ":memory:".
+    """
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        os.close(os.open(path, os.O_CREAT | os.O_RDWR, 0o600))
+        os.chmod(path, 0o600)
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    if path != ":memory:":
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.chmod(path + suffix, 0o600)
+    return conn
+
+def appended_row_number(response):
+    """Row number from an append response, e.g. {"updates": {"updatedRange": "Drafts!A12:BH12"}}."""
+    try:
+        updated = response["updates"]["updatedRange"]
+    except (TypeError, KeyError):
+        return None
+    match = re.search(r"![A-Z]+(\d+)", updated)
+    return int(match.group(1)) if match else None
+
+def _past_grid(exc):
+    """Sheets rejects a range starting below the grid's last row (400 "exceeds grid limits")."""
+    return isinstance(exc, APIError) and "exceeds grid limits" in str(exc)
+
+def _key_positions(header):
+    positions = {}
+    for key, names in KEY_HEADERS.items():
+        positions[key] = next((header.index(n) for n in names if n in header), None)
+    return positions
+
+class SheetMirror:
+    """
+    One `sheet_rows` row per worksheet row (row_num is the sheet row, data is the JSON
+    list of cells padded to the header width) plus `sheet_meta` with the header,
+    last row number and sync times. email/cycle/appraiser are copied out and indexed.
+    """
+
+    def __init__(self, path):
+        """`path` may be ":memory:" for a throwaway mirror (benchmarks)."""
+        self._lock = threading.Lock()
+        self._conn = connect_private(path)   # holds the Users sheet, passwords included
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sheet_meta ("
+            " sheet TEXT PRIMARY KEY, header TEXT NOT NULL, row_count INTEGER NOT NULL,"
+            " synced_at REAL NOT NULL, full_synced_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sheet_rows ("
+            " sheet TEXT NOT NULL, row_num INTEGER NOT NULL,"
+            " email TEXT, cycle TEXT, appraiser TEXT, digest TEXT NOT NULL, data TEXT NOT NULL,"
+            " PRIMARY KEY (sheet, row_num))"
+        )
+        for key in KEY_HEADERS:
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_sheet_rows_{key} ON sheet_rows(sheet, {key})")
+
+    # ── reads ──
+    def meta(self, sheet):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT header, row_count, synced_at, full_synced_at FROM sheet_meta WHERE sheet = ?", (sheet,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"header": json.loads(row[0]), "row_count": row[1], "synced_at": row[2], "full_synced_at": row[3]}
+
+    def values(self, sheet):
+        """
+        `get_all_values()`-shaped copy of the sheet (header first); [] if never synced.
+        Rows missing from the mirror come back blank, so list position + 1 is always the sheet row.
+        """
+        meta = self.meta(sheet)
+        if meta is None:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT row_num, data FROM sheet_rows WHERE sheet = ? ORDER BY row_num", (sheet,)
+            ).fetchall()
+        width = len(meta["header"])
+        values = [meta["header"]]
+        for row_num, data in rows:
+            values.extend([""] * width for _ in range(row_num - len(values) - 1))
+            values.append(json.loads(data))
+        return values
+
+    def rows(self, sheet, email=None, cycle=None, appraiser=None):
+        """[(row_num, cells)] matching every given key, in sheet order. Keys compare lower-cased/stripped."""
+        sql, params = "SELECT row_num, data FROM sheet_rows WHERE sheet = ?", [sheet]
+        for key, value in (("email", email), ("cycle", cycle), ("appraiser", appraiser)):
+            if value is not None:
+                sql += f" AND {key} = ?"
+                params.append(str(value).strip().lower())
+        with self._lock:
+            found = self._conn.execute(sql + " ORDER BY row_num", params).fetchall()
+        return [(row_num, json.loads(data)) for row_num, data in found]
+
+    # ── writes ──
+    def _row_params(self, sheet, row_num, cells, width, positions):
+        cells = [str(c) for c in cells][:width]
+        cells += [""] * (width - len(cells))
+        keys = [
+            cells[positions[k]].strip().lower() if positions[k] is not None else None
+            for k in KEY_HEADERS
+        ]
+        return (sheet, row_num, *keys, _digest(cells), json.dumps(cells, ensure_ascii=False))
+
+    _UPSERT = (
+        "INSERT INTO sheet_rows (sheet, row_num, email, cycle, appraiser, digest, data)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)"
+        " ON CONFLICT(sheet, row_num) DO UPDATE SET email = excluded.email, cycle = excluded.cycle,"
+        " appraiser = excluded.appraiser, digest = excluded.digest, data = excluded.data"
+    )
+
+    def load_full(self, sheet, values):
+        """Replace the mirror of `sheet` with `values`, writing only rows whose contents changed."""
+        header = [str(h) for h in values[0]] if values else []
+        positions = _key_positions(header)
+        now = time.time()
+        with self._lock:
+            existing = dict(self._conn.execute(
+                "SELECT row_num, digest FROM sheet_rows WHERE sheet = ?", (sheet,)
+            ))
+            changed = []
+            for row_num, cells in enumerate(values[1:], start=2):
+                params = self._row_params(sheet, row_num, cells, len(header), positions)
+                if existing.get(row_num) != params[5]:
+                    changed.append(params)
+            last_row = len(values)
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(self._UPSERT, changed)
+                self._conn.execute("DELETE FROM sheet_rows WHERE sheet = ? AND row_num > ?", (sheet, last_row))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sheet_meta (sheet, header, row_count, synced_at, full_synced_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (sheet, json.dumps(header, ensure_ascii=False), last_row, now, now),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(changed) + max(0, len(existing) - (last_row - 1))
+
+    def append(self, sheet, first_row, rows):
+        """Mirror rows read from the end of an append-only sheet, starting at sheet row `first_row`."""
+        meta = self.meta(sheet)
+        if meta is None:
+            raise LookupError(f"{sheet} has not been fully synced yet")
+        header = meta["header"]
+        positions = _key_positions(header)
+        params = [self._row_params(sheet, first_row + i, cells, len(header), positions) for i, cells in enumerate(rows)]
+        last_row = max(meta["row_count"], first_row + len(rows) - 1)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(self._UPSERT, params)
+                self._conn.execute(
+                    "UPDATE sheet_meta SET row_count = ?, synced_at = ? WHERE sheet = ?", (last_row, time.time(), sheet)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def put_row(self, sheet, row_num, cells):
+        """Write-through of a single row the app just saved to the sheet. No-op before the first sync."""
+        meta = self.meta(sheet)
+        if meta is None:
+            return
+        header = meta["header"]
+        params = self._row_params(sheet, row_num, cells, len(header), _key_positions(header))
+        with self._lock:
+            self._conn.execute(self._UPSERT, params)
+            if row_num > meta["row_count"]:
+                self._conn.execute("UPDATE sheet_meta SET row_count = ? WHERE sheet = ?", (row_num, sheet))
+
+    def drop(self, sheet):
+        with self._lock:
+            self._conn.execute("DELETE FROM sheet_rows WHERE sheet = ?", (sheet,))
+            self._conn.execute("DELETE FROM sheet_meta WHERE sheet = ?", (sheet,))
+
+class MirrorSync:
+    """
+    Brings mirror tables up to date from their worksheets. Sheets listed in
+    `append_only` (only ever appended to by the app) read just the rows past the
+    mirrored end, with a full diff every `full_every` seconds to pick up hand edits;
+    the others are re-read and diffed row by row. `call` wraps each worksheet call.
+    Readers use `values(sheet, max_age)`, which touches Sheets only when the mirror is
+    older than `max_age` or a save couldn't be written through (`record_write`).
+    """
+
+    def __init__(self, mirror, worksheets, call, append_only=(), full_every=FULL_RESYNC_SECONDS):
+        self.mirror = mirror
+        self._worksheets = dict(worksheets)
+        self._call = call
+        self._append_only = set(append_only)
+        self._full_every = full_every
+        self._locks = {name: threading.Lock() for name in self._worksheets}
+        self._stale = set()
+
+    def sync(self, sheet, full=False):
+        """Sync one sheet; returns the number of mirror rows written or removed."""
+        ws = self._worksheets[sheet]
+        with self._locks[sheet], span(f"mirror.sync.{sheet}"):
+            meta = self.mirror.meta(sheet)
+            tail_ok = (
+                not full and meta is not None and meta["header"] and sheet in self._append_only
+                and (time.time() - meta["full_synced_at"]) < self._full_every
+            )
+            if not tail_ok:
+                return self.mirror.load_full(sheet, self._call(ws.get_all_values))
+            start = meta["row_count"] + 1
+            end_col = rowcol_to_a1(1, len(meta["header"]))[:-1]
+            try:
+                rows = [list(r) for r in self._call(ws.get, f"A{start}:{end_col}")]
+            except APIError as e:
+                if not _past_grid(e):
+                    raise
+                rows = []   # the grid ends at the last mirrored row: nothing new
+            self.mirror.append(sheet, start, rows)
+            return len(rows)
+
+    def ensure_fresh(self, sheet, max_age):
+        """Sync `sheet` only if its mirror is missing, marked stale, or older than `max_age` seconds."""
+        meta = self.mirror.meta(sheet)
+        fresh = (
+            meta is not None and sheet not in self._stale
+            and (time.time() - meta["synced_at"]) <= max_age
+        )
+        cache_lookup(f"mirror.{sheet}", fresh)
+        if not fresh:
+            self._stale.discard(sheet)
+            self.sync(sheet)
+
+    def record_write(self, sheet, row_num, cells):
+        """
+        Mirror a row the app just wrote to `sheet`. Appends to append-only sheets, writes
+        with no known row number, and rows past the mirrored end (other rows landed first)
+        make the next read re-sync instead.
+        """
+        meta = self.mirror.meta(sheet)
+        past_end = meta is not None and row_num is not None and row_num > meta["row_count"] + 1
+        if row_num is None or sheet in self._append_only or past_end:
+            self._stale.add(sheet)
+        else:
+            self.mirror.put_row(sheet, row_num, cells)
+
+    def values(self, sheet, max_age):
+        """The mirrored `get_all_values()` shape, synced first only if older than `max_age` seconds."""
+        self.ensure_fresh(sheet, max_age)
+        return self.mirror.values(sheet)
@@ -1,18 +1,41 @@
 # main.py
-import time
 import os
+import tempfile
 from io import BytesIO
 from datetime import datetime
 
 import streamlit as st
 import gspread
-from google.oauth2.service_account import Credentials
 import pandas as pd
 import re
 from docx import Document
-from docx.shared import Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from descriptors import DESCRIPTORS
+from autosave import DraftAutosaver, DraftJournal
+from comparison import teacher_comparison
+from comparison_html import printable_comparison_html, write_campus_comparison_html
+from descriptors import DESCRIPTOR_MARKDOWN, DESCRIPTORS
+from drafts import DraftsStore, draft_headers
+from final_eval import (
+    EMPTY_FINAL_EVAL_STATE, FINAL_EVAL_HEADERS, build_final_eval_df, build_final_eval_states,
+    final_eval_domain_rows, final_eval_row_number, upsert_final_eval_row,
+)
+from formatting import format_age, safe_text, title_case_name
+from grid import GRID_PAGE_SIZES, grid_columns, grid_export, grid_page, grid_rows, highlight_ratings, page_count
+from identity import get_identity_cache
+from letters import (
+    DOCX_MIME, LetterTemplateError, final_evaluation_letter_record, generate_final_evaluation_docx,
+    letter_filename, write_letter_packet,
+)
+from mirror import MirrorSync, appended_row_number
+from pdf_reports import PDF_MIME, comparison_pdf, final_evaluation_pdf, write_pdf_packet
+from ratings import rating_key, rating_short, shorten_ratings
+from responses import build_responses_index
+from rubric import DOMAINS, RATINGS, response_headers
+from sheets import (
+    SheetSnapshot, call_metric_rows, get_sheet_mirror, get_sheets_gateway, get_spreadsheet,
+    get_users_directory, with_backoff,
+)
+from summary import build_teacher_summary
+from tracing import begin_fragment, cache_rows, get_tracer, section, timing_rows
 
 # =========================
 # GLOBAL CSS — step track, guidance boxes, ref badges
@@ -104,59 +127,6 @@ def show_reflection(label, text):
 # =========================
 # Helper functions
 # =========================
-def safe_text(value):
-    if value is None:
-        return ""
-    try:
-        if pd.isna(value):
-            return ""
-    except Exception:
-        pass
-    return str(value)
-
-def title_case_name(name: str) -> str:
-    return " ".join(part.capitalize() for part in safe_text(name).split())
-
-def highlight_ratings(val):
-    colors = {
-        "HE": "background-color: #a8e6a1;",
-        "E": "background-color: #d0f0fd;",
-        "IN": "background-color: #fff3b0;",
-        "DNMS": "background-color: #f8a5a5;",
-        "Highly Effective": "background-color: #a8e6a1;",
-        "Effective": "background-color: #d0f0fd;",
-        "Improvement Necessary": "background-color: #fff3b0;",
-        "Does Not Meet Standards": "background-color: #f8a5a5;",
-    }
-    return colors.get(val, "")
-
-def rating_rank(value):
-    order = {
-        "Does Not Meet Standards": 1, "Improvement Necessary": 2,
-        "Effective": 3, "Highly Effective": 4,
-        "DNMS": 1, "IN": 2, "E": 3, "HE": 4,
-    }
-    return order.get(str(value).strip(), 0)
-
-def rating_short(value):
-    mapping = {
-        "Highly Effective": "HE", "Effective": "E",
-        "Improvement Necessary": "IN", "Does Not Meet Standards": "DNMS",
-        "HE": "HE", "E": "E", "IN": "IN", "DNMS": "DNMS",
-    }
-    return mapping.get(str(value).strip(), str(value).strip())
-
-def trend_arrow(initial_value, final_value):
-    init_score = rating_rank(initial_value)
-    final_score = rating_rank(final_value)
-    if init_score == 0 or final_score == 0:
-        return ""
-    if final_score > init_score:
-        return "↑ Improved"
-    if final_score < init_score:
-        return "↓ Dropped"
-    return "→ No change"
-
 def trend_style(val):
     styles = {
         "↑ Improved": "background-color: #d9f2d9; color: #1f6f1f; font-weight: bold;",
@@ -165,57 +135,6 @@ def trend_style(val):
     }
     return styles.get(val, "")
 
-def build_initial_final_comparison(rows_df):
-    if rows_df.empty:
-        return None, None, pd.DataFrame()
-    working = rows_df.copy()
-    if "Assessment Cycle" not in working.columns:
-        working["Assessment Cycle"] = "Initial"
-    else:
-        working["Assessment Cycle"] = working["Assessment Cycle"].replace("", "Initial")
-
-    initial_rows = working[working["Assessment Cycle"] == "Initial"]
-    final_rows = working[working["Assessment Cycle"] == "Final"]
-
-    latest_initial = (
-        initial_rows.sort_values("Timestamp", ascending=False).head(1)
-        if not initial_rows.empty else None
-    )
-    latest_final = (
-        final_rows.sort_values("Timestamp", ascending=False).head(1)
-        if not final_rows.empty else None
-    )
-
-    comparison_rows = []
-    for domain, items in DOMAINS.items():
-        for code, label in items:
-            strand = f"{code} {label}"
-            init_val = ""
-            final_val = ""
-            if latest_initial is not None and not latest_initial.empty:
-                init_val = safe_text(latest_initial.iloc[0].get(strand, ""))
-            if latest_final is not None and not latest_final.empty:
-                final_val = safe_text(latest_final.iloc[0].get(strand, ""))
-            comparison_rows.append({
-                "Domain": domain.split(":")[0],
-                "Strand": strand,
-                "Explanation": DESCRIPTORS.get(strand, {}).get("HE", ""),
-                "Initial": rating_short(init_val),
-                "Final": rating_short(final_val),
-                "Trend": trend_arrow(init_val, final_val),
-            })
-
-    comparison_df = pd.DataFrame(comparison_rows)
-    return latest_initial, latest_final, comparison_df
-
-def rating_to_descriptor_key(rating_text):
-    mapping = {
-        "Highly Effective": "HE", "Effective": "E",
-        "Improvement Necessary": "IN", "Does Not Meet Standards": "DNMS",
-        "HE": "HE", "E": "E", "IN": "IN", "DNMS": "DNMS",
-    }
-    return mapping.get(safe_text(rating_text), "")
-
 def highlight_rating(val):
     color_map = {
         "HE": "#a8e6a1", "E": "#d0f0fd",
@@ -316,7 +235,7 @@ def add_summary_section_to_doc(doc, latest_record):
         for code, label in items:
             strand_key = f"{code} {label}"
             selected_rating = safe_text(latest_record.get(strand_key, ""))
-            descriptor_key = rating_to_descriptor_key(selected_rating)
+            descriptor_key = rating_key(selected_rating)
             explanation = ""
             if strand_key in DESCRIPTORS and descriptor_key in DESCRIPTORS[strand_key]:
                 explanation = safe_text(DESCRIPTORS[strand_key][descriptor_key])
@@ -342,228 +261,37 @@ def generate_teacher_docx(teacher_name, latest_df):
     out.seek(0)
     return out
 
-def generate_final_evaluation_docx(record: dict):
-    template_path = os.path.join(os.path.dirname(__file__), "..", "Copy of Letter template OIS JVLR.docx")
-    try:
-        doc = Document(template_path)
-    except Exception:
-        doc = Document()
-
-    teacher_name = title_case_name(record.get("Teacher Name", ""))
-    appraiser_name = title_case_name(record.get("Appraiser", ""))
-    subject_area = safe_text(record.get("Subject Area", ""))
-
-    if doc.paragraphs:
-        first_para = doc.paragraphs[0]
-        first_para.paragraph_format.space_before = Pt(0)
-        first_para.paragraph_format.space_after = Pt(0)
-
-    p = doc.add_paragraph()
-    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    p.paragraph_format.space_before = Pt(0)
-    p.paragraph_format.space_after = Pt(3)
-    run = p.add_run("FINAL EVALUATION SUMMARY")
-    run.bold = True
-    run.font.size = Pt(14)
-    doc.add_paragraph("")
-
-    for label_text, field in [
-        ("Teacher: ", "Teacher Name"),
-        ("Appraiser: ", "Appraiser"),
-        ("Subject Area: ", "Subject Area"),
-    ]:
-        p = doc.add_paragraph()
-        p.add_run(label_text).bold = True
-        p.add_run(title_case_name(record.get(field, "")) if field in ["Teacher Name", "Appraiser"] else safe_text(record.get(field, "")))
-
-    doc.add_paragraph("")
-
-    p = doc.add_paragraph()
-    run = p.add_run("Student Survey Feedback")
-    run.bold = True; run.font.size = Pt(12)
-    p = doc.add_paragraph()
-    p.add_run("Administered by the teacher each Semester").italic = True
-    doc.add_paragraph(safe_text(record.get("Student Survey Feedback", "")))
-    doc.add_paragraph("")
-
-    p = doc.add_paragraph()
-    run = p.add_run("Overall Reflection by the teacher on the school year")
-    run.bold = True; run.font.size = Pt(12)
-    doc.add_paragraph(safe_text(record.get("Overall Reflection", "")))
-    doc.add_paragraph("")
-
-    p = doc.add_paragraph()
-    run = p.add_run("Ratings on Individual Rubrics")
-    run.bold = True; run.font.size = Pt(12)
-
-    for col_name, label in final_eval_domain_rows():
-        p = doc.add_paragraph()
-        p.add_run(f"{label}: ").bold = True
-        p.add_run(safe_text(record.get(col_name, "")))
-
-    doc.add_paragraph("")
-
-    p = doc.add_paragraph()
-    run = p.add_run("Overall Rating")
-    run.bold = True; run.font.size = Pt(12)
-    p = doc.add_paragraph()
-    run = p.add_run(safe_text(record.get("Overall Rating", "")))
-    run.bold = True
-    doc.add_paragraph("")
-
-    p = doc.add_paragraph()
-    run = p.add_run("Overall Appraiser Comments")
-    run.bold = True; run.font.size = Pt(12)
-    doc.add_paragraph(safe_text(record.get("Overall Comments", "")))
-    doc.add_paragraph("")
-
-    p = doc.add_paragraph()
-    run = p.add_run("Sign Off")
-    run.bold = True; run.font.size = Pt(12)
-    p = doc.add_paragraph()
-    p.add_run(f"{appraiser_name} signed off on: ").bold = True
-    p.add_run(safe_text(record.get("Evaluator Sign Off Date", "")))
-    p = doc.add_paragraph()
-    p.add_run(f"{teacher_name} signed off on: ").bold = True
-    p.add_run(safe_text(record.get("Teacher Sign Off Date", "")))
-    doc.add_paragraph("")
-    doc.add_paragraph(
-        "The teacher's signature indicates that he or she has seen and discussed the evaluation; "
-        "it does not necessarily denote agreement with the report."
-    )
-
-    out = BytesIO()
-    doc.save(out)
-    out.seek(0)
-    return out
-
 def build_teacher_initial_final(email):
-    df = load_responses_df()
-    mine = df[df["Email"] == email.strip().lower()] if not df.empty else pd.DataFrame()
-    if mine.empty:
+    index = load_responses_index()
+    if not index.has(email):
         return None, None, pd.DataFrame()
-    if "Assessment Cycle" not in mine.columns:
-        mine["Assessment Cycle"] = "Initial"
-    else:
-        mine["Assessment Cycle"] = mine["Assessment Cycle"].replace("", "Initial")
-
-    initial_rows = mine[mine["Assessment Cycle"] == "Initial"]
-    final_rows = mine[mine["Assessment Cycle"] == "Final"]
-
-    latest_initial = (
-        initial_rows.sort_values("Timestamp", ascending=False).head(1)
-        if not initial_rows.empty else None
-    )
-    latest_final = (
-        final_rows.sort_values("Timestamp", ascending=False).head(1)
-        if not final_rows.empty else None
-    )
-
-    comparison_rows = []
-    for domain, items in DOMAINS.items():
-        for code, label in items:
-            strand = f"{code} {label}"
-            init_val = ""
-            final_val = ""
-            if latest_initial is not None and not latest_initial.empty:
-                init_val = safe_text(latest_initial.iloc[0].get(strand, ""))
-            if latest_final is not None and not latest_final.empty:
-                final_val = safe_text(latest_final.iloc[0].get(strand, ""))
-            comparison_rows.append({
-                "Domain": domain.split(":")[0],
-                "Strand": strand,
-                "Explanation": DESCRIPTORS.get(strand, {}).get("HE", ""),
-                "Initial": rating_short(init_val),
-                "Final": rating_short(final_val),
-                "Trend": trend_arrow(init_val, final_val),
-            })
-
-    comparison_df = pd.DataFrame(comparison_rows)
+    latest_initial = index.latest_frame(email, "Initial")
+    latest_final = index.latest_frame(email, "Final")
+    comparison_df = teacher_comparison(index, email)
     return latest_initial, latest_final, comparison_df
 
-def render_comparison_html(df):
-    if df.empty:
-        return "<p>No comparison data available.</p>"
-
-    rating_bg = {"HE": "#a8e6a1", "E": "#d0f0fd", "IN": "#fff3b0", "DNMS": "#f8a5a5"}
-    trend_bg = {
-        "↑ Improved": "#d9f2d9", "↓ Dropped": "#f8d7da",
-        "→ No change": "#eef2f7", "": "#ffffff",
-    }
-
-    html = """
-    <div style="overflow-x:auto;">
-      <table style="border-collapse:collapse;width:100%;table-layout:fixed;font-family:Arial,sans-serif;font-size:13px;">
-        <thead>
-          <tr style="background-color:#f5f6f7;">
-            <th style="border:1px solid #ddd;padding:8px;width:7%;text-align:left;">Domain</th>
-            <th style="border:1px solid #ddd;padding:8px;width:14%;text-align:left;">Strand</th>
-            <th style="border:1px solid #ddd;padding:8px;width:49%;text-align:left;">Explanation</th>
-            <th style="border:1px solid #ddd;padding:8px;width:8%;text-align:center;">Initial</th>
-            <th style="border:1px solid #ddd;padding:8px;width:8%;text-align:center;">Final</th>
-            <th style="border:1px solid #ddd;padding:8px;width:14%;text-align:center;">Trend</th>
-          </tr>
-        </thead>
-        <tbody>
-    """
-
-    for _, row in df.iterrows():
-        initial = safe_text(row.get("Initial", ""))
-        final = safe_text(row.get("Final", ""))
-        trend = safe_text(row.get("Trend", ""))
-        initial_bg = rating_bg.get(initial, "#ffffff")
-        final_bg = rating_bg.get(final, "#ffffff")
-        trend_bg_color = trend_bg.get(trend, "#ffffff")
-        explanation_html = safe_text(row.get("Explanation", "")).replace("\n", "<br>")
-
-        html += f"""
-          <tr>
-            <td style="border:1px solid #ddd;padding:8px;vertical-align:top;">{safe_text(row.get("Domain",""))}</td>
-            <td style="border:1px solid #ddd;padding:8px;vertical-align:top;">{safe_text(row.get("Strand",""))}</td>
-            <td style="border:1px solid #ddd;padding:8px;vertical-align:top;white-space:normal;word-wrap:break-word;overflow-wrap:break-word;line-height:1.4;">{explanation_html}</td>
-            <td style="border:1px solid #ddd;padding:8px;text-align:center;background:{initial_bg};font-weight:bold;">{initial}</td>
-            <td style="border:1px solid #ddd;padding:8px;text-align:center;background:{final_bg};font-weight:bold;">{final}</td>
-            <td style="border:1px solid #ddd;padding:8px;text-align:center;background:{trend_bg_color};font-weight:bold;">{trend}</td>
-          </tr>
-        """
-
-    html += "</tbody></table></div>"
-    return html
+def submitted_on(latest_df):
+    if latest_df is None or latest_df.empty:
+        return ""
+    return safe_text(latest_df.iloc[0].get("Timestamp", ""))
 
 def build_printable_comparison_html(teacher_name, teacher_email, appraiser, latest_initial, latest_final, display_df):
-    initial_date = ""
-    final_date = ""
-    if latest_initial is not None and not latest_initial.empty:
-        initial_date = safe_text(latest_initial.iloc[0].get("Timestamp", ""))
-    if latest_final is not None and not latest_final.empty:
-        final_date = safe_text(latest_final.iloc[0].get("Timestamp", ""))
-
-    table_html = render_comparison_html(display_df)
-    html = f"""
-    <html><head><title>{teacher_name} - Initial vs Final Comparison</title>
-    <style>
-        body{{font-family:Arial,sans-serif;margin:24px;color:#111;}}
-        h1{{font-size:24px;margin-bottom:8px;}}
-        h2{{font-size:18px;margin-top:0;margin-bottom:20px;color:#444;}}
-        .meta{{margin-bottom:20px;line-height:1.6;font-size:14px;}}
-        .meta strong{{display:inline-block;min-width:140px;}}
-        .print-btn{{margin-bottom:20px;}}
-        @media print{{.print-btn{{display:none;}}body{{margin:10mm;}}}}
-    </style></head>
-    <body>
-        <div class="print-btn"><button onclick="window.print()" style="padding:10px 16px;font-size:14px;cursor:pointer;">Print</button></div>
-        <h1>{teacher_name}</h1>
-        <h2>Initial vs Final Self-Assessment Comparison</h2>
-        <div class="meta">
-            <div><strong>Email:</strong> {teacher_email}</div>
-            <div><strong>Appraiser:</strong> {appraiser}</div>
-            <div><strong>Initial Submitted:</strong> {initial_date or "-"}</div>
-            <div><strong>Final Submitted:</strong> {final_date or "-"}</div>
-        </div>
-        {table_html}
-    </body></html>
-    """
-    return html
+    return printable_comparison_html(
+        teacher_name, teacher_email, appraiser,
+        submitted_on(latest_initial), submitted_on(latest_final), display_df,
+    )
+
+def comparison_pdf_download(teacher_name, teacher_email, appraiser, latest_initial, latest_final, display_df, key):
+    st.download_button(
+        "🖨️ Download Initial vs Final Comparison (PDF)",
+        data=comparison_pdf(
+            teacher_name, teacher_email, appraiser,
+            submitted_on(latest_initial), submitted_on(latest_final), display_df,
+        ),
+        file_name=f"{teacher_name}_initial_vs_final.pdf",
+        mime=PDF_MIME,
+        key=key,
+    )
 
 # =========================
 # FINAL EVALUATION HELPERS
@@ -578,16 +306,7 @@ def teacher_can_start_final_evaluation(email: str) -> bool:
     return user_has_submission(email, cycle="Final")
 
 def final_eval_expected_headers():
-    return [
-        "Timestamp", "Last Edited On", "Teacher Email", "Teacher Name",
-        "Appraiser", "Subject Area", "Student Survey Feedback", "Overall Reflection",
-        "Teacher Submitted", "Teacher Submitted On", "Appraiser Started",
-        "Appraiser Completed", "Appraiser Completed On",
-        "A Rating", "B Rating", "C Rating", "D Rating", "E Rating", "F Rating",
-        "Overall Rating", "Overall Comments",
-        "Evaluator Sign Off", "Evaluator Sign Off Date",
-        "Teacher Sign Off", "Teacher Sign Off Date",
-    ]
+    return list(FINAL_EVAL_HEADERS)
 
 @st.cache_resource
 def ensure_final_eval_headers_once():
@@ -603,82 +322,59 @@ def ensure_final_eval_headers_once():
         )
     return True
 
-@st.cache_data(ttl=180)
+@st.cache_resource
+def final_eval_snapshot():
+    # Resolved here so the background refresh thread never calls into Streamlit's caches
+    sync = get_mirror_sync()
+    return SheetSnapshot(
+        lambda: build_final_eval_df(sync.values(FINAL_EVAL_SHEET_NAME, FINAL_EVAL_TTL_SECONDS), final_eval_expected_headers()),
+        ttl=FINAL_EVAL_TTL_SECONDS,
+        name="final_eval",
+    )
+
 def load_final_eval_df():
-    vals = with_backoff(FINAL_EVAL_WS.get_all_values)
-    if not vals:
-        return pd.DataFrame(columns=final_eval_expected_headers())
-    header, rows = vals[0], vals[1:]
-    df = pd.DataFrame(rows, columns=header) if rows else pd.DataFrame(columns=header)
-    if "Teacher Email" in df.columns:
-        df["Teacher Email"] = df["Teacher Email"].astype(str).str.strip().str.lower()
-    if "Appraiser" in df.columns:
-        df["Appraiser"] = df["Appraiser"].astype(str).str.strip().str.lower()
-    return df
+    return final_eval_snapshot().get()
+
+def final_eval_states():
+    """Teacher email -> FinalEvaluationState, rebuilt only when the FinalEvaluation snapshot changes."""
+    return final_eval_snapshot().derived("states", build_final_eval_states)
+
+def final_eval_state(teacher_email: str):
+    return final_eval_states().get(safe_text(teacher_email).strip().lower(), EMPTY_FINAL_EVAL_STATE)
 
 def get_teacher_final_eval_record(teacher_email: str):
-    df = load_final_eval_df()
-    if df.empty:
-        return {}
-    teacher_email = teacher_email.strip().lower()
-    rows = df[df["Teacher Email"] == teacher_email]
-    if rows.empty:
-        return {}
-    if "Timestamp" in rows.columns:
-        rows = rows.sort_values("Timestamp", ascending=False)
-    return dict(rows.iloc[0])
+    return final_eval_state(teacher_email).record
 
 def save_final_eval_record(record: dict):
     headers = final_eval_expected_headers()
-    df = load_final_eval_df()
     teacher_email = safe_text(record.get("Teacher Email", "")).strip().lower()
     row_values = [record.get(col, "") for col in headers]
-    if not df.empty and "Teacher Email" in df.columns:
-        matches = df[df["Teacher Email"].astype(str).str.strip().str.lower() == teacher_email]
-        if not matches.empty:
-            row_num = matches.index[0] + 2
+    snapshot = final_eval_snapshot()
+    with snapshot.write_lock:
+        row_num = final_eval_row_number(snapshot.get(), teacher_email)
+        if row_num is not None:
             with_backoff(FINAL_EVAL_WS.update, f"A{row_num}:Y{row_num}", [row_values])
-            load_final_eval_df.clear()
-            return
-    with_backoff(FINAL_EVAL_WS.append_row, row_values, value_input_option="USER_ENTERED")
-    load_final_eval_df.clear()
+            get_mirror_sync().record_write(FINAL_EVAL_SHEET_NAME, row_num, row_values)
+        else:
+            response = with_backoff(FINAL_EVAL_WS.append_row, row_values, value_input_option="USER_ENTERED")
+            row_num = appended_row_number(response)
+            get_mirror_sync().record_write(FINAL_EVAL_SHEET_NAME, row_num, row_values)
+        snapshot.patch(lambda df: upsert_final_eval_row(df, headers, row_values, row_num))
 
 def teacher_final_eval_completed(teacher_email: str) -> bool:
-    rec = get_teacher_final_eval_record(teacher_email)
-    return safe_text(rec.get("Teacher Submitted", "")).strip().lower() == "yes"
+    return final_eval_state(teacher_email).teacher_submitted
 
 def appraiser_final_eval_completed(teacher_email: str) -> bool:
-    rec = get_teacher_final_eval_record(teacher_email)
-    return safe_text(rec.get("Appraiser Completed", "")).strip().lower() == "yes"
+    return final_eval_state(teacher_email).appraiser_completed
 
 def evaluator_signed_off(teacher_email: str) -> bool:
-    rec = get_teacher_final_eval_record(teacher_email)
-    return safe_text(rec.get("Evaluator Sign Off", "")).strip().lower() == "yes"
+    return final_eval_state(teacher_email).evaluator_signed_off
 
 def teacher_signed_off_final_eval(teacher_email: str) -> bool:
-    rec = get_teacher_final_eval_record(teacher_email)
-    return safe_text(rec.get("Teacher Sign Off", "")).strip().lower() == "yes"
-
-def final_eval_domain_rows():
-    return [
-        ("A Rating", "A. Planning and Preparation for Learning"),
-        ("B Rating", "B. Classroom Management"),
-        ("C Rating", "C. Delivery of Instruction"),
-        ("D Rating", "D. Monitoring, Assessment, and Follow-Up"),
-        ("E Rating", "E. Family and Community Outreach"),
-        ("F Rating", "F. Professional Responsibilities"),
-    ]
+    return final_eval_state(teacher_email).teacher_signed_off
 
 def teacher_started_final_evaluation(teacher_email: str) -> bool:
-    rec = get_teacher_final_eval_record(teacher_email)
-    if not rec:
-        return False
-    return any([
-        safe_text(rec.get("Teacher Submitted", "")).strip().lower() == "yes",
-        safe_text(rec.get("Subject Area", "")).strip() != "",
-        safe_text(rec.get("Student Survey Feedback", "")).strip() != "",
-        safe_text(rec.get("Overall Reflection", "")).strip() != "",
-    ])
+    return final_eval_state(teacher_email).teacher_started
 
 def teacher_can_edit_final_self_assessment(teacher_email: str) -> bool:
     if not user_has_submission(teacher_email, cycle="Final"):
@@ -691,22 +387,7 @@ def domain_letter_from_strand(strand_code: str) -> str:
     return safe_text(strand_code).split()[0][:1]
 
 def get_full_appraiser_name(appraiser_value: str) -> str:
-    raw = safe_text(appraiser_value).strip()
-    if not raw:
-        return "Not Assigned"
-    parts = [p.strip().lower() for p in raw.split(",") if p.strip()]
-    if not parts:
-        return raw
-    matched_names = []
-    for part in parts:
-        match = users_df[
-            users_df["Name"].astype(str).str.strip().str.lower().str.split().str[0] == part
-        ]
-        if not match.empty:
-            matched_names.extend(match["Name"].astype(str).tolist())
-        else:
-            matched_names.append(part.title())
-    return ", ".join(dict.fromkeys(matched_names))
+    return get_users_directory().index().full_appraiser_name(safe_text(appraiser_value))
 
 def render_final_evaluation_review_panel(record: dict, heading: str = "Appraiser Review"):
     rating_colour_map = {
@@ -761,11 +442,8 @@ def render_final_evaluation_review_panel(record: dict, heading: str = "Appraiser
 # =========================
 st.set_page_config(page_title="OIS Teacher Appraisal", layout="wide")
 
-try:
-    from googleapiclient.errors import HttpError
-except Exception:
-    class HttpError(Exception):
-        pass
+rerun_trace = get_tracer().begin_rerun()
+section("startup")
 
 def _rerun():
     try:
@@ -776,11 +454,22 @@ def _rerun():
 # =========================
 # CONFIG
 # =========================
-SPREADSHEET_ID = "1kqcfnMx4KhqQvFljsTwSOcmuEHnkLAdwp_pUJypOjpY"
-SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
 ENABLE_REFLECTIONS = True
 CURRENT_ASSESSMENT_CYCLE = "Final"   # "Initial" or "Final"
 FINAL_EVAL_SHEET_NAME = "FinalEvaluation"
+# Full re-reads only happen on expiry; our own writes patch the cached copy.
+RESPONSES_TTL_SECONDS = 180
+FINAL_EVAL_TTL_SECONDS = 180
+
+# Draft edits are journalled locally and flushed to the Drafts sheet at most this often per teacher
+AUTOSAVE_DRAFTS = True
+AUTOSAVE_FLUSH_SECONDS = 20
+AUTOSAVE_JOURNAL_PATH = os.path.join(os.path.dirname(__file__), "..", ".autosave", "drafts_journal.sqlite3")
+
+# Bulk exports are built into temp files, deleted once downloaded; ones abandoned with
+# their session are swept by the next build after this long
+PACKET_PREFIX = "final_evaluations_"
+PACKET_MAX_AGE_SECONDS = 3600
 
 FINAL_EVAL_TEACHER_DEADLINE = datetime(2026, 4, 30, 23, 59, 59)
 FINAL_EVAL_APPRAISER_DEADLINE = datetime(2026, 5, 20, 23, 59, 59)
@@ -814,82 +503,12 @@ def fmt_ist(dt_value):
     txt = safe_text(dt_value)
     return txt if txt else "-"
 
-# =========================
-# DOMAINS & SUB-STRANDS
-# =========================
-DOMAINS = {
-    "A: Planning and Preparation for Learning": [
-        ("A1", "Expertise"), ("A2", "Goals"), ("A3", "Units"),
-        ("A4", "Assessments"), ("A5", "Anticipation"), ("A6", "Lessons"),
-        ("A7", "Materials"), ("A8", "Differentiation"), ("A9", "Environment"),
-    ],
-    "B: Classroom Management": [
-        ("B1", "Expectations"), ("B2", "Relationships"), ("B3", "Social Emotional"),
-        ("B4", "Routines"), ("B5", "Responsibility"), ("B6", "Repertoire"),
-        ("B7", "Prevention"), ("B8", "Incentives"),
-    ],
-    "C: Delivery of Instruction": [
-        ("C1", "Expectations"), ("C2", "Mindset"), ("C3", "Framing"),
-        ("C4", "Connections"), ("C5", "Clarity"), ("C6", "Repertoire"),
-        ("C7", "Engagement"), ("C8", "Differentiation"), ("C9", "Nimbleness"),
-    ],
-    "D: Monitoring, Assessment, and Follow-Up": [
-        ("D1", "Criteria"), ("D2", "Diagnosis"), ("D3", "Goals"),
-        ("D4", "Feedback"), ("D5", "Recognition"), ("D6", "Analysis"),
-        ("D7", "Tenacity"), ("D8", "Support"), ("D9", "Reflection"),
-    ],
-    "E: Family and Community Outreach": [
-        ("E1", "Respect"), ("E2", "Belief"), ("E3", "Expectations"),
-        ("E4", "Communication"), ("E5", "Involving"), ("E6", "Responsiveness"),
-        ("E7", "Reporting"), ("E8", "Outreach"), ("E9", "Resources"),
-    ],
-    "F: Professional Responsibility": [
-        ("F1", "Language"), ("F2", "Reliability"), ("F3", "Professionalism"),
-        ("F4", "Judgement"), ("F5", "Teamwork"), ("F6", "Leadership"),
-        ("F7", "Openness"), ("F8", "Collaboration"), ("F9", "Growth"),
-    ],
-}
-
-RATINGS = [
-    "Highly Effective", "Effective",
-    "Improvement Necessary", "Does Not Meet Standards",
-]
-
-# =========================
-# Retry/backoff for Sheets
-# =========================
-def with_backoff(fn, *args, **kwargs):
-    max_attempts = 5
-    delay = 0.6
-    last_exc = None
-    for _ in range(max_attempts):
-        try:
-            return fn(*args, **kwargs)
-        except HttpError as e:
-            status = getattr(e, "status_code", None)
-            if status in (429, 500, 502, 503, 504):
-                time.sleep(delay); delay *= 2; last_exc = e; continue
-            raise
-        except gspread.exceptions.APIError as e:
-            msg = str(e).lower()
-            if any(code in msg for code in ["429", "500", "502", "503", "504"]):
-                time.sleep(delay); delay *= 2; last_exc = e; continue
-            raise
-        except Exception as e:
-            time.sleep(delay); delay *= 2; last_exc = e; continue
-    if last_exc:
-        raise last_exc
-    return fn(*args, **kwargs)
-
 # =========================
 # Google Sheet Connections
 # =========================
 @st.cache_resource
 def get_worksheets():
-    client = gspread.authorize(
-        Credentials.from_service_account_info(st.secrets["google"], scopes=SCOPES)
-    )
-    sh = client.open_by_key(SPREADSHEET_ID)
+    sh = get_spreadsheet()
     resp_ws = sh.worksheet("Responses")
     users_ws = sh.worksheet("Users")
     try:
@@ -905,22 +524,93 @@ def get_worksheets():
 
 RESP_WS, USERS_WS, DRAFTS_WS, FINAL_EVAL_WS = get_worksheets()
 
+@st.cache_resource
+def get_mirror_sync():
+    # Responses is only ever appended to, so routine syncs read just the new rows.
+    return MirrorSync(
+        get_sheet_mirror(),
+        {"Responses": RESP_WS, "Drafts": DRAFTS_WS, FINAL_EVAL_SHEET_NAME: FINAL_EVAL_WS},
+        call=with_backoff,
+        append_only={"Responses"},
+    )
+
 # =========================
 # DRAFT HELPERS
 # =========================
+@st.cache_resource
+def get_drafts_store():
+    store = DraftsStore(
+        DRAFTS_WS, draft_headers(DOMAINS, ENABLE_REFLECTIONS), call=with_backoff, mirror_sync=get_mirror_sync()
+    )
+    if not store.ensure_headers():
+        st.warning(
+            "The existing header row in **Drafts** does not match the current rubric. "
+            "Saved drafts may load into the wrong strands if the rubric changed."
+        )
+    return store
+
+@st.cache_resource
+def get_draft_autosaver():
+    return DraftAutosaver(
+        DraftJournal(AUTOSAVE_JOURNAL_PATH), get_drafts_store(), interval=AUTOSAVE_FLUSH_SECONDS
+    )
+
+def autosave_field(field, widget_key):
+    """Widget on_change callback: journal the new value locally; the autosaver flushes it later."""
+    email = st.session_state.get("auth_email")
+    if AUTOSAVE_DRAFTS and email:
+        get_draft_autosaver().record(email, field, st.session_state.get(widget_key) or "")
+
+# =========================
+# SELF-ASSESSMENT FORM STATE
+# =========================
+def form_fields():
+    """(draft field, widget key) for every strand radio and reflection box, in sheet order."""
+    fields = []
+    for domain, items in DOMAINS.items():
+        for code, label in items:
+            fields.append((f"{code} {label}", f"{code}-{label}"))
+        if ENABLE_REFLECTIONS:
+            fields.append((f"Reflection-{domain}", f"refl-{domain}"))
+    return fields
+
+def seed_form_state(email):
+    """
+    Session state is the form's source of truth: the saved draft is read once per
+    session into `form_values`, which the widget callbacks keep current. Widget keys
+    Streamlit dropped while another page was open are restored from it.
+    """
+    if st.session_state.get("form_values_for") != email:
+        st.session_state.form_draft = load_draft(email) or {}
+        st.session_state.form_values = dict(st.session_state.form_draft)
+        st.session_state.form_values_for = email
+    values = st.session_state.form_values
+    for field, key in form_fields():
+        if key in st.session_state:
+            continue
+        value = values.get(field, "")
+        if field.startswith("Reflection-") or value in RATINGS:
+            st.session_state[key] = value
+        else:
+            values[field] = ""   # not a rating; the radio starts unselected
+
+def form_field_changed(field, widget_key):
+    """Widget on_change callback for the self-assessment form."""
+    st.session_state.form_values[field] = st.session_state.get(widget_key) or ""
+    autosave_field(field, widget_key)
+
+def form_rated_count():
+    return sum(1 for _, items in DOMAINS.items() for code, label in items if st.session_state.get(f"{code}-{label}"))
+
 def save_draft(email, form_data):
     try:
-        all_drafts = DRAFTS_WS.get_all_records()
-        emails = [row["Email"] for row in all_drafts]
-        row_data = [email] + [form_data.get(f, "") for f in form_data.keys()]
-        if email in emails:
-            row_num = emails.index(email) + 2
-            DRAFTS_WS.update(f"A{row_num}", [row_data])
+        if AUTOSAVE_DRAFTS:
+            autosaver = get_draft_autosaver()
+            for field, value in form_data.items():
+                autosaver.record(email, field, value)
+            autosaver.flush(email)
         else:
-            if not all_drafts:
-                headers = ["Email"] + list(form_data.keys())
-                DRAFTS_WS.append_row(headers, value_input_option="USER_ENTERED")
-            DRAFTS_WS.append_row(row_data, value_input_option="USER_ENTERED")
+            get_drafts_store().save(email, form_data)
         return True
     except Exception as e:
         st.error(f"⚠️ Could not save draft: {e}")
@@ -928,26 +618,19 @@ def save_draft(email, form_data):
 
 def load_draft(email):
     try:
-        all_drafts = pd.DataFrame(DRAFTS_WS.get_all_records())
-        user_draft = all_drafts[all_drafts["Email"] == email]
-        if not user_draft.empty:
-            return dict(user_draft.iloc[0])
+        draft = get_drafts_store().load(email)
+        if AUTOSAVE_DRAFTS:
+            # Edits still waiting in the local journal win over the sheet copy
+            draft.update(get_draft_autosaver().pending(email))
+        return draft
     except Exception:
         return {}
-    return {}
 
 # =========================
 # HEADER MANAGEMENT
 # =========================
 def expected_headers():
-    headers = ["Timestamp", "Email", "Name", "Appraiser", "Assessment Cycle"]
-    for domain, items in DOMAINS.items():
-        for code, label in items:
-            headers.append(f"{code} {label}")
-        if ENABLE_REFLECTIONS:
-            headers.append(f"{domain} Reflection")
-    headers.append("Last Edited On")
-    return headers
+    return response_headers(ENABLE_REFLECTIONS)
 
 @st.cache_resource
 def ensure_headers_once():
@@ -967,109 +650,376 @@ ensure_headers_once()
 ensure_final_eval_headers_once()
 
 # =========================
-# USERS: load once
+# USERS (shared directory, refreshed on TTL when the sheet changes)
 # =========================
-def _pick_col(candidates, cols):
-    norm_map = {c.strip().lower(): c for c in cols}
-    for want in candidates:
-        key = want.strip().lower()
-        if key in norm_map:
-            return norm_map[key]
-    for c in cols:
-        cl = c.strip().lower()
-        if any(w in cl for w in candidates):
-            return c
-    return None
+def load_users_df():
+    return get_users_directory().df()
 
-@st.cache_resource
-def load_users_once_df():
-    records = with_backoff(USERS_WS.get_all_records)
-    if not records:
-        return pd.DataFrame(columns=["Email", "Name", "Appraiser", "Role", "Password", "Campus"])
-    df = pd.DataFrame(records)
-    if df.empty:
-        return pd.DataFrame(columns=["Email", "Name", "Appraiser", "Role", "Password", "Campus"])
-    cols = list(df.columns)
-    email_header     = _pick_col(["email", "school email", "work email", "ois email", "e-mail"], cols)
-    name_header      = _pick_col(["name", "full name", "teacher name", "staff name"], cols)
-    appraiser_header = _pick_col(["appraiser", "line manager", "manager", "appraiser name", "supervisor"], cols)
-    role_header      = _pick_col(["role", "access", "admin"], cols)
-    password_header  = _pick_col(["password", "pwd", "pass"], cols)
-    campus_header    = _pick_col(["campus"], cols)
-    out = pd.DataFrame()
-    out["Email"] = (
-        df[email_header].astype(str).str.strip().str.lower() if email_header else ""
-    )
-    out["Name"] = (
-        df[name_header].astype(str).str.strip() if name_header else ""
-    )
-    out["Appraiser"] = (
-        df[appraiser_header].astype(str).str.strip().replace({"": "Not Assigned"})
-        if appraiser_header else "Not Assigned"
-    )
-    out["Role"] = (
-        df[role_header].astype(str).str.strip().str.lower() if role_header else ""
-    )
-    out["Password"] = (
-        df[password_header].astype(str).str.strip() if password_header else ""
-    )
-    out["Campus"] = (
-        df[campus_header].astype(str).str.strip() if campus_header else ""
-    )
-    return out
+users_idx = get_users_directory().index()
 
-users_df = load_users_once_df()
+def find_user(email):
+    """The Users row for `email` as a dict, or {} if they are not in the sheet."""
+    return get_users_directory().lookup(email) or {}
 
 # =========================
 # RESPONSES cache
 # =========================
-@st.cache_data(ttl=180)
+@st.cache_resource
+def responses_snapshot():
+    sync = get_mirror_sync()   # resolved once; see final_eval_snapshot
+    return SheetSnapshot(
+        lambda: build_responses_index(sync.values("Responses", RESPONSES_TTL_SECONDS)),
+        ttl=RESPONSES_TTL_SECONDS,
+        name="responses",
+    )
+
+def load_responses_index():
+    return responses_snapshot().get()
+
 def load_responses_df():
-    vals = with_backoff(RESP_WS.get_all_values)
-    if not vals:
-        return pd.DataFrame()
-    header, rows = vals[0], vals[1:]
-    df = pd.DataFrame(rows, columns=header) if rows else pd.DataFrame(columns=header)
-    if "Email" in df.columns:
-        df["Email"] = df["Email"].astype(str).str.lower()
-    if "Assessment Cycle" not in df.columns:
-        df["Assessment Cycle"] = "Initial"
-    else:
-        df["Assessment Cycle"] = df["Assessment Cycle"].replace("", "Initial")
-    return df
+    return load_responses_index().df
+
+def append_response_row(row):
+    snapshot = responses_snapshot()
+    with snapshot.write_lock:
+        response = with_backoff(RESP_WS.append_row, row, value_input_option="USER_ENTERED")
+        get_mirror_sync().record_write("Responses", appended_row_number(response), row)
+        snapshot.patch(lambda index: index.appended(row))
 
 def user_has_submission(email: str, cycle: str | None = None) -> bool:
     if not email:
         return False
-    df = load_responses_df()
-    if df.empty or "Email" not in df.columns:
-        return False
-    filtered = df[df["Email"] == email.strip().lower()]
-    if cycle is not None and "Assessment Cycle" in df.columns:
-        filtered = filtered[filtered["Assessment Cycle"] == cycle]
-    return not filtered.empty
+    return load_responses_index().has(email, cycle)
+
+# =========================
+# Summary of Teachers (Admin & Super Admin)
+# =========================
+def render_teacher_summary(assigned):
+    summary_df = build_teacher_summary(assigned, load_responses_df(), final_eval_states())
+    total_count = len(summary_df)
+    initial_submitted_count = int((summary_df["Initial Status"] == "✅ Submitted").sum())
+    final_submitted_count = int((summary_df["Final Status"] == "✅ Submitted").sum())
+    st.markdown(
+        f"**Initial:** {initial_submitted_count}/{total_count} submitted "
+        f"({round((initial_submitted_count/total_count)*100, 1) if total_count else 0}%)"
+    )
+    st.progress(initial_submitted_count / total_count if total_count else 0)
+    st.markdown(
+        f"**Final:** {final_submitted_count}/{total_count} submitted "
+        f"({round((final_submitted_count/total_count)*100, 1) if total_count else 0}%)"
+    )
+    st.progress(final_submitted_count / total_count if total_count else 0)
+    st.dataframe(summary_df, use_container_width=True)
+
+# =========================
+# Self-Assessment Grid (Admin & Super Admin)
+# =========================
+def render_submissions_grid(assigned, key_prefix, csv_name, empty_message):
+    index = load_responses_index()
+    emails = assigned["Email"].str.strip().str.lower().tolist()
+
+    c1, c2, c3 = st.columns([1, 2, 1])
+    with c1:
+        cycle_choice = st.selectbox("Cycle", ["Initial & Final", "Initial", "Final"], key=f"{key_prefix}_grid_cycle")
+        latest_only = st.checkbox("Latest submission only", value=True, key=f"{key_prefix}_grid_latest")
+    with c2:
+        domain_choice = st.selectbox("Domain", ["All domains"] + list(DOMAINS), key=f"{key_prefix}_grid_domain")
+        include_reflections = st.checkbox("Show reflections", value=False, key=f"{key_prefix}_grid_reflections")
+    with c3:
+        page_size = st.selectbox("Rows per page", GRID_PAGE_SIZES, key=f"{key_prefix}_grid_page_size")
+
+    cycles = None if cycle_choice == "Initial & Final" else [cycle_choice]
+    labels = grid_rows(index, emails, cycles=cycles, latest_only=latest_only)
+    if not labels:
+        st.info(empty_message)
+        return
+    columns, rating_cols = grid_columns(
+        DOMAINS, None if domain_choice == "All domains" else [domain_choice], include_reflections
+    )
+
+    pages = page_count(len(labels), page_size)
+    page_key = f"{key_prefix}_grid_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages   # filters shrank the grid
+    page = st.number_input(
+        f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1, key=page_key
+    ) if pages > 1 else 1
+    page_df = grid_page(index.df, labels, columns, rating_cols, int(page), page_size)
+    styled_df = page_df.style.map(highlight_ratings, subset=[c for c in rating_cols if c in page_df.columns])
+    st.dataframe(styled_df, use_container_width=True, hide_index=True)
+    st.caption(f"Showing {len(page_df)} of {len(labels)} submission(s).")
+
+    # The full-table CSV is only built on request, and kept while filters and data stay the same
+    csv_state = f"{key_prefix}_grid_csv_data"
+    export_key = (responses_snapshot().version, tuple(labels), tuple(columns))
+    prepared = st.session_state.get(csv_state)
+    if prepared is not None and prepared[0] != export_key:
+        st.session_state.pop(csv_state)
+        prepared = None
+    if prepared is None and st.button("📄 Prepare CSV of all rows", key=f"{key_prefix}_grid_csv_prepare"):
+        data = grid_export(index.df, labels, columns, rating_cols).to_csv(index=False).encode("utf-8")
+        prepared = st.session_state[csv_state] = (export_key, data)
+    if prepared is not None:
+        st.download_button(
+            "📥 Download Grid (CSV)",
+            data=prepared[1],
+            file_name=csv_name,
+            mime="text/csv",
+            key=f"{key_prefix}_grid_csv",
+        )
+
+# =========================
+# Bulk export: Final Evaluation letters & printable comparisons (Admin & Super Admin)
+# =========================
+def _packet_file(path_key, suffix, mode="wb"):
+    """Fresh temp file for a packet build; replaces (and deletes) the session's previous one."""
+    _discard_packet(path_key)
+    _sweep_packets()
+    fd, path = tempfile.mkstemp(prefix=PACKET_PREFIX, suffix=suffix)
+    st.session_state[path_key] = path
+    return os.fdopen(fd, mode, encoding=None if "b" in mode else "utf-8")
+
+def _discard_packet(path_key):
+    path = st.session_state.pop(path_key, None)
+    if path and os.path.exists(path):
+        os.remove(path)
+
+def _sweep_packets():
+    """Delete packets older than PACKET_MAX_AGE_SECONDS, left behind by sessions that never downloaded them."""
+    cutoff = datetime.now().timestamp() - PACKET_MAX_AGE_SECONDS
+    folder = tempfile.gettempdir()
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        try:
+            if name.startswith(PACKET_PREFIX) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass   # another process swept it first
+
+def packet_download(path_key, label, file_name, mime, key):
+    """Download button for the session's built packet; downloading it deletes the temp file."""
+    path = st.session_state.get(path_key)
+    if not path or not os.path.exists(path):
+        return
+    with open(path, "rb") as packet:
+        st.download_button(
+            label, data=packet, file_name=file_name, mime=mime, key=key,
+            on_click=_discard_packet, args=(path_key,),
+        )
+
+def letter_docx_download(record, teacher_name, key):
+    """DOCX download button for one letter, or an error if the letterhead template can't be opened."""
+    try:
+        final_docx = generate_final_evaluation_docx(record)
+    except LetterTemplateError as e:
+        st.error(f"⚠️ {e} The DOCX letter is unavailable until the template is restored.")
+        return
+    st.download_button(
+        "📄 Download Final Evaluation Summary (DOCX)",
+        data=final_docx,
+        file_name=letter_filename(teacher_name),
+        mime=DOCX_MIME,
+        key=key,
+    )
+
+def render_letter_packet_export(assigned, fallback_appraiser, key_prefix):
+    st.markdown("#### Final Evaluation letters")
+    states = final_eval_states()
+    signed = []
+    for teacher in assigned[["Name", "Email"]].to_dict("records"):
+        state = states.get(teacher["Email"])
+        if state is not None and state.teacher_signed_off:
+            signed.append(final_evaluation_letter_record(state.record, teacher["Name"], fallback_appraiser))
+    if not signed:
+        st.info("No signed-off Final Evaluations yet for these teachers.")
+        return
+
+    appraisers = sorted({r["Appraiser"] for r in signed if r["Appraiser"]})
+    scope = st.selectbox("Letters for", ["All teachers listed"] + appraisers, key=f"{key_prefix}_packet_scope")
+    chosen = signed if scope == "All teachers listed" else [r for r in signed if r["Appraiser"] == scope]
+    st.caption(f"{len(chosen)} signed-off letter(s) in this packet.")
+
+    label = "all" if scope == "All teachers listed" else re.sub(r"\W+", "_", scope).strip("_")
+    col_zip, col_pdf = st.columns(2)
+    with col_zip:
+        path_key = f"{key_prefix}_packet_path"
+        if st.button("📦 Build ZIP of DOCX letters", key=f"{key_prefix}_packet_build"):
+            bar = st.progress(0.0, text=f"0/{len(chosen)} letters")
+            try:
+                with _packet_file(path_key, ".zip") as out:
+                    write_letter_packet(
+                        chosen, out,
+                        progress=lambda done, total: bar.progress(done / total, text=f"{done}/{total} letters"),
+                    )
+            except LetterTemplateError as e:
+                _discard_packet(path_key)
+                st.error(f"⚠️ {e} No letters were packed.")
+        packet_download(
+            path_key, "📥 Download letters (ZIP)", f"{label}_final_evaluations.zip",
+            "application/zip", key=f"{key_prefix}_packet_download",
+        )
+    with col_pdf:
+        path_key = f"{key_prefix}_packet_pdf_path"
+        if st.button("🖨️ Build PDFs (one per appraiser)", key=f"{key_prefix}_packet_pdf_build"):
+            bar = st.progress(0.0, text=f"0/{len(chosen)} letters")
+            by_appraiser = {}
+            for r in chosen:
+                by_appraiser.setdefault(r["Appraiser"] or "Unassigned", []).append(r)
+            with _packet_file(path_key, ".zip") as out:
+                write_pdf_packet(
+                    (
+                        (appraiser, ((r["Teacher Name"], final_evaluation_pdf(r)) for r in rows))
+                        for appraiser, rows in sorted(by_appraiser.items())
+                    ),
+                    out,
+                    progress=lambda done: bar.progress(done / len(chosen), text=f"{done}/{len(chosen)} letters"),
+                )
+        packet_download(
+            path_key, "📥 Download letters (PDFs, ZIP)", f"{label}_final_evaluations_pdf.zip",
+            "application/zip", key=f"{key_prefix}_packet_pdf_download",
+        )
+
+def campus_comparisons(assigned):
+    """(name, email, appraiser, initial date, final date, comparison frame) per teacher with a submission, built lazily."""
+    index = load_responses_index()
+    for teacher in assigned[["Name", "Email"]].to_dict("records"):
+        email = safe_text(teacher["Email"]).strip().lower()
+        if not index.has(email):
+            continue
+        latest_initial = index.latest_frame(email, "Initial")
+        latest_final = index.latest_frame(email, "Final")
+        yield (
+            teacher["Name"], email,
+            safe_text((index.latest_row(email) or {}).get("Appraiser", "")),
+            submitted_on(latest_initial), submitted_on(latest_final),
+            teacher_comparison(index, email),
+        )
+
+def render_campus_comparison_export(assigned, key_prefix):
+    st.markdown("#### Initial vs Final comparisons")
+    st.caption("One printable page per teacher with a submission – open the file and use Print / Save as PDF.")
+    path_key = f"{key_prefix}_comparison_html_path"
+    if st.button("🖨️ Build printable comparisons (HTML)", key=f"{key_prefix}_comparison_html_build"):
+        with st.spinner("Rendering comparisons…"):
+            with _packet_file(path_key, ".html", mode="w") as out:
+                count = write_campus_comparison_html(campus_comparisons(assigned), out)
+        st.caption(f"{count} teacher(s) included.")
+    packet_download(
+        path_key, "📥 Download printable comparisons (HTML)", "initial_vs_final_comparisons.html",
+        "text/html", key=f"{key_prefix}_comparison_html_download",
+    )
+
+# =========================
+# Cache invalidation (targeted – never clear other sessions' caches)
+# =========================
+def invalidate_dataset(name, email=None):
+    """Drop one shared dataset (or, for Drafts, one teacher's row) so it is re-read on next use."""
+    if name == "Users":
+        get_users_directory().invalidate()
+    elif name == "Responses":
+        get_mirror_sync().sync("Responses", full=True)   # also picks up hand edits to older rows
+        responses_snapshot().invalidate()
+    elif name == "FinalEvaluation":
+        get_mirror_sync().sync(FINAL_EVAL_SHEET_NAME)
+        final_eval_snapshot().invalidate()
+    elif name == "Drafts":
+        get_drafts_store().forget(email)
+
+def logout_current_session():
+    """Clear only this browser session: its token, identity and widget state."""
+    token = st.session_state.get("token") or {}
+    if token.get("access_token"):
+        get_identity_cache().discard(token["access_token"])
+    email = st.session_state.get("auth_email")
+    if AUTOSAVE_DRAFTS and email:
+        try:
+            get_draft_autosaver().flush(email)
+        except Exception:
+            pass  # still journalled locally; the background flusher retries
+    st.session_state.clear()
 
 # =========================
 # Authentication
 # =========================
 def authenticate_user(email, password):
     email = email.strip().lower()
-    user_row = users_df[users_df["Email"].str.lower() == email]
-    if user_row.empty:
+    user_row = find_user(email)
+    if not user_row:
         return None, None
-    role = user_row.iloc[0]["Role"].strip().lower()
+    role = user_row["Role"].strip().lower()
     if role == "admin":
-        return ("admin", user_row.iloc[0]) if password == "OIS2025" else (None, None)
+        return ("admin", user_row) if password == "OIS2025" else (None, None)
     if role == "sadmin":
-        return ("sadmin", user_row.iloc[0]) if password == "SOIS2025" else (None, None)
+        return ("sadmin", user_row) if password == "SOIS2025" else (None, None)
     if role == "user":
-        stored_pw = str(user_row.iloc[0].get("Password", "")).strip()
+        stored_pw = str(user_row.get("Password", "")).strip()
         entered_pw = str(password).strip()
         if stored_pw and entered_pw and stored_pw == entered_pw:
-            return "user", user_row.iloc[0]
+            return "user", user_row
         else:
             return None, None
 
+# =========================
+# Sidebar: rerun timings (admins)
+# =========================
+def render_timing_panel(trace):
+    wall_s = trace.elapsed()
+    with st.sidebar.expander("⏱️ Performance", expanded=False):
+        st.caption(f"This rerun: **{wall_s * 1000:.0f} ms**")
+        st.dataframe(
+            pd.DataFrame(
+                [{"Section": name, "ms": round(seconds * 1000, 1)} for name, seconds in trace.sections]
+            ),
+            hide_index=True, use_container_width=True,
+        )
+        st.markdown("**Spans (this rerun)**")
+        if trace.spans:
+            st.dataframe(pd.DataFrame(timing_rows(trace.spans, wall_s)), hide_index=True, use_container_width=True)
+        else:
+            st.caption("No Sheets calls, loads or builds this rerun.")
+        st.markdown("**Cache hit rates (this rerun)**")
+        st.dataframe(pd.DataFrame(cache_rows(trace.caches)), hide_index=True, use_container_width=True)
+
+        if st.checkbox("Show process totals", key="timing_panel_process"):
+            totals = get_tracer().snapshot()
+            st.caption(f"Since this server process started: {totals['reruns']} reruns, all sessions")
+            st.dataframe(pd.DataFrame(timing_rows(totals["spans"])), hide_index=True, use_container_width=True)
+            st.dataframe(pd.DataFrame(cache_rows(totals["caches"])), hide_index=True, use_container_width=True)
+            st.markdown("**Sheets calls (all sessions)**")
+            calls = call_metric_rows(get_sheets_gateway().metrics.snapshot())
+            if calls:
+                st.dataframe(pd.DataFrame(calls), hide_index=True, use_container_width=True)
+            else:
+                st.caption("No Sheets calls yet.")
+
+# =========================
+# Sidebar: data age (snapshots refresh in the background)
+# =========================
+def data_age_caption():
+    parts = []
+    for label, snapshot in (("Responses", responses_snapshot()), ("Final evaluations", final_eval_snapshot())):
+        age = snapshot.age()
+        if age is not None:
+            parts.append(f"{label} {format_age(age)}" + (" (refreshing…)" if snapshot.refreshing else ""))
+    return "🕒 Data read " + " · ".join(parts) if parts else ""
+
+# =========================
+# Page footer: runs on every exit, st.stop() included
+# =========================
+def finish_page():
+    """Close this rerun's trace, then draw the data-age caption and (for admins) the timing panel."""
+    rerun_trace.finish()
+    age_caption = data_age_caption()
+    if age_caption:
+        st.sidebar.caption(age_caption)
+    if st.session_state.get("auth_role") in ("admin", "sadmin"):
+        render_timing_panel(rerun_trace)
+
+def stop_page():
+    """st.stop() that still finishes the trace, so the next fragment rerun starts its own."""
+    finish_page()
+    st.stop()
+
 # =========================
 # AUTH CHECK
 # =========================
@@ -1087,14 +1037,10 @@ with st.sidebar:
 
 if "auth_email" not in st.session_state or not st.session_state.auth_email:
     st.info("Please log in first.")
-    st.stop()
+    stop_page()
 
 if st.sidebar.button("🚪 **LOGOUT**", type="primary", use_container_width=True):
-    for key in ["token", "auth_email", "auth_name", "auth_role", "auth_campus", "submitted"]:
-        if key in st.session_state:
-            del st.session_state[key]
-    st.cache_data.clear()
-    st.cache_resource.clear()
+    logout_current_session()
     st.switch_page("app.py")
 
 # =========================
@@ -1123,20 +1069,20 @@ st.title("🌟 OIS Teacher Appraisal 2025-26")
 
 if not st.session_state.auth_email:
     st.info("Please log in from the sidebar to continue.")
-    st.stop()
+    stop_page()
 
 already_submitted = user_has_submission(
     st.session_state.auth_email,
     cycle=CURRENT_ASSESSMENT_CYCLE
 )
 
-me_row = users_df[users_df["Email"] == st.session_state.auth_email]
-if me_row.empty:
+me_row = find_user(st.session_state.auth_email)
+if not me_row:
     role = "user"
     campus = ""
 else:
-    role = str(me_row.iloc[0].get("Role", "user")).lower().strip()
-    campus = str(me_row.iloc[0].get("Campus", "")).strip()
+    role = str(me_row.get("Role", "user")).lower().strip()
+    campus = str(me_row.get("Campus", "")).strip()
 
 st.session_state.auth_role = role
 st.session_state.auth_campus = campus
@@ -1164,7 +1110,7 @@ admin_view_mode = None
 if tab == "Admin" and i_am_admin:
     admin_view_mode = st.sidebar.selectbox(
         "Jump to",
-        ["Summary of Teachers", "View Teacher Self-Assessment", "Self-Assessment Grid"],
+        ["Summary of Teachers", "View Teacher Self-Assessment", "Self-Assessment Grid", "Bulk Export"],
         index=0
     )
 
@@ -1172,25 +1118,33 @@ sadmin_view_mode = None
 if tab == "Super Admin" and i_am_sadmin:
     sadmin_view_mode = st.sidebar.selectbox(
         "Jump to",
-        ["Summary of Teachers", "View Teacher Self-Assessment", "Self-Assessment Grid"],
+        ["Summary of Teachers", "View Teacher Self-Assessment", "Self-Assessment Grid", "Bulk Export"],
         index=0
     )
 
+if i_am_admin or i_am_sadmin:
+    with st.sidebar.expander("🔄 Reload sheet data", expanded=False):
+        reload_choice = st.selectbox("Dataset", ["Responses", "FinalEvaluation", "Users"], key="reload_dataset")
+        if st.button("Reload now", key="reload_dataset_btn", use_container_width=True):
+            invalidate_dataset(reload_choice)
+            _rerun()
+
 # =========================
 # Page: Self-Assessment
 # =========================
 from descriptors import DESCRIPTORS
 
 if tab == "Self-Assessment (Initial & Final)":
+    section("page.self_assessment")
     if already_submitted and not i_am_admin:
         st.success("✅ You've already submitted your self-assessment. Redirecting to your submission...")
         tab = "My Submission"
     else:
-        me = users_df[users_df["Email"] == st.session_state.auth_email].iloc[0] if not users_df.empty else {}
-        appraiser = me.get("Appraiser", "Not Assigned") if isinstance(me, pd.Series) else "Not Assigned"
+        appraiser = find_user(st.session_state.auth_email).get("Appraiser", "Not Assigned")
         st.sidebar.info(f"Your appraiser: **{appraiser}**")
 
-        draft_data = load_draft(st.session_state.auth_email) or {}
+        seed_form_state(st.session_state.auth_email)
+        draft_data = st.session_state.form_draft
         latest_initial, latest_final, comparison_df = build_teacher_initial_final(
             st.session_state.auth_email
         )
@@ -1254,10 +1208,7 @@ if tab == "Self-Assessment (Initial & Final)":
         # ── Show initial table if Final cycle ──
         if CURRENT_ASSESSMENT_CYCLE == "Final" and latest_initial is not None and not latest_initial.empty:
             st.markdown("### Your Initial Self-Assessment — Sep 2025")
-            initial_display = latest_initial.copy().replace({
-                "Highly Effective": "HE", "Effective": "E",
-                "Improvement Necessary": "IN", "Does Not Meet Standards": "DNMS"
-            })
+            initial_display = shorten_ratings(latest_initial)
             st.dataframe(
                 initial_display.style.map(highlight_ratings, subset=initial_display.columns[5:]),
                 use_container_width=True
@@ -1270,20 +1221,25 @@ if tab == "Self-Assessment (Initial & Final)":
             )
 
         # ── Main form ──
-        selections = {}
-        reflections = {}
         initial_record_data = (
             latest_initial.iloc[0].to_dict()
             if latest_initial is not None and not latest_initial.empty
             else {}
         )
 
-        for domain, items in DOMAINS.items():
+        # Each domain is a fragment: a rating click reruns only that domain's widgets.
+        # The whole page reruns only when the form becomes (or stops being) complete,
+        # so the Submit button and the sidebar progress catch up.
+        selected_count = form_rated_count()
+        st.session_state.form_complete_rendered = selected_count == total_items
+
+        @st.fragment
+        def render_domain_form(domain, items, initial_record_data):
+            begin_fragment(f"fragment.{domain.split(':')[0]}")
             with st.expander(domain, expanded=False):
                 for code, label in items:
                     strand_key = f"{code} {label}"
                     key = f"{code}-{label}"
-                    saved_value = draft_data.get(strand_key, "")
 
                     # Show initial rating as context
                     if CURRENT_ASSESSMENT_CYCLE == "Final" and initial_record_data:
@@ -1291,47 +1247,49 @@ if tab == "Self-Assessment (Initial & Final)":
                         if init_val:
                             st.caption(f"📌 Initial (Sep 2025): **{rating_short(init_val)}** — {init_val}")
 
-                    selections[strand_key] = st.radio(
+                    st.radio(
                         f"{strand_key}",
                         RATINGS,
-                        index=RATINGS.index(saved_value) if saved_value in RATINGS else None,
+                        index=None,
                         key=key,
                         horizontal=True,
-                    ) or ""
-
-                    # Strand descriptors
-                    if strand_key in DESCRIPTORS:
-                        expand_default = saved_value == ""
-                        with st.expander("📖 See descriptors for this strand", expanded=expand_default):
-                            st.markdown(f"""
-**Highly Effective (HE):** {DESCRIPTORS[strand_key]['HE']}
-
-**Effective (E):** {DESCRIPTORS[strand_key]['E']}
-
-**Improvement Necessary (IN):** {DESCRIPTORS[strand_key]['IN']}
+                        on_change=form_field_changed,
+                        args=(strand_key, key),
+                    )
 
-**Does Not Meet Standards (DNMS):** {DESCRIPTORS[strand_key]['DNMS']}
-                            """)
+                    # Strand descriptors: sent only once the teacher switches them on
+                    if strand_key in DESCRIPTOR_MARKDOWN:
+                        if st.toggle("📖 See descriptors for this strand", key=f"desc-{key}"):
+                            st.markdown(DESCRIPTOR_MARKDOWN[strand_key])
 
                 # Domain reflection box
                 if ENABLE_REFLECTIONS:
-                    saved_refl = draft_data.get(f"Reflection-{domain}", "")
-
                     # Show initial reflection as context in Final cycle
                     if CURRENT_ASSESSMENT_CYCLE == "Final":
                         init_refl = safe_text(initial_record_data.get(f"{domain} Reflection", ""))
                         if init_refl:
                             show_reflection("Your initial reflection (Sep 2025)", init_refl)
 
-                    reflections[domain] = st.text_area(
+                    st.text_area(
                         f"{domain} Reflection (optional)",
                         key=f"refl-{domain}",
                         placeholder="Notes / evidence / next steps (optional)",
-                        value=saved_refl,
+                        on_change=form_field_changed,
+                        args=(f"Reflection-{domain}", f"refl-{domain}"),
                     )
 
+                rated = sum(1 for code, label in items if st.session_state.get(f"{code}-{label}"))
+                st.caption(f"{rated}/{len(items)} strands rated in this domain")
+
+            if (form_rated_count() == total_items) != st.session_state.form_complete_rendered:
+                _rerun()
+
+        for domain, items in DOMAINS.items():
+            render_domain_form(domain, items, initial_record_data)
+        section("page.self_assessment.actions")
+
         # Submit / Save Draft
-        selected_count = sum(1 for v in selections.values() if v)
+        form_values = st.session_state.form_values
         remaining = total_items - selected_count
 
         col1, col2 = st.columns([1, 3])
@@ -1343,12 +1301,7 @@ if tab == "Self-Assessment (Initial & Final)":
 
         with st.sidebar:
             if st.button("💾 Save Draft", use_container_width=True):
-                draft_payload = {}
-                for domain, items in DOMAINS.items():
-                    for code, label in items:
-                        draft_payload[f"{code} {label}"] = selections[f"{code} {label}"]
-                    if ENABLE_REFLECTIONS:
-                        draft_payload[f"Reflection-{domain}"] = reflections.get(domain, "")
+                draft_payload = {field: form_values.get(field, "") for field, _ in form_fields()}
                 save_draft(st.session_state.auth_email, draft_payload)
                 st.success("✅ Draft saved!")
 
@@ -1371,15 +1324,10 @@ if tab == "Self-Assessment (Initial & Final)":
                 now_str, st.session_state.auth_email, st.session_state.auth_name,
                 appraiser, CURRENT_ASSESSMENT_CYCLE,
             ]
-            for domain, items in DOMAINS.items():
-                for code, label in items:
-                    row.append(selections[f"{code} {label}"])
-                if ENABLE_REFLECTIONS:
-                    row.append(reflections.get(domain, ""))
+            row.extend(form_values.get(field, "") for field, _ in form_fields())
             row.append(now_str)
             try:
-                with_backoff(RESP_WS.append_row, row, value_input_option="USER_ENTERED")
-                load_responses_df.clear()
+                append_response_row(row)
                 st.session_state.submitted = True
                 st.success("🎉 Submitted! See **My Submission** to review your responses.")
             except Exception as e:
@@ -1390,6 +1338,7 @@ if tab == "Self-Assessment (Initial & Final)":
 # Page: My Submission
 # =========================
 if tab == "My Submission":
+    section("page.my_submission")
     st.subheader("My Submission")
 
     latest_initial, latest_final, comparison_df = build_teacher_initial_final(
@@ -1399,11 +1348,12 @@ if tab == "My Submission":
     if latest_initial is None and latest_final is None:
         st.info("No submission found yet.")
     else:
+        my_fe_state = final_eval_state(st.session_state.auth_email)
         step_track([
             ("Initial\nSep 2025", "done" if latest_initial is not None else "locked"),
             ("Final self-assessment\nApr 2026", "done" if latest_final is not None else ("active" if latest_initial is not None else "locked")),
-            ("Final evaluation", "done" if teacher_final_eval_completed(st.session_state.auth_email) else "locked"),
-            ("Sign-off", "done" if teacher_signed_off_final_eval(st.session_state.auth_email) else "locked"),
+            ("Final evaluation", "done" if my_fe_state.teacher_submitted else "locked"),
+            ("Sign-off", "done" if my_fe_state.teacher_signed_off else "locked"),
         ])
 
         top_cols = st.columns(2)
@@ -1420,10 +1370,7 @@ if tab == "My Submission":
         with top_cols[1]:
             if latest_final is not None and not latest_final.empty:
                 st.markdown("### Final Self-Assessment — Apr 2026")
-                final_display = latest_final.copy().replace({
-                    "Highly Effective": "HE", "Effective": "E",
-                    "Improvement Necessary": "IN", "Does Not Meet Standards": "DNMS"
-                })
+                final_display = shorten_ratings(latest_final)
                 st.dataframe(
                     final_display.style.map(highlight_ratings, subset=final_display.columns[5:]),
                     use_container_width=True
@@ -1449,12 +1396,12 @@ if tab == "My Submission":
 # Page: Final Evaluation (Teacher)
 # =========================
 if tab == "Final Evaluation" and role == "user":
+    section("page.final_evaluation")
     st.subheader("Final Evaluation")
     teacher_email = st.session_state.auth_email.strip().lower()
     teacher_name = st.session_state.auth_name
 
-    me = users_df[users_df["Email"] == teacher_email].iloc[0] if not users_df.empty else {}
-    appraiser_raw = me.get("Appraiser", "Not Assigned") if isinstance(me, pd.Series) else "Not Assigned"
+    appraiser_raw = find_user(teacher_email).get("Appraiser", "Not Assigned")
     appraiser = get_full_appraiser_name(appraiser_raw)
 
     # ── Guard: must have submitted Final self-assessment ──
@@ -1469,19 +1416,17 @@ if tab == "Final Evaluation" and role == "user":
             "⏳ **Final Evaluation is locked.** "
             "You must first submit your **Final Self-Assessment** before this section becomes available."
         )
-        st.stop()
+        stop_page()
 
-    record = get_teacher_final_eval_record(teacher_email)
-    teacher_locked = (
-        not is_before_deadline(FINAL_EVAL_TEACHER_DEADLINE)
-        or teacher_final_eval_completed(teacher_email)
-    )
+    fe_state = final_eval_state(teacher_email)
+    record = fe_state.record
+    t_submitted = fe_state.teacher_submitted
+    a_completed = fe_state.appraiser_completed
+    ev_signed = fe_state.evaluator_signed_off
+    t_signed = fe_state.teacher_signed_off
+    teacher_locked = not is_before_deadline(FINAL_EVAL_TEACHER_DEADLINE) or t_submitted
 
     # Step track state
-    t_submitted = teacher_final_eval_completed(teacher_email)
-    a_completed = appraiser_final_eval_completed(teacher_email)
-    ev_signed = evaluator_signed_off(teacher_email)
-    t_signed = teacher_signed_off_final_eval(teacher_email)
 
     step_track([
         ("Initial & Final\nself-assessment ✓", "done"),
@@ -1577,7 +1522,7 @@ if tab == "Final Evaluation" and role == "user":
     st.divider()
     st.markdown("### Appraiser Review")
 
-    refreshed = get_teacher_final_eval_record(teacher_email)
+    refreshed = fe_state.record
 
     if not t_submitted:
         st.info("Submit your section above first — the appraiser review will appear here once you submit.")
@@ -1628,132 +1573,65 @@ if tab == "Final Evaluation" and role == "user":
 # Page: Admin Panel
 # =========================
 if tab == "Admin" and i_am_admin:
+    section("page.admin")
     st.header("👩‍💼 Admin Panel")
 
-    me = users_df[users_df["Email"] == st.session_state.auth_email].iloc[0]
+    me = find_user(st.session_state.auth_email)
     my_name = me.get("Name", st.session_state.auth_email)
     my_role = me.get("Role", "").strip().lower()
     my_first = my_name.split()[0].strip().lower()
-
-    has_campus_col = "Campus" in users_df.columns
-    my_campus = str(me.get("Campus", "")).strip() if has_campus_col else ""
-    campus_series = (
-        users_df["Campus"].astype(str).str.strip()
-        if has_campus_col and my_campus else None
-    )
+    my_campus = str(me.get("Campus", "")).strip()
 
     if my_role == "sadmin":
-        if campus_series is not None:
-            mask = (users_df["Role"] == "user") & (campus_series == my_campus)
-            assigned = users_df[mask]
+        assigned_rows = users_idx.with_role("user")
+        if my_campus:
+            assigned_rows = assigned_rows & users_idx.campus_members(my_campus)
             st.info(f"Super Admin access: viewing **all teachers** in the **{my_campus}** campus.")
-        else:
-            assigned = users_df[users_df["Role"] == "user"]
     else:
-        def matches_appraiser(cell):
-            if pd.isna(cell):
-                return False
-            appraisers = [a.strip().lower() for a in str(cell).split(",")]
-            return my_first in appraisers
-
-        if not users_df.empty:
-            base_mask = users_df["Appraiser"].apply(matches_appraiser)
-            if campus_series is not None:
-                base_mask = base_mask & (campus_series == my_campus)
-            assigned = users_df[base_mask]
-        else:
-            assigned = pd.DataFrame()
+        assigned_rows = users_idx.appraisees(my_first)
+        if my_campus:
+            assigned_rows = assigned_rows & users_idx.campus_members(my_campus)
+    assigned = users_idx.frame(assigned_rows)
 
-    resp_df = load_responses_df()
+    resp_index = load_responses_index()
 
     if assigned.empty:
         st.info("No teachers found for your role in the Users sheet.")
     else:
         # ── Summary ──
         if admin_view_mode == "Summary of Teachers":
+            section("page.admin.summary")
             st.subheader("📋 Summary of Teachers")
-            summary_rows = []
-            initial_submitted_count = 0
-            final_submitted_count = 0
-            total_count = len(assigned)
-
-            for _, teacher in assigned.iterrows():
-                t_email = teacher["Email"].strip().lower()
-                t_name = teacher["Name"]
-                submissions = resp_df[resp_df["Email"] == t_email] if not resp_df.empty else pd.DataFrame()
-                if not submissions.empty:
-                    if "Assessment Cycle" not in submissions.columns:
-                        submissions = submissions.copy()
-                        submissions["Assessment Cycle"] = "Initial"
-                    else:
-                        submissions = submissions.copy()
-                        submissions["Assessment Cycle"] = submissions["Assessment Cycle"].replace("", "Initial")
-
-                initial_subs = submissions[submissions["Assessment Cycle"] == "Initial"] if not submissions.empty else pd.DataFrame()
-                final_subs = submissions[submissions["Assessment Cycle"] == "Final"] if not submissions.empty else pd.DataFrame()
-                initial_status = "✅ Submitted" if not initial_subs.empty else "❌ Not Submitted"
-                final_status = "✅ Submitted" if not final_subs.empty else "❌ Not Submitted"
-                last_initial_date = initial_subs["Timestamp"].max() if not initial_subs.empty else "-"
-                last_final_date = final_subs["Timestamp"].max() if not final_subs.empty else "-"
-                if not initial_subs.empty:
-                    initial_submitted_count += 1
-                if not final_subs.empty:
-                    final_submitted_count += 1
-
-                summary_rows.append({
-                    "Teacher": t_name, "Email": t_email,
-                    "Initial Status": initial_status, "Final Status": final_status,
-                    "Teacher Final Eval": "✅ Submitted" if teacher_final_eval_completed(t_email) else "❌ Pending",
-                    "Appraiser Final Eval": "✅ Completed" if appraiser_final_eval_completed(t_email) else "❌ Pending",
-                    "Last Initial": last_initial_date, "Last Final": last_final_date,
-                })
-
-            summary_df = pd.DataFrame(summary_rows)
-            st.markdown(
-                f"**Initial:** {initial_submitted_count}/{total_count} submitted "
-                f"({round((initial_submitted_count/total_count)*100, 1) if total_count else 0}%)"
-            )
-            st.progress(initial_submitted_count / total_count if total_count else 0)
-            st.markdown(
-                f"**Final:** {final_submitted_count}/{total_count} submitted "
-                f"({round((final_submitted_count/total_count)*100, 1) if total_count else 0}%)"
-            )
-            st.progress(final_submitted_count / total_count if total_count else 0)
-            st.dataframe(summary_df, use_container_width=True)
+            render_teacher_summary(assigned)
+
+        # ── Bulk letters ──
+        if admin_view_mode == "Bulk Export":
+            section("page.admin.bulk_export")
+            st.subheader("📦 Bulk Export")
+            render_letter_packet_export(assigned, my_name, key_prefix="admin")
+            render_campus_comparison_export(assigned, key_prefix="admin")
 
         # ── Grid ──
         if admin_view_mode == "Self-Assessment Grid":
+            section("page.admin.grid")
             st.subheader("📊 Submissions Grid (My Appraisees)")
-            if not resp_df.empty:
-                appraisee_emails = assigned["Email"].str.strip().str.lower().tolist()
-                df = resp_df[resp_df["Email"].str.strip().str.lower().isin(appraisee_emails)]
-                if not df.empty:
-                    mapping = {
-                        "Highly Effective": "HE", "Effective": "E",
-                        "Improvement Necessary": "IN", "Does Not Meet Standards": "DNMS"
-                    }
-                    df = df.replace(mapping)
-                    styled_df = df.style.map(highlight_ratings, subset=df.columns[4:])
-                    st.dataframe(styled_df, use_container_width=True)
-                    st.download_button(
-                        "📥 Download Grid (CSV)",
-                        data=df.to_csv(index=False).encode("utf-8"),
-                        file_name=f"{st.session_state.auth_name}_appraisees_grid.csv",
-                        mime="text/csv",
-                    )
-                else:
-                    st.info("No rubric submissions yet from your appraisees.")
+            render_submissions_grid(
+                assigned, key_prefix="admin",
+                csv_name=f"{st.session_state.auth_name}_appraisees_grid.csv",
+                empty_message="No rubric submissions yet from your appraisees.",
+            )
 
         # ── Individual view ──
         if admin_view_mode == "View Teacher Self-Assessment":
+            section("page.admin.individual")
             st.subheader("🔎 View Individual Submissions")
             teacher_choice = st.selectbox("Select a teacher", assigned["Name"].tolist())
 
             if teacher_choice:
                 teacher_email = assigned.loc[assigned["Name"] == teacher_choice, "Email"].iloc[0]
-                rows = resp_df[resp_df["Email"] == teacher_email] if not resp_df.empty else pd.DataFrame()
+                has_rows = resp_index.has(teacher_email)
 
-                latest_initial, latest_final, comparison_df = build_initial_final_comparison(rows)
+                latest_initial, latest_final, comparison_df = build_teacher_initial_final(teacher_email)
 
                 col1, col2 = st.columns(2)
                 with col1:
@@ -1781,24 +1659,29 @@ if tab == "Admin" and i_am_admin:
                     )
 
                     appraiser_name = safe_text(
-                        rows.sort_values("Timestamp", ascending=False).head(1).iloc[0].get("Appraiser", "")
+                        (resp_index.latest_row(teacher_email) or {}).get("Appraiser", "")
                     )
                     printable_html = build_printable_comparison_html(
                         teacher_name=teacher_choice, teacher_email=teacher_email,
                         appraiser=appraiser_name, latest_initial=latest_initial,
                         latest_final=latest_final, display_df=display_df
                     )
+                    comparison_pdf_download(
+                        teacher_choice, teacher_email, appraiser_name,
+                        latest_initial, latest_final, display_df, key=f"admin_cmp_pdf_{teacher_email}"
+                    )
 
                 st.divider()
 
-                if rows.empty:
+                if not has_rows:
                     st.warning(f"No submission found for {teacher_choice}.")
                 else:
                     st.subheader("Final Evaluation")
-                    fe_record = get_teacher_final_eval_record(teacher_email)
+                    fe_state = final_eval_state(teacher_email)
+                    fe_record = fe_state.record
 
                     # ── Guard: teacher must have submitted Final Eval first ──
-                    if not teacher_final_eval_completed(teacher_email):
+                    if not fe_state.teacher_submitted:
                         st.info(
                             f"⏳ **{teacher_choice}** has not yet submitted their Final Evaluation section. "
                             "The appraiser section will become available once they submit."
@@ -1811,32 +1694,30 @@ if tab == "Admin" and i_am_admin:
                         st.write("**Overall Reflection:**")
                         st.info(safe_text(fe_record.get("Overall Reflection", "")))
 
-                        if teacher_signed_off_final_eval(teacher_email):
+                        if fe_state.teacher_signed_off:
                             st.divider()
                             render_final_evaluation_review_panel(fe_record, heading="Final Signed-Off Review")
-                            if evaluator_signed_off(teacher_email):
+                            if fe_state.evaluator_signed_off:
                                 ev_name = title_case_name(fe_record.get("Appraiser", my_name))
                                 st.success(f"✅ **{ev_name}** signed off on {fmt_ist(fe_record.get('Evaluator Sign Off Date', ''))}")
-                            if teacher_signed_off_final_eval(teacher_email):
+                            if fe_state.teacher_signed_off:
                                 st.success(f"✅ **{teacher_choice}** signed off on {fmt_ist(fe_record.get('Teacher Sign Off Date', ''))}")
 
-                            final_doc_record = fe_record.copy()
-                            final_doc_record["Teacher Name"] = teacher_choice
-                            final_doc_record["Appraiser"] = title_case_name(fe_record.get("Appraiser", my_name))
-                            final_docx = generate_final_evaluation_docx(final_doc_record)
+                            final_doc_record = final_evaluation_letter_record(fe_record, teacher_choice, my_name)
+                            letter_docx_download(final_doc_record, teacher_choice, key=f"{teacher_email}_final_eval_docx")
                             st.download_button(
-                                "📄 Download Final Evaluation Summary (DOCX)",
-                                data=final_docx,
-                                file_name=f"{teacher_choice}_final_evaluation_summary.docx",
-                                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                                key=f"{teacher_email}_final_eval_docx"
+                                "📄 Download Final Evaluation Summary (PDF)",
+                                data=final_evaluation_pdf(final_doc_record),
+                                file_name=f"{teacher_choice}_final_evaluation_summary.pdf",
+                                mime=PDF_MIME,
+                                key=f"{teacher_email}_final_eval_pdf"
                             )
 
                         else:
                             # Appraiser section
                             appraiser_locked = (
                                 not is_before_deadline(FINAL_EVAL_APPRAISER_DEADLINE)
-                                or teacher_signed_off_final_eval(teacher_email)
+                                or fe_state.teacher_signed_off
                             )
                             st.caption(f"Your deadline (IST): {FINAL_EVAL_APPRAISER_DEADLINE.strftime('%d %b %Y, %I:%M %p')}")
 
@@ -1906,10 +1787,10 @@ if tab == "Admin" and i_am_admin:
                                     st.success("Appraiser section submitted.")
                                     _rerun()
 
-                            refreshed_fe = get_teacher_final_eval_record(teacher_email)
+                            refreshed_fe = fe_state.record
 
-                            if (appraiser_final_eval_completed(teacher_email)
-                                    and not evaluator_signed_off(teacher_email)
+                            if (fe_state.appraiser_completed
+                                    and not fe_state.evaluator_signed_off
                                     and not appraiser_locked):
                                 st.info(
                                     "⚠️ Only click **Appraiser Sign Off** after the evaluation has been "
@@ -1925,109 +1806,51 @@ if tab == "Admin" and i_am_admin:
                                     st.success("Sign-off completed.")
                                     _rerun()
 
-                            if evaluator_signed_off(teacher_email):
+                            if fe_state.evaluator_signed_off:
                                 st.success(f"✅ **{my_name}** signed off on {fmt_ist(refreshed_fe.get('Evaluator Sign Off Date', ''))}")
 
 # =========================
 # Page: Super Admin Panel
 # =========================
 if tab == "Super Admin" and i_am_sadmin:
+    section("page.sadmin")
     st.header("🏫 Super Admin Panel")
 
     my_campus = str(st.session_state.get("auth_campus", "") or "").strip()
-    has_campus_col = "Campus" in users_df.columns
-    campus_series = (
-        users_df["Campus"].astype(str).str.strip()
-        if has_campus_col and my_campus else None
-    )
-
-    if campus_series is not None:
-        assigned = users_df[(users_df["Role"] == "user") & (campus_series == my_campus)]
+    if my_campus:
+        assigned = users_idx.frame(users_idx.with_role("user") & users_idx.campus_members(my_campus))
         st.info(f"Viewing **all teachers** in the **{my_campus}** campus.")
     else:
-        assigned = users_df[users_df["Role"] == "user"]
+        assigned = users_idx.frame(users_idx.with_role("user"))
         st.info("Viewing **all teachers** in the school.")
 
-    resp_df = load_responses_df()
+    resp_index = load_responses_index()
 
     if assigned.empty:
         st.info("No teachers found for this campus.")
     else:
-        summary_rows = []
-        initial_submitted_count = 0
-        final_submitted_count = 0
-        total_count = len(assigned)
-
-        for _, teacher in assigned.iterrows():
-            t_email = teacher["Email"].strip().lower()
-            t_name = teacher["Name"]
-            submissions = resp_df[resp_df["Email"] == t_email] if not resp_df.empty else pd.DataFrame()
-            if not submissions.empty:
-                if "Assessment Cycle" not in submissions.columns:
-                    submissions = submissions.copy()
-                    submissions["Assessment Cycle"] = "Initial"
-                else:
-                    submissions = submissions.copy()
-                    submissions["Assessment Cycle"] = submissions["Assessment Cycle"].replace("", "Initial")
-
-            initial_subs = submissions[submissions["Assessment Cycle"] == "Initial"] if not submissions.empty else pd.DataFrame()
-            final_subs = submissions[submissions["Assessment Cycle"] == "Final"] if not submissions.empty else pd.DataFrame()
-            initial_status = "✅ Submitted" if not initial_subs.empty else "❌ Not Submitted"
-            final_status = "✅ Submitted" if not final_subs.empty else "❌ Not Submitted"
-            last_initial_date = initial_subs["Timestamp"].max() if not initial_subs.empty else "-"
-            last_final_date = final_subs["Timestamp"].max() if not final_subs.empty else "-"
-            if not initial_subs.empty:
-                initial_submitted_count += 1
-            if not final_subs.empty:
-                final_submitted_count += 1
-
-            summary_rows.append({
-                "Teacher": t_name, "Email": t_email,
-                "Initial Status": initial_status, "Final Status": final_status,
-                "Teacher Final Eval": "✅ Submitted" if teacher_final_eval_completed(t_email) else "❌ Pending",
-                "Appraiser Final Eval": "✅ Completed" if appraiser_final_eval_completed(t_email) else "❌ Pending",
-                "Last Initial": last_initial_date, "Last Final": last_final_date,
-            })
-
-        summary_df = pd.DataFrame(summary_rows)
-
         if sadmin_view_mode == "Summary of Teachers":
+            section("page.sadmin.summary")
             st.subheader("📋 Summary of Teachers")
-            st.markdown(
-                f"**Initial:** {initial_submitted_count}/{total_count} submitted "
-                f"({round((initial_submitted_count/total_count)*100, 1) if total_count else 0}%)"
-            )
-            st.progress(initial_submitted_count / total_count if total_count else 0)
-            st.markdown(
-                f"**Final:** {final_submitted_count}/{total_count} submitted "
-                f"({round((final_submitted_count/total_count)*100, 1) if total_count else 0}%)"
-            )
-            st.progress(final_submitted_count / total_count if total_count else 0)
-            st.dataframe(summary_df, use_container_width=True)
+            render_teacher_summary(assigned)
+
+        if sadmin_view_mode == "Bulk Export":
+            section("page.sadmin.bulk_export")
+            st.subheader("📦 Bulk Export")
+            render_letter_packet_export(assigned, st.session_state.auth_name, key_prefix="sadmin")
+            render_campus_comparison_export(assigned, key_prefix="sadmin")
 
         if sadmin_view_mode == "Self-Assessment Grid":
+            section("page.sadmin.grid")
             st.subheader("📊 Submissions Grid (Campus)")
-            if not resp_df.empty:
-                teacher_emails = assigned["Email"].str.strip().str.lower().tolist()
-                df = resp_df[resp_df["Email"].str.strip().str.lower().isin(teacher_emails)]
-                if not df.empty:
-                    mapping = {
-                        "Highly Effective": "HE", "Effective": "E",
-                        "Improvement Necessary": "IN", "Does Not Meet Standards": "DNMS"
-                    }
-                    df = df.replace(mapping)
-                    styled_df = df.style.map(highlight_ratings, subset=df.columns[4:])
-                    st.dataframe(styled_df, use_container_width=True)
-                    st.download_button(
-                        "📥 Download Campus Grid (CSV)",
-                        data=df.to_csv(index=False).encode("utf-8"),
-                        file_name=f"{my_campus or 'campus'}_submissions_grid.csv",
-                        mime="text/csv",
-                    )
-                else:
-                    st.info("No rubric submissions yet for this campus.")
+            render_submissions_grid(
+                assigned, key_prefix="sadmin",
+                csv_name=f"{my_campus or 'campus'}_submissions_grid.csv",
+                empty_message="No rubric submissions yet for this campus.",
+            )
 
         if sadmin_view_mode == "View Teacher Self-Assessment":
+            section("page.sadmin.individual")
             st.subheader("🔎 View Individual Submissions")
             teacher_choice = st.selectbox(
                 "Select a teacher", assigned["Name"].tolist(), key="sadmin_teacher_choice"
@@ -2035,8 +1858,8 @@ if tab == "Super Admin" and i_am_sadmin:
 
             if teacher_choice:
                 teacher_email = assigned.loc[assigned["Name"] == teacher_choice, "Email"].iloc[0]
-                rows = resp_df[resp_df["Email"] == teacher_email] if not resp_df.empty else pd.DataFrame()
-                latest_initial, latest_final, comparison_df = build_initial_final_comparison(rows)
+                has_rows = resp_index.has(teacher_email)
+                latest_initial, latest_final, comparison_df = build_teacher_initial_final(teacher_email)
 
                 st.subheader(f"Initial vs Final Comparison — {teacher_choice}")
                 col1, col2 = st.columns(2)
@@ -2061,17 +1884,23 @@ if tab == "Super Admin" and i_am_sadmin:
                         initial_record=initial_rec,
                         final_record=final_rec
                     )
+                    comparison_pdf_download(
+                        teacher_choice, teacher_email,
+                        safe_text((resp_index.latest_row(teacher_email) or {}).get("Appraiser", "")),
+                        latest_initial, latest_final, display_df, key=f"sadmin_cmp_pdf_{teacher_email}"
+                    )
 
                 st.divider()
 
-                if rows.empty:
+                if not has_rows:
                     st.warning(f"No submission found for {teacher_choice}.")
                 else:
                     st.subheader("Final Evaluation")
-                    fe_record = get_teacher_final_eval_record(teacher_email)
+                    fe_state = final_eval_state(teacher_email)
+                    fe_record = fe_state.record
                     sadmin_name = st.session_state.auth_name
 
-                    if not teacher_final_eval_completed(teacher_email):
+                    if not fe_state.teacher_submitted:
                         st.info(
                             f"⏳ **{teacher_choice}** has not yet submitted their Final Evaluation section."
                         )
@@ -2083,31 +1912,29 @@ if tab == "Super Admin" and i_am_sadmin:
                         st.write("**Overall Reflection:**")
                         st.info(safe_text(fe_record.get("Overall Reflection", "")))
 
-                        if teacher_signed_off_final_eval(teacher_email):
+                        if fe_state.teacher_signed_off:
                             st.divider()
                             render_final_evaluation_review_panel(fe_record, heading="Final Signed-Off Review")
-                            if evaluator_signed_off(teacher_email):
+                            if fe_state.evaluator_signed_off:
                                 ev_name = title_case_name(fe_record.get("Appraiser", sadmin_name))
                                 st.success(f"✅ **{ev_name}** signed off on {fmt_ist(fe_record.get('Evaluator Sign Off Date', ''))}")
-                            if teacher_signed_off_final_eval(teacher_email):
+                            if fe_state.teacher_signed_off:
                                 st.success(f"✅ **{teacher_choice}** signed off on {fmt_ist(fe_record.get('Teacher Sign Off Date', ''))}")
 
-                            final_doc_record = fe_record.copy()
-                            final_doc_record["Teacher Name"] = teacher_choice
-                            final_doc_record["Appraiser"] = title_case_name(fe_record.get("Appraiser", sadmin_name))
-                            final_docx = generate_final_evaluation_docx(final_doc_record)
+                            final_doc_record = final_evaluation_letter_record(fe_record, teacher_choice, sadmin_name)
+                            letter_docx_download(final_doc_record, teacher_choice, key=f"{teacher_email}_sadmin_final_eval_docx")
                             st.download_button(
-                                "📄 Download Final Evaluation Summary (DOCX)",
-                                data=final_docx,
-                                file_name=f"{teacher_choice}_final_evaluation_summary.docx",
-                                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                                key=f"{teacher_email}_sadmin_final_eval_docx"
+                                "📄 Download Final Evaluation Summary (PDF)",
+                                data=final_evaluation_pdf(final_doc_record),
+                                file_name=f"{teacher_choice}_final_evaluation_summary.pdf",
+                                mime=PDF_MIME,
+                                key=f"{teacher_email}_sadmin_final_eval_pdf"
                             )
 
                         else:
                             appraiser_locked = (
                                 not is_before_deadline(FINAL_EVAL_APPRAISER_DEADLINE)
-                                or teacher_signed_off_final_eval(teacher_email)
+                                or fe_state.teacher_signed_off
                             )
                             st.caption(f"Your deadline (IST): {FINAL_EVAL_APPRAISER_DEADLINE.strftime('%d %b %Y, %I:%M %p')}")
 
@@ -2177,10 +2004,10 @@ if tab == "Super Admin" and i_am_sadmin:
                                     st.success("Appraiser section submitted.")
                                     _rerun()
 
-                            refreshed_fe = get_teacher_final_eval_record(teacher_email)
+                            refreshed_fe = fe_state.record
 
-                            if (appraiser_final_eval_completed(teacher_email)
-                                    and not evaluator_signed_off(teacher_email)
+                            if (fe_state.appraiser_completed
+                                    and not fe_state.evaluator_signed_off
                                     and not appraiser_locked):
                                 st.info(
                                     "⚠️ Only click **Sign Off** after the evaluation has been discussed "
@@ -2195,5 +2022,7 @@ if tab == "Super Admin" and i_am_sadmin:
                                     st.success("Sign-off completed.")
                                     _rerun()
 
-                            if evaluator_signed_off(teacher_email):
+                            if fe_state.evaluator_signed_off:
                                 st.success(f"✅ **{sadmin_name}** signed off on {fmt_ist(refreshed_fe.get('Evaluator Sign Off Date', ''))}")
+
+finish_page()
@@ -0,0 +1,223 @@
+# pdf_reports.py
+# Print-ready PDFs (reportlab) for the Final Evaluation summary and the Initial vs Final comparison,
+# plus a pypdf merge that packs per-teacher PDFs into a ZIP of per-appraiser files.
+
+import itertools
+import os
+import re
+import zipfile
+from functools import lru_cache
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from pypdf import PdfReader, PdfWriter
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from final_eval import final_eval_domain_rows
+from formatting import safe_text, title_case_name
+from tracing import traced
+
+PDF_MIME = "application/pdf"
+# Letters per merged file in a PDF packet. PdfWriter keeps every page of a file until
+# it is written, so this (not the campus size) bounds the memory a packet build needs.
+PACKET_PDF_MAX_LETTERS = 40
+
+RATING_COLOURS = {"HE": "#a8e6a1", "E": "#d0f0fd", "IN": "#fff3b0", "DNMS": "#f8a5a5"}
+TREND_COLOURS = {"↑ Improved": "#d9f2d9", "↓ Dropped": "#f8d7da", "→ No change": "#eef2f7"}
+
+# =========================
+# Fonts & styles (built once per process)
+# =========================
+@lru_cache(maxsize=None)
+def _fonts():
+    """
+    (regular, bold) font names. DejaVu Sans (shipped with matplotlib) covers the trend
+    arrows; without it we fall back to the built-in Helvetica.
+    """
+    try:
+        import matplotlib
+        ttf_dir = os.path.join(matplotlib.get_data_path(), "fonts", "ttf")
+        pdfmetrics.registerFont(TTFont("DejaVuSans", os.path.join(ttf_dir, "DejaVuSans.ttf")))
+        pdfmetrics.registerFont(TTFont("DejaVuSans-Bold", os.path.join(ttf_dir, "DejaVuSans-Bold.ttf")))
+        return "DejaVuSans", "DejaVuSans-Bold"
+    except Exception:
+        return "Helvetica", "Helvetica-Bold"
+
+@lru_cache(maxsize=None)
+def _styles():
+    regular, bold = _fonts()
+    base = getSampleStyleSheet()
+    return {
+        "title": ParagraphStyle("title", parent=base["Title"], fontName=bold, fontSize=15, spaceAfter=4 * mm),
+        "subtitle": ParagraphStyle("subtitle", parent=base["Heading2"], fontName=regular, fontSize=12,
+                                   textColor=colors.HexColor("#444444")),
+        "heading": ParagraphStyle("heading", parent=base["Heading3"], fontName=bold, fontSize=11.5,
+                                  spaceBefore=3 * mm, spaceAfter=1.5 * mm),
+        "body": ParagraphStyle("body", parent=base["BodyText"], fontName=regular, fontSize=10, leading=13.5),
+        "italic": ParagraphStyle("italic", parent=base["BodyText"], fontName=regular, fontSize=9,
+                                 textColor=colors.HexColor("#555555")),
+        "cell": ParagraphStyle("cell", parent=base["BodyText"], fontName=regular, fontSize=8.5, leading=11),
+        "cell_centre": ParagraphStyle("cell_centre", parent=base["BodyText"], fontName=bold, fontSize=8.5,
+                                      leading=11, alignment=TA_CENTER),
+    }
+
+def _para(text, style):
+    return Paragraph(escape(safe_text(text)).replace("\n", "<br/>"), _styles()[style])
+
+def _labelled(label, value, style="body"):
+    _, bold = _fonts()
+    return Paragraph(
+        f'<font name="{bold}">{escape(label)}</font>{escape(safe_text(value)).replace(chr(10), "<br/>")}',
+        _styles()[style],
+    )
+
+def _build(story, title):
+    out = BytesIO()
+    doc = SimpleDocTemplate(
+        out, pagesize=A4, title=title,
+        leftMargin=16 * mm, rightMargin=16 * mm, topMargin=14 * mm, bottomMargin=14 * mm,
+    )
+    doc.build(story)
+    return out.getvalue()
+
+# =========================
+# Final Evaluation summary
+# =========================
+@traced("pdf.final_evaluation")
+def final_evaluation_pdf(record: dict) -> bytes:
+    """Same content as the DOCX letter, laid out for print. `record` as from final_evaluation_letter_record."""
+    teacher_name = title_case_name(record.get("Teacher Name", ""))
+    appraiser_name = title_case_name(record.get("Appraiser", ""))
+    story = [
+        _para("FINAL EVALUATION SUMMARY", "title"),
+        _labelled("Teacher: ", teacher_name),
+        _labelled("Appraiser: ", appraiser_name),
+        _labelled("Subject Area: ", record.get("Subject Area", "")),
+        Spacer(1, 3 * mm),
+        _para("Student Survey Feedback", "heading"),
+        _para("Administered by the teacher each Semester", "italic"),
+        _para(record.get("Student Survey Feedback", ""), "body"),
+        _para("Overall Reflection by the teacher on the school year", "heading"),
+        _para(record.get("Overall Reflection", ""), "body"),
+        _para("Ratings on Individual Rubrics", "heading"),
+    ]
+    story += [_labelled(f"{label}: ", record.get(col_name, "")) for col_name, label in final_eval_domain_rows()]
+    story += [
+        _para("Overall Rating", "heading"),
+        _labelled("", record.get("Overall Rating", "")),
+        _para("Overall Appraiser Comments", "heading"),
+        _para(record.get("Overall Comments", ""), "body"),
+        _para("Sign Off", "heading"),
+        _labelled(f"{appraiser_name} signed off on: ", record.get("Evaluator Sign Off Date", "")),
+        _labelled(f"{teacher_name} signed off on: ", record.get("Teacher Sign Off Date", "")),
+        Spacer(1, 3 * mm),
+        _para(
+            "The teacher's signature indicates that he or she has seen and discussed the evaluation; "
+            "it does not necessarily denote agreement with the report.",
+            "italic",
+        ),
+    ]
+    return _build(story, f"{teacher_name} - Final Evaluation Summary")
+
+# =========================
+# Initial vs Final comparison
+# =========================
+_COMPARISON_COLUMNS = ["Domain", "Strand", "Explanation", "Initial", "Final", "Trend"]
+_COMPARISON_WIDTHS = [0.07, 0.15, 0.48, 0.08, 0.08, 0.14]
+
+@traced("pdf.comparison")
+def comparison_pdf(teacher_name, teacher_email, appraiser, initial_date, final_date, comparison_df) -> bytes:
+    """
+    Initial vs Final table from `comparison.comparison_from_codes` output (strands and HE
+    explanations already drawn from DOMAINS/DESCRIPTORS), with the same colour coding as the app.
+    """
+    _, bold = _fonts()
+    story = [
+        _para(teacher_name, "title"),
+        _para("Initial vs Final Self-Assessment Comparison", "subtitle"),
+        _labelled("Email: ", teacher_email),
+        _labelled("Appraiser: ", appraiser),
+        _labelled("Initial Submitted: ", initial_date or "-"),
+        _labelled("Final Submitted: ", final_date or "-"),
+        Spacer(1, 4 * mm),
+    ]
+    if comparison_df is None or comparison_df.empty:
+        story.append(_para("No comparison data available.", "body"))
+        return _build(story, f"{teacher_name} - Initial vs Final Comparison")
+
+    rows = [[_para(c, "cell_centre") for c in _COMPARISON_COLUMNS]]
+    table_style = [
+        ("GRID", (0, 0), (-1, -1), 0.4, colors.HexColor("#dddddd")),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f5f6f7")),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("FONTNAME", (0, 0), (-1, -1), bold),
+    ]
+    records = comparison_df[_COMPARISON_COLUMNS].to_dict("records")
+    for r, row in enumerate(records, start=1):
+        rows.append([
+            _para(row["Domain"], "cell"), _para(row["Strand"], "cell"), _para(row["Explanation"], "cell"),
+            _para(row["Initial"], "cell_centre"), _para(row["Final"], "cell_centre"), _para(row["Trend"], "cell_centre"),
+        ])
+        for col, colour in ((3, RATING_COLOURS.get(row["Initial"])), (4, RATING_COLOURS.get(row["Final"])),
+                            (5, TREND_COLOURS.get(row["Trend"]))):
+            if colour:
+                table_style.append(("BACKGROUND", (col, r), (col, r), colors.HexColor(colour)))
+
+    width = A4[0] - 32 * mm
+    table = Table(rows, colWidths=[width * w for w in _COMPARISON_WIDTHS], repeatRows=1)
+    table.setStyle(TableStyle(table_style))
+    story.append(table)
+    return _build(story, f"{teacher_name} - Initial vs Final Comparison")
+
+# =========================
+# Campus file
+# =========================
+def merge_pdfs(parts, out, progress=None):
+    """
+    Concatenate `(bookmark title, pdf bytes)` pairs into one PDF written to `out`.
+    Every page is held until the final write, so callers keep `parts` small (see
+    write_pdf_packet). `progress(done)` is called after each part. Returns the number merged.
+    """
+    writer = PdfWriter()
+    done = 0
+    for title, data in parts:
+        writer.append(PdfReader(BytesIO(data)), outline_item=title)
+        done += 1
+        if progress:
+            progress(done)
+    if done:
+        writer.write(out)
+    return done
+
+def write_pdf_packet(groups, out, max_letters=PACKET_PDF_MAX_LETTERS, progress=None):
+    """
+    ZIP written to `out` with one merged PDF per `(name, parts)` group (e.g. per
+    appraiser), split into "name (part n).pdf" files of at most `max_letters` parts.
+    `parts` may be generators; only one file's pages are in memory at a time.
+    `progress(done)` is called after each part. Returns the number of parts packed.
+    """
+    done = 0
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_STORED) as zf:
+        for name, parts in groups:
+            stem = re.sub(r'[\\/:*?"<>|]', "_", safe_text(name)).strip() or "letters"
+            parts = iter(parts)
+            part = 1
+            while True:
+                buffer = BytesIO()
+                merged = merge_pdfs(
+                    itertools.islice(parts, max_letters), buffer,
+                    progress=(lambda n, before=done: progress(before + n)) if progress else None,
+                )
+                if not merged:
+                    break
+                zf.writestr(f"{stem}.pdf" if part == 1 else f"{stem} (part {part}).pdf", buffer.getvalue())
+                done += merged
+                part += 1
+    return done
@@ -0,0 +1,140 @@
+# ratings.py
+# One codec for rubric ratings: full label <-> short code <-> ordinal int8 (0 = blank/unknown),
+# plus the int8 teacher x strand matrix the Responses index keeps for vectorised comparisons.
+
+import numpy as np
+import pandas as pd
+
+from rubric import STRANDS
+
+# Position is the ordinal code; index 0 is "no rating".
+RATING_LABELS = ("", "Does Not Meet Standards", "Improvement Necessary", "Effective", "Highly Effective")
+RATING_SHORT = ("", "DNMS", "IN", "E", "HE")
+TREND_LABELS = ("↓ Dropped", "→ No change", "↑ Improved")   # indexed by sign(final - initial) + 1
+
+_CODES = {**{label: i for i, label in enumerate(RATING_LABELS)}, **{short: i for i, short in enumerate(RATING_SHORT)}}
+_SHORT = np.array(RATING_SHORT, dtype=object)
+_TRENDS = np.array(TREND_LABELS, dtype=object)
+
+def rating_code(value):
+    """0–4, where 4 is Highly Effective and 0 is blank or not a rating."""
+    return _CODES.get(str(value).strip(), 0)
+
+def rating_short(value):
+    """HE/E/IN/DNMS for a rating in either form; any other text is returned stripped."""
+    text = str(value).strip()
+    code = _CODES.get(text, 0)
+    return RATING_SHORT[code] if code else text
+
+def rating_key(value):
+    """DESCRIPTORS key (HE/E/IN/DNMS) for a rating, or "" if it isn't one."""
+    return RATING_SHORT[rating_code(value)]
+
+def encode_ratings(values):
+    """Vector of ratings (labels or short codes) -> int8 codes."""
+    series = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        lookup = np.array([rating_code(c) for c in series.cat.categories] + [0], dtype=np.int8)
+        return lookup[series.cat.codes.to_numpy()]   # code -1 (missing) hits the trailing 0
+    return series.map(lambda v: _CODES.get(str(v).strip(), 0)).to_numpy(dtype=np.int8)
+
+def short_codes(codes):
+    return _SHORT[np.asarray(codes, dtype=np.intp)]
+
+def trend_labels(initial_codes, final_codes):
+    """Improved/Dropped/No change per strand; "" where either side is unrated."""
+    initial_codes = np.asarray(initial_codes, dtype=np.int8)
+    final_codes = np.asarray(final_codes, dtype=np.int8)
+    labels = _TRENDS[np.sign(final_codes.astype(np.int16) - initial_codes) + 1]
+    labels[(initial_codes == 0) | (final_codes == 0)] = ""
+    return labels
+
+def categorise_ratings(df, columns=STRANDS):
+    """Store rating columns as pandas categoricals (one byte per cell instead of a string object)."""
+    for col in columns:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    return df
+
+def shorten_ratings(df, columns=STRANDS):
+    """Copy of `df` with rating columns shown as HE/E/IN/DNMS."""
+    df = df.copy()
+    for col in columns:
+        if col in df.columns:
+            df[col] = df[col].map(rating_short).astype(object)
+    return df
+
+def _with_text(shorts, text):
+    for j, value in (text or {}).items():
+        shorts[j] = value
+    return shorts
+
+def compare_codes(initial_codes, final_codes, initial_text=None, final_text=None):
+    """
+    (initial short codes, final short codes, trends) for two rating-code rows;
+    None stands for a cycle with no submission. `initial_text`/`final_text`
+    ({strand position: text}, see RatingMatrix.text) put back cells that
+    hold something other than a rating, as rating_short would show them.
+    """
+    blank = np.zeros(len(STRANDS), dtype=np.int8)
+    initial_codes = blank if initial_codes is None else initial_codes
+    final_codes = blank if final_codes is None else final_codes
+    return (
+        _with_text(short_codes(initial_codes), initial_text),
+        _with_text(short_codes(final_codes), final_text),
+        trend_labels(initial_codes, final_codes),
+    )
+
+def _other_text(column):
+    """(position, stripped text) for each cell of `column` that is neither blank nor a rating."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        others = {
+            i: str(c).strip() for i, c in enumerate(column.cat.categories)
+            if str(c).strip() and rating_code(c) == 0
+        }
+        if not others:
+            return []
+        cat_codes = column.cat.codes.to_numpy()
+        positions = np.flatnonzero(np.isin(cat_codes, list(others)))
+        return [(int(p), others[int(cat_codes[p])]) for p in positions]
+    return [
+        (pos, str(v).strip()) for pos, v in enumerate(column.tolist())
+        if not pd.isna(v) and str(v).strip() and rating_code(v) == 0
+    ]
+
+class RatingMatrix:
+    """
+    int8 ordinal codes, one row per Responses row and one column per strand (in STRANDS order).
+    A missing column reads as unrated. Non-blank cells that aren't ratings (hand-entered
+    text) code as 0 and are kept aside, stripped, in a sparse row -> {strand position: text} map.
+    """
+
+    def __init__(self, df, strands=STRANDS):
+        self.strands = list(strands)
+        self.labels = df.index
+        self._position = {label: pos for pos, label in enumerate(df.index)}
+        self.codes = np.zeros((len(df), len(self.strands)), dtype=np.int8)
+        self._text = {}
+        for j, strand in enumerate(self.strands):
+            if strand in df.columns and len(df):
+                column = df[strand]
+                self.codes[:, j] = encode_ratings(column)
+                for pos, value in _other_text(column):
+                    self._text.setdefault(pos, {})[j] = value
+
+    def row(self, label):
+        """Codes for one Responses row, or None for an unknown label."""
+        pos = self._position.get(label)
+        return None if pos is None else self.codes[pos]
+
+    def text(self, label):
+        """{strand position: text} for one row's non-rating cells ({} if none)."""
+        pos = self._position.get(label)
+        return self._text.get(pos, {}) if pos is not None else {}
+
+    def rows(self, labels):
+        return self.codes[[self._position[label] for label in labels]]
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes
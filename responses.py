@@ -0,0 +1,122 @@
+# responses.py
+# In-memory index over the Responses sheet, built once per cache refresh.
+
+import pandas as pd
+
+from ratings import RatingMatrix, categorise_ratings
+
+DEFAULT_CYCLE = "Initial"
+
+def normalise_responses_df(df):
+    """Lower-case/strip Email, default a blank Assessment Cycle to Initial, store ratings as categoricals."""
+    if "Email" in df.columns:
+        df["Email"] = df["Email"].astype(str).str.strip().str.lower()
+    if "Assessment Cycle" not in df.columns:
+        df["Assessment Cycle"] = DEFAULT_CYCLE
+    else:
+        df["Assessment Cycle"] = df["Assessment Cycle"].replace("", DEFAULT_CYCLE)
+    return categorise_ratings(df)
+
+class ResponsesIndex:
+    """
+    Latest submission per (email, cycle), precomputed so lookups are O(1), plus the
+    int8 rating matrix for every row. The wrapped DataFrame is shared – callers must not mutate it.
+    """
+
+    def __init__(self, df, header=None):
+        self.df = df
+        self.header = list(header) if header is not None else list(df.columns)
+        self._latest = {}        # (email, cycle) -> row label of the newest submission
+        self._latest_any = {}    # email -> row label of the newest submission in any cycle
+        self._labels = {}        # email -> list of row labels
+        self.ratings = RatingMatrix(df)
+        if df.empty or "Email" not in df.columns:
+            return
+        ordered = df.sort_values("Timestamp", kind="mergesort") if "Timestamp" in df.columns else df
+        for label, email in zip(ordered.index, ordered["Email"]):
+            self._labels.setdefault(email, []).append(label)
+            self._latest_any[email] = label
+        for label, email, cycle in zip(ordered.index, ordered["Email"], ordered["Assessment Cycle"]):
+            self._latest[(email, cycle)] = label
+
+    @staticmethod
+    def _key(email):
+        return str(email or "").strip().lower()
+
+    def has(self, email, cycle=None):
+        email = self._key(email)
+        if cycle is None:
+            return email in self._latest_any
+        return (email, cycle) in self._latest
+
+    def emails(self, cycle=None):
+        if cycle is None:
+            return set(self._latest_any)
+        return {email for email, c in self._latest if c == cycle}
+
+    def latest_labels(self, emails, cycles=None):
+        """Row labels (sheet order) of each email's newest submission per cycle, limited to `cycles` if given."""
+        emails = {self._key(e) for e in emails}
+        return sorted(
+            label for (email, cycle), label in self._latest.items()
+            if email in emails and (cycles is None or cycle in cycles)
+        )
+
+    def latest_row(self, email, cycle=None):
+        """Newest submission as a dict, or None."""
+        label = self._label(email, cycle)
+        return None if label is None else self.df.loc[label].to_dict()
+
+    def latest_frame(self, email, cycle=None):
+        """Newest submission as a one-row DataFrame, or None."""
+        label = self._label(email, cycle)
+        return None if label is None else self.df.loc[[label]]
+
+    def latest_codes(self, email, cycle=None):
+        """Newest submission's rating codes (int8, STRANDS order), or None."""
+        label = self._label(email, cycle)
+        return None if label is None else self.ratings.row(label)
+
+    def latest_text(self, email, cycle=None):
+        """Newest submission's non-rating strand cells as {strand position: text}."""
+        label = self._label(email, cycle)
+        return {} if label is None else self.ratings.text(label)
+
+    def latest_timestamp(self, email, cycle=None):
+        label = self._label(email, cycle)
+        if label is None or "Timestamp" not in self.df.columns:
+            return None
+        return self.df.at[label, "Timestamp"]
+
+    def rows_for(self, email):
+        labels = self._labels.get(self._key(email), [])
+        return self.df.loc[labels] if labels else self.df.iloc[0:0]
+
+    def appended(self, values):
+        """
+        New index with `values` (one sheet row, in header order) added, mirroring
+        an `append_row` without re-reading the sheet. None if there is no header to map onto.
+        """
+        if not self.header:
+            return None
+        values = list(values)[:len(self.header)]
+        values += [""] * (len(self.header) - len(values))
+        new_row = pd.DataFrame([values], columns=self.header, index=[len(self.df)])
+        new_row = normalise_responses_df(new_row)
+        # Differing categories concat to object dtype; re-categorise the combined frame.
+        combined = categorise_ratings(pd.concat([self.df, new_row]))
+        return ResponsesIndex(combined, header=self.header)
+
+    def _label(self, email, cycle):
+        email = self._key(email)
+        if cycle is None:
+            return self._latest_any.get(email)
+        return self._latest.get((email, cycle))
+
+def build_responses_index(vals):
+    """Build a ResponsesIndex from `get_all_values()` output (header row first)."""
+    if not vals:
+        return ResponsesIndex(pd.DataFrame())
+    header, rows = vals[0], vals[1:]
+    df = pd.DataFrame(rows, columns=header) if rows else pd.DataFrame(columns=header)
+    return ResponsesIndex(normalise_responses_df(df), header=header)
@@ -0,0 +1,54 @@
+# rubric.py
+# Kim Marshall rubric structure: domains, their strands, and the rating scale.
+
+DOMAINS = {
+    "A: Planning and Preparation for Learning": [
+        ("A1", "Expertise"), ("A2", "Goals"), ("A3", "Units"),
+        ("A4", "Assessments"), ("A5", "Anticipation"), ("A6", "Lessons"),
+        ("A7", "Materials"), ("A8", "Differentiation"), ("A9", "Environment"),
+    ],
+    "B: Classroom Management": [
+        ("B1", "Expectations"), ("B2", "Relationships"), ("B3", "Social Emotional"),
+        ("B4", "Routines"), ("B5", "Responsibility"), ("B6", "Repertoire"),
+        ("B7", "Prevention"), ("B8", "Incentives"),
+    ],
+    "C: Delivery of Instruction": [
+        ("C1", "Expectations"), ("C2", "Mindset"), ("C3", "Framing"),
+        ("C4", "Connections"), ("C5", "Clarity"), ("C6", "Repertoire"),
+        ("C7", "Engagement"), ("C8", "Differentiation"), ("C9", "Nimbleness"),
+    ],
+    "D: Monitoring, Assessment, and Follow-Up": [
+        ("D1", "Criteria"), ("D2", "Diagnosis"), ("D3", "Goals"),
+        ("D4", "Feedback"), ("D5", "Recognition"), ("D6", "Analysis"),
+        ("D7", "Tenacity"), ("D8", "Support"), ("D9", "Reflection"),
+    ],
+    "E: Family and Community Outreach": [
+        ("E1", "Respect"), ("E2", "Belief"), ("E3", "Expectations"),
+        ("E4", "Communication"), ("E5", "Involving"), ("E6", "Responsiveness"),
+        ("E7", "Reporting"), ("E8", "Outreach"), ("E9", "Resources"),
+    ],
+    "F: Professional Responsibility": [
+        ("F1", "Language"), ("F2", "Reliability"), ("F3", "Professionalism"),
+        ("F4", "Judgement"), ("F5", "Teamwork"), ("F6", "Leadership"),
+        ("F7", "Openness"), ("F8", "Collaboration"), ("F9", "Growth"),
+    ],
+}
+
+RATINGS = [
+    "Highly Effective", "Effective",
+    "Improvement Necessary", "Does Not Meet Standards",
+]
+
+# "A1 Expertise", ... in sheet order
+STRANDS = [f"{code} {label}" for items in DOMAINS.values() for code, label in items]
+
+def response_headers(enable_reflections=True):
+    """Responses sheet header: submission details, each domain's strands (and reflection), Last Edited On."""
+    headers = ["Timestamp", "Email", "Name", "Appraiser", "Assessment Cycle"]
+    for domain, items in DOMAINS.items():
+        for code, label in items:
+            headers.append(f"{code} {label}")
+        if enable_reflections:
+            headers.append(f"{domain} Reflection")
+    headers.append("Last Edited On")
+    return headers
@@ -0,0 +1,498 @@
+# sheets.py
+# Shared Google Sheets access – one authorised client per process and a cached Users directory.
+
+import hashlib
+import logging
+import os
+import random
+import threading
+import time
+
+import gspread
+import pandas as pd
+import requests
+import streamlit as st
+from google.oauth2.service_account import Credentials
+
+from mirror import SheetMirror
+from storage import GSPREAD_BACKEND, LOCAL_BACKEND, local_spreadsheet_from_env
+from tracing import cache_lookup, get_tracer, span
+from users_index import UsersIndex
+
+SPREADSHEET_ID = "1kqcfnMx4KhqQvFljsTwSOcmuEHnkLAdwp_pUJypOjpY"
+SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+# "local" swaps Google Sheets for the in-process stand-in in storage.py (offline runs, load tests)
+SHEETS_BACKEND = os.environ.get("SHEETS_BACKEND", GSPREAD_BACKEND)
+
+USERS_SHEET_NAME = "Users"
+USERS_TTL_SECONDS = 300
+# An unknown email forces a reload so new hires can log in straight away,
+# but never more often than this.
+USERS_MISS_REFRESH_SECONDS = 30
+
+# After a failed background refresh, keep serving the old snapshot this long before retrying
+SNAPSHOT_RETRY_SECONDS = 30
+
+MIRROR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".mirror", "sheets.sqlite3")
+
+# Google's default Sheets quota is 60 requests/minute per user per project;
+# keep a little headroom for calls made outside this process.
+SHEETS_REQUESTS_PER_MINUTE = 55
+SHEETS_BURST = 10
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 0.6
+BACKOFF_MAX_SECONDS = 32.0
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# Call gateway: rate limit, retry, metrics
+# =========================
+class TokenBucket:
+    """Process-wide limiter: `rate_per_minute` calls on average, up to `burst` at once."""
+
+    def __init__(self, rate_per_minute, burst):
+        self._rate = rate_per_minute / 60.0
+        self._capacity = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping (outside the lock) until one is available. Returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                wait = (1.0 - self._tokens) / self._rate
+            time.sleep(wait)
+            waited += wait
+
+class CallMetrics:
+    """Per-operation call counts, attempts, failures and latency."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, name, seconds, attempts, ok, throttled=0.0):
+        with self._lock:
+            entry = self._stats.setdefault(name, {
+                "calls": 0, "attempts": 0, "errors": 0,
+                "total_s": 0.0, "max_s": 0.0, "throttled_s": 0.0,
+            })
+            entry["calls"] += 1
+            entry["attempts"] += attempts
+            entry["errors"] += 0 if ok else 1
+            entry["total_s"] += seconds
+            entry["max_s"] = max(entry["max_s"], seconds)
+            entry["throttled_s"] += throttled
+
+    def snapshot(self):
+        with self._lock:
+            return {name: dict(v) for name, v in self._stats.items()}
+
+def call_metric_rows(stats):
+    """CallMetrics.snapshot() as display rows, busiest first: retries, failures and limiter waits per operation."""
+    rows = []
+    for name, entry in sorted(stats.items(), key=lambda kv: -kv[1]["attempts"]):
+        rows.append({
+            "Call": name,
+            "Calls": entry["calls"],
+            "Attempts": entry["attempts"],
+            "Retries": entry["attempts"] - entry["calls"],
+            "Errors": entry["errors"],
+            "Avg ms": round(entry["total_s"] * 1000 / entry["calls"], 1) if entry["calls"] else 0.0,
+            "Max ms": round(entry["max_s"] * 1000, 1),
+            "Throttled ms": round(entry["throttled_s"] * 1000, 1),
+        })
+    return rows
+
+def _status_of(exc):
+    if isinstance(exc, gspread.exceptions.APIError):
+        response = getattr(exc, "response", None)
+        return getattr(response, "status_code", None) or getattr(exc, "code", None)
+    return getattr(exc, "status_code", None)
+
+def _retry_after(exc):
+    response = getattr(exc, "response", None)
+    value = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def _is_retryable(exc):
+    if isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    return _status_of(exc) in RETRY_STATUSES
+
+class SheetsGateway:
+    """
+    Every worksheet call goes through here: one limiter token per attempt, and
+    exponential backoff with full jitter on 429/5xx (honouring Retry-After) so
+    concurrent sessions don't retry in lockstep. Other errors are raised at once.
+    """
+
+    def __init__(self, limiter, metrics, max_attempts=MAX_ATTEMPTS):
+        self.limiter = limiter
+        self.metrics = metrics
+        self._max_attempts = max_attempts
+
+    def call(self, fn, *args, **kwargs):
+        name = getattr(fn, "__qualname__", None) or repr(fn)
+        started = time.monotonic()
+        throttled = 0.0
+        attempt = 0
+        while True:
+            attempt += 1
+            throttled += self.limiter.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if not _is_retryable(e) or attempt >= self._max_attempts:
+                    self._record(name, time.monotonic() - started, attempt, False, throttled)
+                    raise
+                cap = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** (attempt - 1)))
+                delay = random.uniform(0, cap)
+                retry_after = _retry_after(e)
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+                time.sleep(delay)
+                continue
+            self._record(name, time.monotonic() - started, attempt, True, throttled)
+            return result
+
+    def _record(self, name, seconds, attempts, ok, throttled):
+        self.metrics.record(name, seconds, attempts, ok, throttled)
+        get_tracer().record(f"sheets.{name}", seconds)
+
+# Module-level so the draft autosave thread shares it with script runs.
+_gateway = SheetsGateway(TokenBucket(SHEETS_REQUESTS_PER_MINUTE, SHEETS_BURST), CallMetrics())
+
+def get_sheets_gateway():
+    return _gateway
+
+def with_backoff(fn, *args, **kwargs):
+    return _gateway.call(fn, *args, **kwargs)
+
+# =========================
+# Client
+# =========================
+@st.cache_resource
+def get_client():
+    creds = Credentials.from_service_account_info(st.secrets["google"], scopes=SCOPES)
+    return gspread.authorize(creds)
+
+@st.cache_resource
+def get_spreadsheet():
+    if SHEETS_BACKEND == LOCAL_BACKEND:
+        return local_spreadsheet_from_env()
+    return get_client().open_by_key(SPREADSHEET_ID)
+
+# =========================
+# Users directory
+# =========================
+USERS_COLUMNS = ["Email", "Name", "Appraiser", "Role", "Password", "Campus"]
+USERS_HEADER_CANDIDATES = {
+    "Email":     ["email", "school email", "work email", "ois email", "e-mail"],
+    "Name":      ["name", "full name", "teacher name", "staff name"],
+    "Appraiser": ["appraiser", "line manager", "manager", "appraiser name", "supervisor"],
+    "Role":      ["role", "access", "admin"],
+    "Password":  ["password", "pwd", "pass"],
+    "Campus":    ["campus"],
+}
+
+def _pick_col(candidates, cols):
+    norm_map = {c.strip().lower(): c for c in cols}
+    for want in candidates:
+        key = want.strip().lower()
+        if key in norm_map:
+            return norm_map[key]
+    for c in cols:
+        cl = c.strip().lower()
+        if any(w in cl for w in candidates):
+            return c
+    return None
+
+def map_users_header(header):
+    """Canonical column -> 1-based sheet column for the Users header (None if absent)."""
+    header = [str(h) for h in header]
+    mapping = {}
+    for canonical in USERS_COLUMNS:
+        picked = _pick_col(USERS_HEADER_CANDIDATES[canonical], header)
+        mapping[canonical] = header.index(picked) + 1 if picked is not None else None
+    return mapping
+
+def build_users_df(columns):
+    """Normalised Users frame from {canonical: [cell, ...]} (data rows only)."""
+    n = max((len(v) for v in columns.values()), default=0)
+    raw = {k: [str(x) for x in v] + [""] * (n - len(v)) for k, v in columns.items()}
+    if n == 0:
+        return pd.DataFrame(columns=USERS_COLUMNS)
+    out = pd.DataFrame(index=range(n))
+    blank = pd.Series([""] * n)
+    out["Email"] = pd.Series(raw["Email"]).str.strip().str.lower() if "Email" in raw else blank
+    out["Name"] = pd.Series(raw["Name"]).str.strip() if "Name" in raw else blank
+    out["Appraiser"] = (
+        pd.Series(raw["Appraiser"]).str.strip().replace({"": "Not Assigned"})
+        if "Appraiser" in raw else "Not Assigned"
+    )
+    out["Role"] = pd.Series(raw["Role"]).str.strip().str.lower() if "Role" in raw else blank
+    out["Password"] = pd.Series(raw["Password"]).str.strip() if "Password" in raw else blank
+    out["Campus"] = pd.Series(raw["Campus"]).str.strip() if "Campus" in raw else blank
+    # Rows that are blank in every mapped column are spacer rows, not users
+    keep = (out[["Email", "Name", "Role", "Campus"]] != "").any(axis=1)
+    return out[keep].reset_index(drop=True)
+
+class UsersDirectory:
+    """
+    Process-wide snapshot of the Users sheet, keyed by lower-cased email.
+
+    The header mapping is worked out once. Each TTL refresh reads only the mapped
+    columns in a single batch_get and compares a digest. An unchanged sheet keeps the
+    same frame and `version`, so anything derived from it stays valid.
+    With a `mirror`, each refresh is saved locally and a restarted process starts
+    from that copy while it is younger than the TTL.
+    """
+
+    def __init__(self, ws_getter, ttl=USERS_TTL_SECONDS, mirror=None):
+        self._ws_getter = ws_getter
+        self._mirror = mirror
+        self._ws = None
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._header = None
+        self._mapping = None
+        self._digest = None
+        self._df = None
+        self._by_email = {}
+        self._loaded_at = 0.0
+        self._index = None
+        self.version = 0
+
+    def _expired(self):
+        return self._df is None or (time.monotonic() - self._loaded_at) > self._ttl
+
+    def _fetch_columns(self, ws):
+        if self._mapping is None:
+            self._header = [str(h) for h in with_backoff(ws.row_values, 1)]
+            self._mapping = map_users_header(self._header)
+        mapped = [(k, c) for k, c in self._mapping.items() if c is not None]
+        if not mapped:
+            return {}
+        ranges = []
+        for _, col in mapped:
+            letter = gspread.utils.rowcol_to_a1(1, col).rstrip("1")
+            ranges.append(f"{letter}1:{letter}")
+        results = with_backoff(ws.batch_get, ranges, major_dimension="COLUMNS")
+        columns = {}
+        for (canonical, col), value_range in zip(mapped, results):
+            cells = value_range[0] if value_range else []
+            if not cells or str(cells[0]) != self._header[col - 1]:
+                return None  # header moved; caller re-maps and retries
+            columns[canonical] = cells[1:]
+        return columns
+
+    def _reload(self):
+        if self._ws is None:
+            self._ws = self._ws_getter()
+        ws = self._ws
+        columns = self._fetch_columns(ws)
+        if columns is None:
+            self._mapping = None
+            columns = self._fetch_columns(ws) or {}
+        digest = hashlib.sha1(repr(sorted(columns.items())).encode("utf-8")).hexdigest()
+        self._loaded_at = time.monotonic()
+        if digest != self._digest or self._df is None:
+            self._set_df(build_users_df(columns))
+            self._digest = digest
+        if self._mirror is not None:
+            self._mirror.load_full(USERS_SHEET_NAME, [USERS_COLUMNS] + self._df[USERS_COLUMNS].values.tolist())
+
+    def _set_df(self, df):
+        by_email = {}
+        # First row wins, matching the old `match.iloc[0]` behaviour.
+        for rec in reversed(df.to_dict("records")):
+            if rec["Email"]:
+                by_email[rec["Email"]] = rec
+        self._df = df
+        self._by_email = by_email
+        self.version += 1
+
+    def _seed_from_mirror(self):
+        meta = self._mirror.meta(USERS_SHEET_NAME)
+        age = time.time() - meta["synced_at"] if meta else None
+        if age is None or age > self._ttl or meta["header"] != USERS_COLUMNS:
+            return
+        values = self._mirror.values(USERS_SHEET_NAME)
+        self._set_df(pd.DataFrame(values[1:], columns=USERS_COLUMNS))
+        self._loaded_at = time.monotonic() - age
+
+    def _ensure_fresh(self, force=False):
+        with self._lock:
+            if self._df is None and not force and self._mirror is not None:
+                self._seed_from_mirror()
+            stale = force or self._expired()
+            cache_lookup("users", not stale)
+            if stale:
+                with span("load.users"):
+                    self._reload()
+
+    def invalidate(self):
+        """Force a re-check (and re-read of the header) on next use."""
+        with self._lock:
+            self._loaded_at = 0.0
+            self._mapping = None
+
+    def df(self):
+        self._ensure_fresh()
+        return self._df
+
+    def index(self):
+        """UsersIndex for the current snapshot; rebuilt only when the sheet contents change."""
+        self._ensure_fresh()
+        with self._lock:
+            hit = self._index is not None and self._index[0] == self.version
+            cache_lookup("users.index", hit)
+            if not hit:
+                with span("build.users.index"):
+                    self._index = (self.version, UsersIndex(self._df))
+            return self._index[1]
+
+    def lookup(self, email):
+        """Return the Users row for `email` as a dict, or None if not registered."""
+        key = str(email or "").strip().lower()
+        if not key:
+            return None
+        self._ensure_fresh()
+        rec = self._by_email.get(key)
+        if rec is None and (time.monotonic() - self._loaded_at) > USERS_MISS_REFRESH_SECONDS:
+            self._ensure_fresh(force=True)
+            rec = self._by_email.get(key)
+        return rec
+
+@st.cache_resource
+def get_sheet_mirror():
+    return SheetMirror(MIRROR_PATH)
+
+@st.cache_resource
+def get_users_directory():
+    return UsersDirectory(lambda: get_spreadsheet().worksheet(USERS_SHEET_NAME), mirror=get_sheet_mirror())
+
+# =========================
+# Write-through worksheet snapshots
+# =========================
+class SheetSnapshot:
+    """
+    Cached parse of one worksheet, served stale-while-revalidate: once the TTL
+    lapses, callers keep getting the last good snapshot while a single background
+    thread reloads it (one refresh per snapshot, however many sessions ask). Only
+    the very first load, or one after `invalidate()`, makes a caller wait.
+    Writers hold `write_lock` around their Sheets call and then `patch()` the
+    snapshot with the same change, so a save never triggers a re-read. The
+    background reload runs without any lock and takes `write_lock` only to swap
+    its result in; if a `patch()` landed since it started, the reload is dropped
+    (it may predate that write) and the next caller starts another.
+    `name` labels its cache counters and load spans.
+    """
+
+    def __init__(self, loader, ttl, name="snapshot", retry_after=SNAPSHOT_RETRY_SECONDS):
+        self.name = name
+        self._loader = loader
+        self._ttl = ttl
+        self._retry_after = retry_after
+        self._lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self._value = None
+        self._loaded_at = 0.0
+        self._loaded_wall = None
+        self._refreshing = False
+        self._retry_at = 0.0
+        self._derived = {}
+        self.version = 0
+
+    def _store(self, value):
+        """Caller holds `_lock`."""
+        self._value = value
+        self._loaded_at = time.monotonic()
+        self._loaded_wall = time.time()
+        self.version += 1
+
+    def _get_versioned(self):
+        with self._lock:
+            if self._value is None:
+                cache_lookup(self.name, False)
+                with span(f"load.{self.name}"):
+                    self._store(self._loader())
+            else:
+                cache_lookup(self.name, True)
+                now = time.monotonic()
+                if now - self._loaded_at > self._ttl and not self._refreshing and now >= self._retry_at:
+                    self._refreshing = True
+                    threading.Thread(
+                        target=self._refresh, args=(self.version,), name=f"refresh-{self.name}", daemon=True
+                    ).start()
+            return self._value, self.version
+
+    def _refresh(self, started_version):
+        try:
+            with span(f"refresh.{self.name}"):
+                value = self._loader()
+            with self.write_lock, self._lock:
+                if self.version == started_version:
+                    self._store(value)
+        except Exception:
+            logger.warning("Background refresh of %s failed; serving the previous snapshot", self.name, exc_info=True)
+            with self._lock:
+                self._retry_at = time.monotonic() + self._retry_after
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def age(self):
+        """Seconds since the snapshot was read from the sheet, or None before the first load."""
+        with self._lock:
+            return None if self._loaded_wall is None else time.time() - self._loaded_wall
+
+    @property
+    def refreshing(self):
+        return self._refreshing
+
+    def get(self):
+        return self._get_versioned()[0]
+
+    def derived(self, name, fn):
+        """fn(snapshot), computed once per snapshot version and shared by every caller."""
+        value, version = self._get_versioned()
+        with self._lock:
+            cached = self._derived.get(name)
+            if cached is not None and cached[0] == version:
+                cache_lookup(f"{self.name}.{name}", True)
+                return cached[1]
+        cache_lookup(f"{self.name}.{name}", False)
+        with span(f"build.{self.name}.{name}"):
+            result = fn(value)
+        with self._lock:
+            if version == self.version:   # a slow build mustn't replace one for a newer snapshot
+                self._derived[name] = (version, result)
+        return result
+
+    def patch(self, fn):
+        """Replace the snapshot with fn(snapshot); a None result drops it for a full reload."""
+        with self._lock:
+            if self._value is None:
+                return
+            self._value = fn(self._value)
+            self.version += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._value = None
+            self.version += 1
@@ -0,0 +1,286 @@
+# storage.py
+# Storage backends for the four datasets (Users, Responses, Drafts, FinalEvaluation).
+#
+# The app talks to worksheets through this subset of the gspread Worksheet API, always via
+# sheets.with_backoff:
+#   title, row_values, col_values, get_all_values, get, batch_get, update, append_row, insert_row
+# and to the spreadsheet through worksheet(name) / add_worksheet(title, rows, cols).
+# gspread's own Spreadsheet/Worksheet are the production backend; LocalSpreadsheet below is an
+# in-process stand-in (in memory, or persisted to SQLite) with optional latency and quota errors.
+
+import json
+import os
+import random
+import re
+import threading
+import time
+
+import requests
+from gspread.exceptions import APIError, WorksheetNotFound
+from gspread.utils import a1_to_rowcol
+
+from mirror import connect_private
+
+LOCAL_BACKEND = "local"
+GSPREAD_BACKEND = "gspread"
+
+# =========================
+# Fault injection
+# =========================
+def quota_error(message="Quota exceeded for quota metric 'Read requests' (local stand-in)"):
+    """An APIError shaped like Google's 429 RESOURCE_EXHAUSTED response."""
+    response = requests.Response()
+    response.status_code = 429
+    response._content = json.dumps(
+        {"error": {"code": 429, "message": message, "status": "RESOURCE_EXHAUSTED"}}
+    ).encode("utf-8")
+    return APIError(response)
+
+class Faults:
+    """
+    Per-call latency (`latency` seconds plus up to `jitter` more) and a probability
+    `error_rate` of failing a call with a 429 quota error.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def before_call(self):
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.error_rate and self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise quota_error()
+
+NO_FAULTS = Faults()
+
+def grid_error(a1, row_count):
+    """The 400 Sheets returns for a range that starts below the sheet's last grid row."""
+    response = requests.Response()
+    response.status_code = 400
+    message = f"Range ({a1}) exceeds grid limits. Max rows: {row_count}"
+    response._content = json.dumps(
+        {"error": {"code": 400, "message": message, "status": "INVALID_ARGUMENT"}}
+    ).encode("utf-8")
+    return APIError(response)
+
+# =========================
+# A1 ranges
+# =========================
+_A1_CELL = re.compile(r"^([A-Za-z]*)(\d*)$")
+
+def _parse_cell(ref):
+    letters, digits = _A1_CELL.match(ref).groups()
+    col = a1_to_rowcol(f"{letters}1")[1] if letters else None
+    return (int(digits) if digits else None), col
+
+def parse_range(a1):
+    """'A5:BH' -> (5, 1, None, 60); open ends are None. A sheet-name prefix is ignored."""
+    a1 = a1.split("!")[-1]
+    start, _, end = a1.partition(":")
+    r1, c1 = _parse_cell(start)
+    r2, c2 = _parse_cell(end) if end else (r1, c1)
+    return r1 or 1, c1 or 1, r2, c2
+
+def _trim(row):
+    end = len(row)
+    while end and row[end - 1] == "":
+        end -= 1
+    return row[:end]
+
+# =========================
+# Local worksheet / spreadsheet
+# =========================
+class LocalWorksheet:
+    """
+    A worksheet held as a list of rows of strings; Sheets' trimming and padding rules apply
+    on read. `row_count` is the grid size: writes grow it, and reads starting below it fail.
+    """
+
+    def __init__(self, spreadsheet, title, rows=None, grid_rows=0):
+        self._sheet = spreadsheet
+        self.title = title
+        self._rows = [[str(c) for c in r] for r in (rows or [])]
+        self.row_count = max(int(grid_rows), len(self._rows))
+
+    def _check_grid(self, a1):
+        if parse_range(a1)[0] > self.row_count:
+            raise grid_error(f"'{self.title}'!{a1.split('!')[-1]}", self.row_count)
+
+    # ── reads ──
+    def _slice(self, r1, c1, r2, c2):
+        rows = self._rows[r1 - 1:r2 if r2 is not None else None]
+        out = [_trim(r[c1 - 1:c2 if c2 is not None else None]) for r in rows]
+        while out and not out[-1]:
+            out.pop()
+        return out
+
+    def row_values(self, row):
+        self._sheet._call()
+        with self._sheet._lock:
+            return _trim(list(self._rows[row - 1])) if 0 < row <= len(self._rows) else []
+
+    def col_values(self, col):
+        self._sheet._call()
+        with self._sheet._lock:
+            return _trim([r[col - 1] if len(r) >= col else "" for r in self._rows])
+
+    def get_all_values(self):
+        self._sheet._call()
+        with self._sheet._lock:
+            rows = self._slice(1, 1, None, None)
+        width = max((len(r) for r in rows), default=0)
+        return [r + [""] * (width - len(r)) for r in rows]
+
+    def get(self, range_name=None, **_):
+        self._sheet._call()
+        with self._sheet._lock:
+            if not range_name:
+                return self._slice(1, 1, None, None)
+            self._check_grid(range_name)
+            return self._slice(*parse_range(range_name))
+
+    def batch_get(self, ranges, major_dimension=None, **_):
+        self._sheet._call()
+        results = []
+        with self._sheet._lock:
+            for a1 in ranges:
+                self._check_grid(a1)
+                rows = self._slice(*parse_range(a1))
+                if str(major_dimension).upper().endswith("COLUMNS"):
+                    width = max((len(r) for r in rows), default=0)
+                    rows = [_trim([r[i] if i < len(r) else "" for r in rows]) for i in range(width)]
+                results.append(rows)
+        return results
+
+    # ── writes ──
+    def _ensure(self, row, width=0):
+        while len(self._rows) < row:
+            self._rows.append([])
+        self.row_count = max(self.row_count, len(self._rows))
+        if len(self._rows[row - 1]) < width:
+            self._rows[row - 1].extend([""] * (width - len(self._rows[row - 1])))
+
+    def update(self, *args, **kwargs):
+        """update(values, range_name) as in gspread 6, or the older update(range_name, values)."""
+        values, range_name = kwargs.get("values"), kwargs.get("range_name")
+        if args:
+            if isinstance(args[0], str):
+                range_name, values = args[0], args[1] if len(args) > 1 else values
+            else:
+                values, range_name = args[0], args[1] if len(args) > 1 else range_name
+        self._sheet._call()
+        r1, c1, _, _ = parse_range(range_name or "A1")
+        with self._sheet._lock:
+            for i, row_values in enumerate(values):
+                row = r1 + i
+                self._ensure(row, c1 - 1 + len(row_values))
+                self._rows[row - 1][c1 - 1:c1 - 1 + len(row_values)] = [str(v) for v in row_values]
+            self._sheet._persist(self, r1, r1 + len(values) - 1)
+        end_row = r1 + len(values) - 1
+        return {"updatedRange": f"{self.title}!A{r1}:A{end_row}", "updatedRows": len(values)}
+
+    def append_row(self, values, value_input_option=None, **_):
+        self._sheet._call()
+        with self._sheet._lock:
+            row = len(self._slice(1, 1, None, None)) + 1   # after the last non-empty row, like the API
+            self._ensure(row)
+            self._rows[row - 1] = [str(v) for v in values]
+            self._sheet._persist(self, row, row)
+        return {"updates": {"updatedRange": f"{self.title}!A{row}:A{row}", "updatedRows": 1}}
+
+    def insert_row(self, values, index=1, **_):
+        self._sheet._call()
+        with self._sheet._lock:
+            self._ensure(index - 1)
+            self._rows.insert(index - 1, [str(v) for v in values])
+            self.row_count = max(self.row_count + 1, len(self._rows))
+            self._sheet._persist(self, index, len(self._rows))
+        return {"updates": {"updatedRange": f"{self.title}!A{index}:A{index}"}}
+
+class LocalSpreadsheet:
+    """
+    Stand-in for a gspread Spreadsheet. With a `path` the sheets are kept in SQLite
+    (one row per sheet row) and survive restarts; without one they live in memory.
+    Every worksheet call first goes through `faults`.
+    """
+
+    def __init__(self, path=None, faults=NO_FAULTS):
+        self.faults = faults
+        self._lock = threading.RLock()
+        self._worksheets = {}
+        self._conn = None
+        if path:
+            self._conn = connect_private(path)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS local_rows ("
+                " sheet TEXT NOT NULL, row_num INTEGER NOT NULL, data TEXT NOT NULL, PRIMARY KEY (sheet, row_num))"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS local_sheets (sheet TEXT PRIMARY KEY)")
+            for (title,) in self._conn.execute("SELECT sheet FROM local_sheets").fetchall():
+                rows = [json.loads(d) for (d,) in self._conn.execute(
+                    "SELECT data FROM local_rows WHERE sheet = ? ORDER BY row_num", (title,)
+                )]
+                self._worksheets[title] = LocalWorksheet(self, title, rows)
+
+    def _call(self):
+        self.faults.before_call()
+
+    def _persist(self, ws, first_row, last_row):
+        if self._conn is None:
+            return
+        rows = [(ws.title, n, json.dumps(ws._rows[n - 1])) for n in range(first_row, last_row + 1)]
+        self._conn.executemany("INSERT OR REPLACE INTO local_rows (sheet, row_num, data) VALUES (?, ?, ?)", rows)
+
+    def worksheet(self, title):
+        self._call()
+        with self._lock:
+            if title not in self._worksheets:
+                raise WorksheetNotFound(title)
+            return self._worksheets[title]
+
+    def worksheets(self):
+        with self._lock:
+            return list(self._worksheets.values())
+
+    def add_worksheet(self, title, rows=1000, cols=26, **_):
+        self._call()
+        ws = self.seed(title, [])
+        ws.row_count = int(rows)
+        return ws
+
+    def seed(self, title, values):
+        """Create or replace `title` with `values` (header first). Not subject to faults."""
+        with self._lock:
+            ws = LocalWorksheet(self, title, values)
+            self._worksheets[title] = ws
+            if self._conn is not None:
+                self._conn.execute("BEGIN")
+                self._conn.execute("DELETE FROM local_rows WHERE sheet = ?", (title,))
+                self._conn.execute("INSERT OR IGNORE INTO local_sheets (sheet) VALUES (?)", (title,))
+                self._persist(ws, 1, len(ws._rows))
+                self._conn.execute("COMMIT")
+            return ws
+
+def local_spreadsheet_from_env(environ=os.environ):
+    """
+    LocalSpreadsheet configured by LOCAL_SHEETS_PATH (unset = in memory),
+    LOCAL_SHEETS_LATENCY_MS, LOCAL_SHEETS_JITTER_MS and LOCAL_SHEETS_ERROR_RATE (0–1).
+    """
+    faults = Faults(
+        latency=float(environ.get("LOCAL_SHEETS_LATENCY_MS", 0)) / 1000,
+        jitter=float(environ.get("LOCAL_SHEETS_JITTER_MS", 0)) / 1000,
+        error_rate=float(environ.get("LOCAL_SHEETS_ERROR_RATE", 0)),
+    )
+    return LocalSpreadsheet(environ.get("LOCAL_SHEETS_PATH") or None, faults=faults)
@@ -0,0 +1,64 @@
+# summary.py
+# "Summary of Teachers" table for the Admin and Super Admin panels, built in one pandas pass.
+
+import pandas as pd
+
+SUMMARY_COLUMNS = [
+    "Teacher", "Email", "Initial Status", "Final Status",
+    "Teacher Final Eval", "Appraiser Final Eval", "Last Initial", "Last Final",
+]
+
+def _last_submission_dates(resp_df):
+    """Latest Timestamp per email for the Initial and Final cycles."""
+    cols = ["Last Initial", "Last Final"]
+    needed = {"Email", "Assessment Cycle", "Timestamp"}
+    if resp_df.empty or not needed.issubset(resp_df.columns):
+        return pd.DataFrame(columns=cols, index=pd.Index([], name="Email"))
+    last = (
+        resp_df.loc[resp_df["Assessment Cycle"].isin(["Initial", "Final"]), ["Email", "Assessment Cycle", "Timestamp"]]
+        .groupby(["Email", "Assessment Cycle"])["Timestamp"].max()
+        .unstack("Assessment Cycle")
+        .reindex(columns=["Initial", "Final"])
+    )
+    last.columns = cols
+    return last
+
+def _final_eval_flags(final_eval_states):
+    """Teacher Submitted / Appraiser Completed flags from each teacher's FinalEvaluationState."""
+    cols = ["Teacher Submitted", "Appraiser Completed"]
+    if not final_eval_states:
+        return pd.DataFrame(columns=cols, index=pd.Index([], name="Teacher Email"))
+    return pd.DataFrame(
+        [(s.teacher_submitted, s.appraiser_completed) for s in final_eval_states.values()],
+        columns=cols,
+        index=pd.Index(list(final_eval_states), name="Teacher Email"),
+    )
+
+def build_teacher_summary(assigned, resp_df, final_eval_states):
+    """
+    One row per teacher in `assigned` (a Users frame) with submission status and dates.
+    `final_eval_states` maps teacher email -> FinalEvaluationState.
+    Cost is a couple of groupbys and merges, independent of how many teachers are listed.
+    """
+    if assigned.empty:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+
+    summary = pd.DataFrame({
+        "Teacher": assigned["Name"].to_numpy(),
+        "Email": assigned["Email"].astype(str).str.strip().str.lower().to_numpy(),
+    })
+    summary = summary.merge(_last_submission_dates(resp_df), left_on="Email", right_index=True, how="left")
+    summary = summary.merge(_final_eval_flags(final_eval_states), left_on="Email", right_index=True, how="left")
+
+    submitted = {True: "✅ Submitted", False: "❌ Not Submitted"}
+    summary["Initial Status"] = summary["Last Initial"].notna().map(submitted)
+    summary["Final Status"] = summary["Last Final"].notna().map(submitted)
+    summary["Teacher Final Eval"] = (
+        summary["Teacher Submitted"].fillna(False).astype(bool).map({True: "✅ Submitted", False: "❌ Pending"})
+    )
+    summary["Appraiser Final Eval"] = (
+        summary["Appraiser Completed"].fillna(False).astype(bool).map({True: "✅ Completed", False: "❌ Pending"})
+    )
+    summary["Last Initial"] = summary["Last Initial"].fillna("-")
+    summary["Last Final"] = summary["Last Final"].fillna("-")
+    return summary[SUMMARY_COLUMNS].reset_index(drop=True)
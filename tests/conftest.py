@@ -0,0 +1,5 @@
+# Tests import the app's modules from the repository root, as pages/main.py does.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
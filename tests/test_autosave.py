@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+import autosave
+from autosave import DraftAutosaver, DraftJournal
+from drafts import DraftsStore
+from storage import LocalSpreadsheet
+
+HEADERS = ["Email", "A1 Knowledge", "A2 Standards", "Reflection-A"]
+
+class _Calls(list):
+    def __call__(self, fn, *args, **kwargs):
+        self.append(fn.__name__)
+        return fn(*args, **kwargs)
+
+@pytest.fixture
+def setup(tmp_path, monkeypatch):
+    """(autosaver, store, worksheet, calls) with the background thread parked unless a test wakes it."""
+    monkeypatch.setattr(autosave, "TICK_SECONDS", 3600)
+    ws = LocalSpreadsheet().seed("Drafts", [HEADERS, ["a@x.org", "Effective", "", "Old notes"]])
+    calls = _Calls()
+    store = DraftsStore(ws, HEADERS, calls)
+    return DraftAutosaver(DraftJournal(str(tmp_path / "journal.sqlite3")), store), store, ws, calls
+
+def test_journal_keeps_the_latest_value_per_field(tmp_path):
+    journal = DraftJournal(str(tmp_path / "journal.sqlite3"))
+    journal.record("a@x.org", "A1 Knowledge", "Developing")
+    journal.record("a@x.org", "A1 Knowledge", "Effective")
+    changes, up_to_id = journal.pending("a@x.org")
+    journal.record("a@x.org", "A2 Standards", None)
+    assert changes == {"A1 Knowledge": "Effective"}
+    journal.mark_flushed("a@x.org", up_to_id)
+    assert journal.pending("a@x.org")[0] == {"A2 Standards": ""}
+    assert journal.dirty_emails() == ["a@x.org"]
+
+def test_flush_coalesces_edits_into_one_write(setup):
+    autosaver, _, ws, calls = setup
+    for value in ("Developing", "Effective", "Highly Effective"):
+        autosaver.record("a@x.org", "A1 Knowledge", value)
+    autosaver.record("a@x.org", "A2 Standards", "Effective")
+    assert autosaver.flush("a@x.org")
+    assert calls.count("update") == 1
+    assert ws.row_values(2) == ["a@x.org", "Highly Effective", "Effective", "Old notes"]
+    assert autosaver.pending("a@x.org") == {}
+    assert not autosaver.flush("a@x.org")
+
+def test_second_flush_reuses_the_last_payload(setup):
+    autosaver, _, ws, calls = setup
+    autosaver.record("a@x.org", "A1 Knowledge", "Developing")
+    autosaver.flush("a@x.org")
+    reads = calls.count("row_values")
+    autosaver.record("a@x.org", "Reflection-A", "New notes")
+    autosaver.flush("a@x.org")
+    assert calls.count("row_values") == reads
+    assert ws.row_values(2) == ["a@x.org", "Developing", "", "New notes"]
+
+def test_flush_rereads_after_another_save(setup):
+    autosaver, store, ws, _ = setup
+    autosaver.record("a@x.org", "A1 Knowledge", "Developing")
+    autosaver.flush("a@x.org")
+    store.save("a@x.org", {"A1 Knowledge": "Developing", "A2 Standards": "Effective"})   # e.g. from another session
+    autosaver.record("a@x.org", "Reflection-A", "Notes")
+    autosaver.flush("a@x.org")
+    assert ws.row_values(2) == ["a@x.org", "Developing", "Effective", "Notes"]
+
+def test_pending_edits_overlay_the_sheet_copy(setup):
+    autosaver, store, _, _ = setup
+    autosaver.record("a@x.org", "Reflection-A", "Typed but not flushed")
+    draft = store.load("a@x.org")
+    draft.update(autosaver.pending("a@x.org"))   # as load_draft does
+    assert draft["A1 Knowledge"] == "Effective"
+    assert draft["Reflection-A"] == "Typed but not flushed"
+
+def test_background_thread_flushes_dirty_drafts(tmp_path, monkeypatch):
+    monkeypatch.setattr(autosave, "TICK_SECONDS", 0.01)
+    ws = LocalSpreadsheet().seed("Drafts", [HEADERS])
+    autosaver = DraftAutosaver(DraftJournal(str(tmp_path / "journal.sqlite3")), DraftsStore(ws, HEADERS, _Calls()), interval=0)
+    autosaver.record("b@x.org", "A1 Knowledge", "Effective")
+    deadline = time.monotonic() + 2
+    while autosaver.pending("b@x.org") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert ws.row_values(2) == ["b@x.org", "Effective"]
@@ -0,0 +1,35 @@
+from comparison import teacher_comparison
+from responses import build_responses_index
+from rubric import STRANDS, response_headers
+
+HEADER = response_headers(False)
+
+def _row(timestamp, cycle, rating="Effective", **cells):
+    values = dict.fromkeys(HEADER, "")
+    values.update({"Timestamp": timestamp, "Email": "a@x.org", "Name": "T", "Appraiser": "jo", "Assessment Cycle": cycle})
+    values.update({s: rating for s in STRANDS})
+    values.update(cells)
+    return [values[h] for h in HEADER]
+
+def test_comparison_keeps_non_rating_text():
+    strand = STRANDS[0]
+    index = build_responses_index([
+        HEADER,
+        _row("2025-09-01 08:00:00", "Initial", **{strand: " N/A "}),
+        _row("2026-04-01 08:00:00", "Final"),
+    ])
+    comparison = teacher_comparison(index, "a@x.org").set_index("Strand")
+    assert comparison.at[strand, "Initial"] == "N/A"
+    assert comparison.at[strand, "Final"] == "E"
+    assert comparison.at[strand, "Trend"] == ""
+
+def test_comparison_trends():
+    index = build_responses_index([
+        HEADER,
+        _row("2025-09-01 08:00:00", "Initial", **{STRANDS[0]: "Improvement Necessary", STRANDS[1]: "Highly Effective"}),
+        _row("2026-04-01 08:00:00", "Final"),
+    ])
+    comparison = teacher_comparison(index, "a@x.org").set_index("Strand")
+    assert comparison.at[STRANDS[0], "Trend"] == "↑ Improved"
+    assert comparison.at[STRANDS[1], "Trend"] == "↓ Dropped"
+    assert comparison.at[STRANDS[2], "Trend"] == "→ No change"
@@ -0,0 +1,60 @@
+from drafts import DraftsStore, draft_headers
+from storage import LocalSpreadsheet
+
+DOMAINS = {"A": [("A1", "Knowledge"), ("A2", "Standards")], "B": [("B1", "Expectations")]}
+HEADERS = draft_headers(DOMAINS)
+
+class _Calls(list):
+    def __call__(self, fn, *args, **kwargs):
+        self.append(fn.__name__)
+        return fn(*args, **kwargs)
+
+def _store(rows=()):
+    ws = LocalSpreadsheet().seed("Drafts", [HEADERS, *rows])
+    calls = _Calls()
+    return DraftsStore(ws, HEADERS, calls), ws, calls
+
+def test_draft_headers():
+    assert HEADERS == ["Email", "A1 Knowledge", "A2 Standards", "Reflection-A", "B1 Expectations", "Reflection-B"]
+    assert draft_headers(DOMAINS, enable_reflections=False) == ["Email", "A1 Knowledge", "A2 Standards", "B1 Expectations"]
+
+def test_ensure_headers_fills_a_bare_sheet_only():
+    for existing in ([], [["Email"]]):
+        ws = LocalSpreadsheet().seed("Drafts", existing)
+        assert DraftsStore(ws, HEADERS, _Calls()).ensure_headers()
+        assert ws.row_values(1) == HEADERS
+    ws = LocalSpreadsheet().seed("Drafts", [["Email", "Something else"]])
+    assert not DraftsStore(ws, HEADERS, _Calls()).ensure_headers()
+    assert ws.row_values(1) == ["Email", "Something else"]
+
+def test_save_then_load_addresses_one_row():
+    store, ws, calls = _store([["b@x.org", "Effective"]])
+    assert store.save("A@x.org", {"A1 Knowledge": "Effective", "Reflection-A": "Notes"}) == 3
+    assert store.save("a@x.org", {"A1 Knowledge": "Highly Effective"}) == 3
+    del calls[:]
+    assert store.load(" a@X.org")["A1 Knowledge"] == "Highly Effective"
+    assert calls == ["row_values"]
+    assert ws.get_all_values()[1][:2] == ["b@x.org", "Effective"]
+    assert len(ws.get_all_values()) == 3
+
+def test_save_rechecks_the_sheet_before_appending():
+    store, ws, calls = _store()
+    store.row_for("a@x.org")   # index built while a@x.org has no row
+    ws.append_row(["a@x.org", "Effective"])   # another session saves first
+    assert store.save("a@x.org", {"A1 Knowledge": "Developing"}) == 2
+    assert len(ws.get_all_values()) == 2
+    assert "append_row" not in calls
+
+def test_load_rebuilds_the_index_after_a_hand_edit():
+    store, ws, _ = _store([["a@x.org", "Effective"], ["b@x.org", "Developing"]])
+    store.row_for("a@x.org")
+    ws.insert_row(["c@x.org"], index=2)   # rows shift under the cached index
+    assert store.load("b@x.org")["A1 Knowledge"] == "Developing"
+    assert store.load("nobody@x.org") == {}
+
+def test_generation_bumps_on_load_and_save():
+    store, _, _ = _store()
+    store.load("a@x.org")
+    store.save("A@x.org", {})
+    assert store.generation(" a@x.org") == 2
+    assert store.generation("b@x.org") == 0
@@ -0,0 +1,51 @@
+from final_eval import FINAL_EVAL_HEADERS, build_final_eval_df, final_eval_row_number, upsert_final_eval_row
+from mirror import appended_row_number
+from storage import LocalSpreadsheet
+
+def _row(email, comments=""):
+    record = {h: "" for h in FINAL_EVAL_HEADERS}
+    record.update({"Teacher Email": email, "Overall Comments": comments})
+    return [record[h] for h in FINAL_EVAL_HEADERS]
+
+def _df(*rows):
+    return build_final_eval_df([list(FINAL_EVAL_HEADERS), *rows], list(FINAL_EVAL_HEADERS))
+
+def _save(ws, df, row_values):
+    """What save_final_eval_record does: update or append, then patch the cached frame."""
+    row_num = final_eval_row_number(df, row_values[FINAL_EVAL_HEADERS.index("Teacher Email")])
+    if row_num is not None:
+        ws.update(f"A{row_num}:Y{row_num}", [row_values])
+    else:
+        row_num = appended_row_number(ws.append_row(row_values))
+    return upsert_final_eval_row(df, FINAL_EVAL_HEADERS, row_values, row_num)
+
+def _reread(ws):
+    return build_final_eval_df(ws.get_all_values(), list(FINAL_EVAL_HEADERS))
+
+def test_update_matches_a_reread_of_the_sheet():
+    df = _df(_row("a@x.org"), _row("b@x.org"))
+    row_num = final_eval_row_number(df, " B@X.org")
+    assert row_num == 3
+    patched = upsert_final_eval_row(df, FINAL_EVAL_HEADERS, _row("b@x.org", "Great year"), row_num)
+    assert patched.equals(_df(_row("a@x.org"), _row("b@x.org", "Great year")))
+    assert df.at[1, "Overall Comments"] == ""   # the original frame is untouched
+
+def test_append_after_an_out_of_band_append_keeps_rows_addressed():
+    ws = LocalSpreadsheet().seed("FinalEvaluation", [list(FINAL_EVAL_HEADERS), _row("a@x.org")])
+    df = _reread(ws)
+    ws.append_row(_row("other@x.org", "Another teacher's evaluation"))   # not in the cached frame
+    df = _save(ws, df, _row("C@x.org "))
+    assert final_eval_row_number(df, "c@x.org") == 4
+    df = _save(ws, df, _row("c@x.org", "Second save"))
+    reread = _reread(ws)
+    assert reread.at[1, "Overall Comments"] == "Another teacher's evaluation"
+    assert reread.at[2, "Overall Comments"] == "Second save"
+    assert df.loc[[0, 2]].equals(reread.loc[[0, 2]])
+
+def test_append_to_empty_sheet():
+    df = build_final_eval_df([], list(FINAL_EVAL_HEADERS))
+    patched = upsert_final_eval_row(df, FINAL_EVAL_HEADERS, _row("a@x.org"), 2)
+    assert final_eval_row_number(patched, "a@x.org") == 2
+
+def test_unknown_row_number_drops_the_frame():
+    assert upsert_final_eval_row(_df(_row("a@x.org")), FINAL_EVAL_HEADERS, _row("b@x.org"), None) is None
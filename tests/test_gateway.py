@@ -0,0 +1,98 @@
+import json
+import time
+
+import pytest
+import requests
+from gspread.exceptions import APIError
+
+import sheets
+from sheets import CallMetrics, SheetsGateway, TokenBucket, call_metric_rows
+from storage import Faults, LocalSpreadsheet
+
+def _api_error(status, retry_after=None):
+    response = requests.Response()
+    response.status_code = status
+    if retry_after is not None:
+        response.headers["Retry-After"] = str(retry_after)
+    response._content = json.dumps({"error": {"code": status, "message": "test", "status": "ERROR"}}).encode("utf-8")
+    return APIError(response)
+
+class _Flaky:
+    """Raises each error in `errors` in turn, then returns "ok"."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff delays the gateway asked for, without actually sleeping."""
+    delays = []
+    monkeypatch.setattr(sheets.time, "sleep", delays.append)
+    return delays
+
+def _gateway(max_attempts=5):
+    return SheetsGateway(TokenBucket(60000, 100), CallMetrics(), max_attempts=max_attempts)
+
+def test_quota_errors_from_the_local_backend_are_retried(sleeps):
+    sheet = LocalSpreadsheet(faults=Faults(error_rate=1.0, seed=1))
+    ws = sheet.seed("Responses", [["Email"], ["a@x.org"]])
+    gateway = _gateway(max_attempts=3)
+    with pytest.raises(APIError):
+        gateway.call(ws.get_all_values)
+    assert sheet.faults.calls == 3
+    sheet.faults.error_rate = 0.0
+    assert gateway.call(ws.get_all_values) == [["Email"], ["a@x.org"]]
+    stats = gateway.metrics.snapshot()["LocalWorksheet.get_all_values"]
+    assert (stats["calls"], stats["attempts"], stats["errors"]) == (2, 4, 1)
+
+@pytest.mark.parametrize("error", [
+    _api_error(429), _api_error(500), _api_error(503),
+    requests.exceptions.ConnectionError("reset"), requests.exceptions.Timeout("slow"),
+])
+def test_transient_errors_are_retried(sleeps, error):
+    fn = _Flaky(error, error)
+    assert _gateway().call(fn) == "ok"
+    assert fn.calls == 3
+    assert len(sleeps) == 2
+
+@pytest.mark.parametrize("error", [_api_error(400), _api_error(403), _api_error(404), ValueError("bad range")])
+def test_other_errors_are_raised_at_once(sleeps, error):
+    fn = _Flaky(error)
+    with pytest.raises(type(error)):
+        _gateway().call(fn)
+    assert fn.calls == 1
+    assert sleeps == []
+
+def test_backoff_is_jittered_within_the_cap_and_honours_retry_after(sleeps):
+    fn = _Flaky(*[_api_error(429) for _ in range(3)], _api_error(429, retry_after=7))
+    _gateway().call(fn)
+    for attempt, delay in enumerate(sleeps[:3], start=1):
+        assert 0 <= delay <= sheets.BACKOFF_BASE_SECONDS * 2 ** (attempt - 1)
+    assert sleeps[3] >= 7
+
+def test_token_bucket_allows_a_burst_then_paces():
+    bucket = TokenBucket(rate_per_minute=600, burst=3)   # one token per 0.1 s
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    started = time.monotonic()
+    waited = bucket.acquire()
+    assert waited > 0.05
+    assert time.monotonic() - started >= 0.05
+
+def test_call_metric_rows():
+    metrics = CallMetrics()
+    metrics.record("ws.get", 0.2, attempts=3, ok=True, throttled=0.5)
+    metrics.record("ws.get", 0.4, attempts=1, ok=False)
+    metrics.record("ws.update", 0.1, attempts=1, ok=True)
+    rows = call_metric_rows(metrics.snapshot())
+    assert [r["Call"] for r in rows] == ["ws.get", "ws.update"]
+    assert rows[0] == {
+        "Call": "ws.get", "Calls": 2, "Attempts": 4, "Retries": 2, "Errors": 1,
+        "Avg ms": 300.0, "Max ms": 400.0, "Throttled ms": 500.0,
+    }
@@ -0,0 +1,95 @@
+import time
+
+import jwt
+import pytest
+import requests
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+import identity
+from identity import EXPIRY_SKEW_SECONDS, IdentityCache, resolve_identity
+
+CLIENT_ID = "client.apps.googleusercontent.com"
+PRIVATE_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+class _SigningKey:
+    key = PRIVATE_KEY.public_key()
+
+class _Jwks:
+    def get_signing_key_from_jwt(self, token):
+        return _SigningKey()
+
+def _id_token(**claims):
+    body = {
+        "iss": "https://accounts.google.com", "aud": CLIENT_ID, "exp": int(time.time()) + 600,
+        "email": "Ann@OIS.example", "email_verified": True, "name": "Ann",
+    }
+    body.update(claims)
+    return jwt.encode(body, PRIVATE_KEY, algorithm="RS256")
+
+class _Userinfo(list):
+    """Stand-in for the userinfo endpoint: records each call and answers with `reply`."""
+
+    def __init__(self):
+        super().__init__()
+        self.reply = {"email": " Bob@OIS.example ", "name": "Bob", "hd": ""}
+
+    def __call__(self, access_token):
+        self.append(access_token)
+        if isinstance(self.reply, Exception):
+            raise self.reply
+        return dict(self.reply) if self.reply else None
+
+@pytest.fixture
+def userinfo(monkeypatch):
+    cache = IdentityCache()
+    monkeypatch.setattr(identity, "get_identity_cache", lambda: cache)
+    monkeypatch.setattr(identity, "get_jwks_client", lambda: _Jwks())
+    fetch = _Userinfo()
+    monkeypatch.setattr(identity, "_fetch_userinfo", fetch)
+    return fetch
+
+def test_verified_id_token_skips_userinfo_and_is_cached(userinfo):
+    token = {"access_token": "t1", "id_token": _id_token(), "expires_in": 3600}
+    assert resolve_identity(token, CLIENT_ID)["email"] == "ann@ois.example"
+    assert resolve_identity({"access_token": "t1"}, CLIENT_ID)["email"] == "ann@ois.example"
+    assert userinfo == []
+
+def test_falls_back_to_userinfo_when_id_token_does_not_verify(userinfo):
+    for id_token in (_id_token(aud="someone-else"), _id_token(email_verified=False), "not-a-jwt"):
+        token = {"access_token": id_token[-12:], "id_token": id_token}
+        assert resolve_identity(token, CLIENT_ID)["email"] == "bob@ois.example"
+    assert len(userinfo) == 3
+
+def test_token_without_id_token_calls_userinfo_once(userinfo):
+    token = {"access_token": "t2"}
+    resolve_identity(token, CLIENT_ID)
+    resolve_identity(token, CLIENT_ID)
+    assert userinfo == ["t2"]
+
+def test_failures_are_not_cached(userinfo):
+    userinfo.reply = requests.ConnectionError("offline")
+    assert resolve_identity({"access_token": "t3"}, CLIENT_ID) is None
+    userinfo.reply = None
+    assert resolve_identity({"access_token": "t3"}, CLIENT_ID) is None
+    userinfo.reply = {"email": "c@ois.example"}
+    assert resolve_identity({"access_token": "t3"}, CLIENT_ID)["email"] == "c@ois.example"
+    assert len(userinfo) == 3
+
+def test_expired_token_is_resolved_again(userinfo):
+    token = {"access_token": "t4", "expires_at": time.time() + EXPIRY_SKEW_SECONDS - 1}
+    resolve_identity(token, CLIENT_ID)
+    resolve_identity(token, CLIENT_ID)
+    assert userinfo == ["t4", "t4"]
+
+def test_missing_token():
+    assert resolve_identity(None, CLIENT_ID) is None
+    assert resolve_identity({"id_token": _id_token()}, CLIENT_ID) is None
+
+def test_cache_drops_expired_entries_and_discards():
+    cache = IdentityCache()
+    cache.put("old", {"email": "a"}, time.time() - 1)
+    cache.put("new", {"email": "b"}, time.time() + 60)
+    assert "old" not in cache._entries
+    assert cache.get("new") == {"email": "b"}
+    cache.discard("new")
+    assert cache.get("new") is None
@@ -0,0 +1,140 @@
+import json
+import os
+import stat
+
+import pytest
+import requests
+from gspread.exceptions import APIError
+
+from mirror import MirrorSync, SheetMirror, appended_row_number
+from storage import LocalSpreadsheet
+
+HEADER = ["Timestamp", "Email", "Name", "Appraiser", "Assessment Cycle"]
+
+def _response(status):
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps({"error": {"code": status, "message": "denied"}}).encode("utf-8")
+    return response
+
+def _direct(fn, *args, **kwargs):
+    return fn(*args, **kwargs)
+
+def _counting(calls):
+    def call(fn, *args, **kwargs):
+        calls.append(fn.__name__)
+        return fn(*args, **kwargs)
+    return call
+
+def _responses(n):
+    return [HEADER] + [[f"2025-09-{i + 1:02d}", f"t{i}@x.org", f"T{i}", "jo", "Initial"] for i in range(n)]
+
+def test_tail_sync_reads_only_new_rows():
+    sheet = LocalSpreadsheet()
+    ws = sheet.seed("Responses", _responses(3))
+    calls = []
+    sync = MirrorSync(SheetMirror(":memory:"), {"Responses": ws}, call=_counting(calls), append_only={"Responses"})
+    sync.sync("Responses")
+    ws.append_row(["2025-09-10", "T9@X.org ", "T9", "jo", "Final"])
+    assert sync.sync("Responses") == 1
+    assert calls == ["get_all_values", "get"]
+    assert sync.mirror.values("Responses") == ws.get_all_values()
+    assert [n for n, _ in sync.mirror.rows("Responses", email="t9@x.org", cycle="final")] == [5]
+
+def test_tail_sync_with_nothing_new_writes_nothing():
+    ws = LocalSpreadsheet().seed("Responses", _responses(2))
+    sync = MirrorSync(SheetMirror(":memory:"), {"Responses": ws}, call=_direct, append_only={"Responses"})
+    sync.sync("Responses")
+    assert sync.sync("Responses") == 0
+    assert len(sync.mirror.values("Responses")) == 3
+
+def test_full_sync_picks_up_edits_and_deletions():
+    sheet = LocalSpreadsheet()
+    ws = sheet.seed("Responses", _responses(3))
+    sync = MirrorSync(SheetMirror(":memory:"), {"Responses": ws}, call=_direct)
+    sync.sync("Responses")
+    sheet.seed("Responses", _responses(2))
+    sheet.worksheet("Responses").update([["edited"]], "C2")
+    sync = MirrorSync(sync.mirror, {"Responses": sheet.worksheet("Responses")}, call=_direct)
+    assert sync.sync("Responses") == 2
+    assert sync.mirror.values("Responses") == sheet.worksheet("Responses").get_all_values()
+
+def test_values_reads_the_mirror_until_it_expires():
+    ws = LocalSpreadsheet().seed("Responses", _responses(2))
+    calls = []
+    sync = MirrorSync(SheetMirror(":memory:"), {"Responses": ws}, call=_counting(calls), append_only={"Responses"})
+    sync.values("Responses", max_age=60)
+    sync.values("Responses", max_age=60)
+    assert calls == ["get_all_values"]
+    sync.values("Responses", max_age=0)
+    assert calls == ["get_all_values", "get"]
+
+def test_record_write_on_append_only_sheet_resyncs_on_next_read():
+    ws = LocalSpreadsheet().seed("Responses", _responses(2))
+    sync = MirrorSync(SheetMirror(":memory:"), {"Responses": ws}, call=_direct, append_only={"Responses"})
+    sync.values("Responses", max_age=60)
+    ws.append_row(["2025-09-20", "other@x.org", "O", "jo", "Initial"])   # another process got there first
+    row = ["2025-09-21", "me@x.org", "Me", "jo", "Final"]
+    sync.record_write("Responses", appended_row_number(ws.append_row(row)), row)
+    emails = [r[1] for r in sync.values("Responses", max_age=60)[1:]]
+    assert emails[-2:] == ["other@x.org", "me@x.org"]
+
+def test_record_write_puts_updated_row_without_a_read():
+    ws = LocalSpreadsheet().seed("FinalEvaluation", [["Teacher Email", "Overall Rating"], ["a@x.org", ""]])
+    calls = []
+    sync = MirrorSync(SheetMirror(":memory:"), {"FinalEvaluation": ws}, call=_counting(calls))
+    sync.values("FinalEvaluation", max_age=60)
+    ws.update([["a@x.org", "Effective"]], "A2")
+    sync.record_write("FinalEvaluation", 2, ["a@x.org", "Effective"])
+    assert sync.values("FinalEvaluation", max_age=60)[1] == ["a@x.org", "Effective"]
+    assert calls == ["get_all_values"]
+
+def test_appended_row_number():
+    assert appended_row_number({"updates": {"updatedRange": "Drafts!A12:BH12"}}) == 12
+    assert appended_row_number({}) is None
+
+def test_mirror_files_are_private(tmp_path):
+    path = str(tmp_path / "m.sqlite3")
+    mirror = SheetMirror(path)
+    mirror.load_full("Users", [["Email", "Password"], ["a@x.org", "secret"]])
+    for name in os.listdir(tmp_path):
+        assert stat.S_IMODE(os.stat(tmp_path / name).st_mode) == 0o600, name
+
+def test_tail_sync_when_the_grid_ends_at_the_last_row():
+    ws = LocalSpreadsheet().seed("Responses", _responses(2))
+    assert ws.row_count == 3
+    sync = MirrorSync(SheetMirror(":memory:"), {"Responses": ws}, call=_direct, append_only={"Responses"})
+    sync.sync("Responses")
+    with pytest.raises(APIError, match="exceeds grid limits"):
+        ws.get("A4:E")
+    assert sync.sync("Responses") == 0
+    ws.append_row(["2025-09-10", "t9@x.org", "T9", "jo", "Final"])   # grows the grid by one
+    assert sync.sync("Responses") == 1
+    assert sync.mirror.values("Responses") == ws.get_all_values()
+
+def test_tail_sync_raises_other_errors():
+    ws = LocalSpreadsheet().seed("Responses", _responses(2))
+    sync = MirrorSync(SheetMirror(":memory:"), {"Responses": ws}, call=_direct, append_only={"Responses"})
+    sync.sync("Responses")
+
+    def failing(fn, *args, **kwargs):
+        raise APIError(_response(403))
+
+    sync = MirrorSync(sync.mirror, {"Responses": ws}, call=failing, append_only={"Responses"})
+    with pytest.raises(APIError):
+        sync.sync("Responses")
+
+def test_values_keep_sheet_positions_across_gaps():
+    mirror = SheetMirror(":memory:")
+    mirror.load_full("Drafts", [["Email", "A1"], ["a@x.org", "E"]])
+    mirror.put_row("Drafts", 5, ["e@x.org", "HE"])
+    assert mirror.values("Drafts") == [["Email", "A1"], ["a@x.org", "E"], ["", ""], ["", ""], ["e@x.org", "HE"]]
+
+def test_record_write_past_the_mirrored_end_resyncs():
+    ws = LocalSpreadsheet().seed("FinalEvaluation", [["Teacher Email", "Overall Rating"], ["a@x.org", ""]])
+    sync = MirrorSync(SheetMirror(":memory:"), {"FinalEvaluation": ws}, call=_direct)
+    sync.values("FinalEvaluation", max_age=60)
+    ws.append_row(["other@x.org", "Effective"])   # another process
+    row = ["me@x.org", "Highly Effective"]
+    sync.record_write("FinalEvaluation", appended_row_number(ws.append_row(row)), row)
+    assert sync.values("FinalEvaluation", max_age=60) == ws.get_all_values()
@@ -0,0 +1,37 @@
+import zipfile
+from io import BytesIO
+
+from pypdf import PdfReader, PdfWriter
+
+from pdf_reports import merge_pdfs, write_pdf_packet
+
+def _pdf(pages=1):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+def _letters(n):
+    return ((f"Teacher {i}", _pdf()) for i in range(n))
+
+def test_merge_pdfs_bookmarks_each_part():
+    out = BytesIO()
+    assert merge_pdfs([("Ann", _pdf(2)), ("Ben", _pdf())], out) == 2
+    reader = PdfReader(out)
+    assert len(reader.pages) == 3
+    assert [item.title for item in reader.outline] == ["Ann", "Ben"]
+
+def test_pdf_packet_has_one_file_per_group_split_into_parts():
+    out = BytesIO()
+    seen = []
+    packed = write_pdf_packet(
+        [("Jo Smith", _letters(5)), ("Raj/Iyer", _letters(2)), ("Nobody", _letters(0))],
+        out, max_letters=2, progress=seen.append,
+    )
+    assert packed == 7
+    assert seen == list(range(1, 8))
+    with zipfile.ZipFile(out) as zf:
+        assert zf.namelist() == ["Jo Smith.pdf", "Jo Smith (part 2).pdf", "Jo Smith (part 3).pdf", "Raj_Iyer.pdf"]
+        assert [len(PdfReader(BytesIO(zf.read(n))).pages) for n in zf.namelist()] == [2, 2, 1, 2]
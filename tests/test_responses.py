@@ -0,0 +1,29 @@
+from responses import build_responses_index
+from rubric import STRANDS, response_headers
+
+HEADER = response_headers(False)
+
+def _row(timestamp, email, cycle, rating="Effective", **cells):
+    values = dict.fromkeys(HEADER, "")
+    values.update({"Timestamp": timestamp, "Email": email, "Name": "T", "Appraiser": "jo", "Assessment Cycle": cycle})
+    values.update({s: rating for s in STRANDS})
+    values.update(cells)
+    return [values[h] for h in HEADER]
+
+def test_appended_matches_a_rebuilt_index():
+    rows = [_row("2025-09-01 08:00:00", "a@x.org", "Initial")]
+    new = _row("2026-04-02 08:00:00", "A@x.org", "Final", rating="Highly Effective")
+    patched = build_responses_index([HEADER] + rows).appended(new)
+    rebuilt = build_responses_index([HEADER] + rows + [new])
+    assert patched.has("a@x.org", "Final")
+    assert patched.latest_row("a@x.org", "Final") == rebuilt.latest_row("a@x.org", "Final")
+    assert (patched.latest_codes("a@x.org", "Final") == rebuilt.latest_codes("a@x.org", "Final")).all()
+
+def test_appended_resubmission_becomes_latest():
+    index = build_responses_index([HEADER, _row("2025-09-01 08:00:00", "a@x.org", "Initial")])
+    index = index.appended(_row("2025-09-05 08:00:00", "a@x.org", "Initial", rating="Improvement Necessary"))
+    assert index.latest_row("a@x.org", "Initial")["Timestamp"] == "2025-09-05 08:00:00"
+    assert len(index.rows_for("a@x.org")) == 2
+
+def test_appended_to_a_sheet_without_header_forces_a_reload():
+    assert build_responses_index([]).appended(_row("2025-09-01 08:00:00", "a@x.org", "Initial")) is None
@@ -0,0 +1,130 @@
+import threading
+import time
+
+from sheets import SheetSnapshot
+
+def _expire(snapshot):
+    snapshot._loaded_at -= 3600
+
+def _wait_idle(snapshot, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while snapshot.refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+def test_patch_is_served_without_reload():
+    loads = []
+    snapshot = SheetSnapshot(lambda: loads.append(1) or [1], ttl=60)
+    assert snapshot.get() == [1]
+    with snapshot.write_lock:
+        snapshot.patch(lambda rows: rows + [2])
+    assert snapshot.get() == [1, 2]
+    assert len(loads) == 1
+
+def test_derived_is_rebuilt_after_patch():
+    snapshot = SheetSnapshot(lambda: [1], ttl=60)
+    assert snapshot.derived("n", len) == 1
+    snapshot.patch(lambda rows: rows + [2])
+    assert snapshot.derived("n", len) == 2
+
+def test_patch_returning_none_forces_a_reload():
+    loads = []
+    snapshot = SheetSnapshot(lambda: loads.append(1) or len(loads), ttl=60)
+    snapshot.get()
+    snapshot.patch(lambda value: None)
+    assert snapshot.get() == 2
+
+def test_expired_snapshot_is_served_stale_and_refreshed_once():
+    loads = []
+    release = threading.Event()
+
+    def loader():
+        loads.append(1)
+        if len(loads) > 1:
+            release.wait(2)
+        return len(loads)
+
+    snapshot = SheetSnapshot(loader, ttl=60)
+    assert snapshot.get() == 1
+    _expire(snapshot)
+    assert [snapshot.get() for _ in range(10)] == [1] * 10
+    release.set()
+    _wait_idle(snapshot)
+    assert snapshot.get() == 2
+    assert len(loads) == 2
+
+def test_refresh_that_raced_a_patch_is_dropped():
+    release = threading.Event()
+    loads = []
+
+    def loader():
+        loads.append(1)
+        if len(loads) == 2:
+            release.wait(2)
+        return ["sheet"]
+
+    snapshot = SheetSnapshot(loader, ttl=60)
+    snapshot.get()
+    _expire(snapshot)
+    snapshot.get()   # starts the background reload, which blocks in the loader
+    with snapshot.write_lock:
+        snapshot.patch(lambda rows: rows + ["saved"])
+    release.set()
+    _wait_idle(snapshot)
+    assert snapshot.get() == ["sheet", "saved"]
+
+def test_failed_refresh_keeps_previous_snapshot():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        if len(calls) > 1:
+            raise RuntimeError("quota")
+        return "good"
+
+    snapshot = SheetSnapshot(loader, ttl=60, retry_after=60)
+    snapshot.get()
+    _expire(snapshot)
+    snapshot.get()
+    _wait_idle(snapshot)
+    assert snapshot.get() == "good"
+    assert len(calls) == 2   # no retry inside retry_after
+
+def test_invalidate_forces_a_reload_and_drops_a_racing_refresh():
+    release = threading.Event()
+    loads = []
+
+    def loader():
+        loads.append(1)
+        if len(loads) == 2:
+            release.wait(2)
+            return "before invalidate"
+        return f"load {len(loads)}"
+
+    snapshot = SheetSnapshot(loader, ttl=60)
+    snapshot.get()
+    version = snapshot.version
+    _expire(snapshot)
+    snapshot.get()   # background reload blocks in the loader
+    snapshot.invalidate()
+    assert snapshot.version > version
+    release.set()
+    _wait_idle(snapshot)
+    assert snapshot.get() == "load 3"
+
+def test_slow_derived_build_does_not_replace_a_newer_one():
+    snapshot = SheetSnapshot(lambda: [1], ttl=60)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_len(rows):
+        started.set()
+        release.wait(2)
+        return len(rows)
+
+    worker = threading.Thread(target=snapshot.derived, args=("n", slow_len))
+    worker.start()
+    started.wait(2)
+    snapshot.patch(lambda rows: rows + [2])
+    assert snapshot.derived("n", len) == 2
+    release.set()
+    worker.join()
+    assert snapshot.derived("n", lambda rows: "rebuilt") == 2
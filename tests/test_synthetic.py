@@ -0,0 +1,37 @@
+from benchmarks.synthetic import generate_campus, seed_spreadsheet
+from sheets import build_users_df
+from storage import LocalSpreadsheet
+from users_index import UsersIndex
+
+def _users_index(campus):
+    header, *rows = campus["Users"]
+    return UsersIndex(build_users_df({h: [r[i] for r in rows] for i, h in enumerate(header)}))
+
+def test_same_seed_same_campus():
+    assert generate_campus(teachers=20, seed=3) == generate_campus(teachers=20, seed=3)
+    assert generate_campus(teachers=20, seed=3) != generate_campus(teachers=20, seed=4)
+
+def test_teachers_have_the_role_the_app_scopes_on():
+    campus = generate_campus(teachers=30, appraisers=4, campuses=2)
+    index = _users_index(campus)
+    teachers = index.frame(index.with_role("user"))
+    assert len(teachers) == 30
+    assigned = set()
+    for appraiser in index.frame(index.with_role("admin"))["Name"]:
+        assigned |= set(index.frame(index.appraisees(appraiser.split()[0]))["Email"])
+    assert assigned == set(teachers["Email"])
+
+def test_responses_and_final_evaluations_belong_to_teachers():
+    campus = generate_campus(teachers=30)
+    index = _users_index(campus)
+    teachers = set(index.frame(index.with_role("user"))["Email"])
+    email_col = campus["Responses"][0].index("Email")
+    assert {row[email_col] for row in campus["Responses"][1:]} <= teachers
+    assert {row[2] for row in campus["FinalEvaluation"][1:]} <= teachers
+
+def test_seed_spreadsheet_writes_every_sheet():
+    campus = generate_campus(teachers=10)
+    sheet = seed_spreadsheet(LocalSpreadsheet(), campus)
+    for title, values in campus.items():
+        assert sheet.worksheet(title).get_all_values() == values
+    assert sheet.worksheet("Drafts").get_all_values() == [["Email"]]
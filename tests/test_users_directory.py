@@ -0,0 +1,62 @@
+import pytest
+
+import sheets
+from mirror import SheetMirror
+from sheets import CallMetrics, SheetsGateway, TokenBucket, UsersDirectory
+from storage import LocalSpreadsheet
+
+USERS = [
+    ["Email", "Name", "Appraiser", "Role", "Password", "Campus"],
+    ["Ann@X.org ", "Ann Lee", "jo", "user", "pw", "North"],
+    ["jo@x.org", "Jo Smith", "", "admin", "pw", "North"],
+]
+
+@pytest.fixture(autouse=True)
+def unthrottled(monkeypatch):
+    """The process-wide gateway paces calls to the real Sheets quota; these tests make many in a row."""
+    monkeypatch.setattr(sheets, "_gateway", SheetsGateway(TokenBucket(60000, 100), CallMetrics()))
+
+def _directory(values, ttl=0, mirror=None):
+    sheet = LocalSpreadsheet()
+    ws = sheet.seed("Users", values)
+    return UsersDirectory(lambda: ws, ttl=ttl, mirror=mirror), sheet
+
+def test_unchanged_sheet_keeps_frame_and_version():
+    directory, _ = _directory(USERS)
+    df, version = directory.df(), directory.version
+    index = directory.index()
+    assert directory.df() is df          # ttl=0: re-read, digest matched
+    assert directory.version == version
+    assert directory.index() is index
+
+def test_changed_sheet_bumps_version():
+    directory, sheet = _directory(USERS)
+    version = directory.version
+    sheet.worksheet("Users").update([["Ann Lee-Park"]], "B2")
+    assert directory.lookup("ann@x.org")["Name"] == "Ann Lee-Park"
+    assert directory.version == version + 1
+
+def test_moved_header_is_remapped():
+    directory, sheet = _directory(USERS)
+    assert directory.lookup("jo@x.org")["Role"] == "admin"
+    # Someone inserts a column before Role and reorders the rest
+    moved = [[r[0], r[1], "", r[3], r[2], r[5], r[4]] for r in USERS]
+    moved[0][2] = "Notes"
+    sheet.seed("Users", moved)
+    assert directory.lookup("jo@x.org")["Role"] == "admin"
+    assert directory.lookup("ann@x.org")["Appraiser"] == "jo"
+
+def test_unknown_email_forces_a_reload_once_the_miss_window_passes(monkeypatch):
+    directory, sheet = _directory(USERS, ttl=300)
+    assert directory.lookup("new@x.org") is None
+    sheet.worksheet("Users").append_row(["new@x.org", "New Hire", "jo", "user", "pw", "North"])
+    assert directory.lookup("new@x.org") is None   # inside USERS_MISS_REFRESH_SECONDS
+    directory._loaded_at -= 60
+    assert directory.lookup("new@x.org")["Name"] == "New Hire"
+
+def test_restart_seeds_from_the_mirror():
+    mirror = SheetMirror(":memory:")
+    first, _ = _directory(USERS, ttl=300, mirror=mirror)
+    first.df()
+    restarted = UsersDirectory(lambda: (_ for _ in ()).throw(AssertionError("read the sheet")), ttl=300, mirror=mirror)
+    assert restarted.lookup("ann@x.org")["Name"] == "Ann Lee"
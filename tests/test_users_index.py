@@ -0,0 +1,29 @@
+import pandas as pd
+
+from users_index import UsersIndex
+
+def _users(*rows):
+    return pd.DataFrame(rows, columns=["Email", "Name", "Appraiser", "Role", "Password", "Campus"])
+
+def test_blank_and_duplicate_emails_keep_every_row():
+    index = UsersIndex(_users(
+        ["a@x.org", "Ann Lee", "jo", "user", "", "North"],
+        ["", "Ben Roe", "jo", "user", "", "North"],
+        ["", "Cal Poe", "jo", "user", "", "North"],
+        ["a@x.org", "Ann Lee (dup)", "jo", "user", "", "South"],
+    ))
+    assert index.frame(index.appraisees("Jo"))["Name"].tolist() == ["Ann Lee", "Ben Roe", "Cal Poe", "Ann Lee (dup)"]
+    north = index.with_role("user") & index.campus_members("North")
+    assert index.frame(north)["Name"].tolist() == ["Ann Lee", "Ben Roe", "Cal Poe"]
+
+def test_co_appraised_teacher_appears_for_both():
+    index = UsersIndex(_users(
+        ["a@x.org", "Ann Lee", "jo, raj", "user", "", "North"],
+        ["jo@x.org", "Jo Smith", "", "admin", "", "North"],
+    ))
+    assert index.frame(index.appraisees("raj"))["Email"].tolist() == ["a@x.org"]
+    assert index.full_appraiser_name("jo, raj") == "Jo Smith, Raj"
+
+def test_empty_users_sheet():
+    index = UsersIndex(_users())
+    assert index.frame(index.with_role("user")).empty
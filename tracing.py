@@ -0,0 +1,191 @@
+# tracing.py
+# Lightweight timing spans and cache hit/miss counters.
+#
+# Everything is added to process-wide totals. The script thread's current rerun also gets
+# its own totals and the ordered page sections, so the admin panel can show what this
+# rerun spent its time on. Spans from other threads (draft autosave) reach only the process totals.
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+def _timing_entry():
+    return {"calls": 0, "total_s": 0.0, "max_s": 0.0}
+
+def _add_timing(stats, name, seconds):
+    entry = stats.get(name)
+    if entry is None:
+        entry = stats[name] = _timing_entry()
+    entry["calls"] += 1
+    entry["total_s"] += seconds
+    entry["max_s"] = max(entry["max_s"], seconds)
+
+def _add_cache(stats, name, hit):
+    entry = stats.get(name)
+    if entry is None:
+        entry = stats[name] = {"hits": 0, "misses": 0}
+    entry["hits" if hit else "misses"] += 1
+
+class RerunTrace:
+    """Spans, cache lookups and page sections recorded by one script run (or fragment rerun)."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished = None
+        self.spans = {}
+        self.caches = {}
+        self.sections = []   # [name, seconds], in the order they ran
+        self._section = None
+
+    def enter_section(self, name):
+        self.close_section()
+        self._section = (name, time.perf_counter())
+
+    def close_section(self):
+        if self._section is not None:
+            name, started = self._section
+            self.sections.append([name, time.perf_counter() - started])
+            self._section = None
+
+    def finish(self):
+        """End of the script: close the open section and stop the clock."""
+        if self.finished is None:
+            self.close_section()
+            self.finished = time.perf_counter()
+
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+class Tracer:
+    """Process totals plus the per-thread current RerunTrace."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._spans = {}
+        self._caches = {}
+        self.reruns = 0
+
+    def begin_rerun(self):
+        """Start a fresh RerunTrace for the calling thread and return it."""
+        trace = RerunTrace()
+        self._local.trace = trace
+        with self._lock:
+            self.reruns += 1
+        return trace
+
+    def begin_fragment(self, name):
+        """
+        Called on entry to a fragment body. Inside a full run it just opens section `name`;
+        a fragment rerun (the thread's last trace already finished, or none) gets a fresh
+        RerunTrace so its work isn't added to the previous run's.
+        """
+        trace = self.current()
+        if trace is None or trace.finished is not None:
+            trace = self.begin_rerun()
+        trace.enter_section(name)
+        return trace
+
+    def current(self):
+        return getattr(self._local, "trace", None)
+
+    def record(self, name, seconds):
+        with self._lock:
+            _add_timing(self._spans, name, seconds)
+        trace = self.current()
+        if trace is not None:
+            _add_timing(trace.spans, name, seconds)
+
+    def cache(self, name, hit):
+        with self._lock:
+            _add_cache(self._caches, name, hit)
+        trace = self.current()
+        if trace is not None:
+            _add_cache(trace.caches, name, hit)
+
+    @contextmanager
+    def span(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def section(self, name):
+        """Mark the start of a page section; it runs until the next section or the end of the rerun."""
+        trace = self.current()
+        if trace is not None:
+            trace.enter_section(name)
+
+    def snapshot(self):
+        """Copy of the process totals: {"spans": {...}, "caches": {...}, "reruns": n}."""
+        with self._lock:
+            return {
+                "spans": {k: dict(v) for k, v in self._spans.items()},
+                "caches": {k: dict(v) for k, v in self._caches.items()},
+                "reruns": self.reruns,
+            }
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._caches.clear()
+            self.reruns = 0
+
+_tracer = Tracer()
+
+def get_tracer():
+    return _tracer
+
+def span(name):
+    return _tracer.span(name)
+
+def cache_lookup(name, hit):
+    _tracer.cache(name, hit)
+
+def section(name):
+    _tracer.section(name)
+
+def begin_fragment(name):
+    return _tracer.begin_fragment(name)
+
+def traced(name):
+    """Decorator: run every call of the function inside span(name)."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with _tracer.span(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+# =========================
+# Tables for display
+# =========================
+def timing_rows(spans, wall_s=None):
+    """Span totals as display rows, slowest first; `wall_s` adds a share-of-rerun column."""
+    rows = []
+    for name, entry in sorted(spans.items(), key=lambda kv: -kv[1]["total_s"]):
+        row = {
+            "Span": name,
+            "Calls": entry["calls"],
+            "Total ms": round(entry["total_s"] * 1000, 1),
+            "Max ms": round(entry["max_s"] * 1000, 1),
+        }
+        if wall_s:
+            row["% of rerun"] = round(100 * entry["total_s"] / wall_s, 1)
+        rows.append(row)
+    return rows
+
+def cache_rows(caches):
+    rows = []
+    for name, entry in sorted(caches.items()):
+        lookups = entry["hits"] + entry["misses"]
+        rows.append({
+            "Cache": name,
+            "Hits": entry["hits"],
+            "Misses": entry["misses"],
+            "Hit rate": f"{100 * entry['hits'] / lookups:.0f}%" if lookups else "–",
+        })
+    return rows
@@ -0,0 +1,65 @@
+# users_index.py
+# Dict-based relationships over the Users frame, rebuilt only when the Users sheet changes.
+
+def _split_appraisers(cell):
+    return [a.strip().lower() for a in str(cell or "").split(",") if a.strip()]
+
+def _first_name(name):
+    parts = str(name or "").strip().lower().split()
+    return parts[0] if parts else ""
+
+class UsersIndex:
+    """
+    appraiser first name -> Users rows, campus -> rows, role -> rows, first name -> full names.
+    Scoping and name resolution become set/dict lookups instead of per-rerun column scans.
+    Rows are kept by position, not email, so blank or repeated emails never merge two
+    Users rows: every row a column mask would match is returned by `frame()`.
+    """
+
+    def __init__(self, users_df):
+        self.df = users_df
+        self._by_appraiser = {}         # appraiser first name -> set of row positions
+        self._by_campus = {}            # campus -> set of row positions
+        self._by_role = {}              # role -> set of row positions
+        self._full_names = {}           # first name -> [full names] in sheet order
+        if users_df.empty:
+            return
+        records = users_df[["Email", "Name", "Appraiser", "Role", "Campus"]].to_dict("records")
+        for pos, rec in enumerate(records):
+            for appraiser in _split_appraisers(rec["Appraiser"]):
+                self._by_appraiser.setdefault(appraiser, set()).add(pos)
+            self._by_campus.setdefault(str(rec["Campus"]).strip(), set()).add(pos)
+            self._by_role.setdefault(rec["Role"], set()).add(pos)
+            first = _first_name(rec["Name"])
+            if first:
+                self._full_names.setdefault(first, []).append(str(rec["Name"]))
+
+    def appraisees(self, appraiser_first_name):
+        return self._by_appraiser.get(str(appraiser_first_name or "").strip().lower(), set())
+
+    def campus_members(self, campus):
+        return self._by_campus.get(str(campus or "").strip(), set())
+
+    def with_role(self, role):
+        return self._by_role.get(role, set())
+
+    def frame(self, positions):
+        """Users rows for a set of row positions (from the lookups above), in sheet order."""
+        return self.df.iloc[sorted(positions)]
+
+    def full_names(self, first_name):
+        return self._full_names.get(str(first_name or "").strip().lower(), [])
+
+    def full_appraiser_name(self, appraiser_value):
+        """'jane, raj' -> 'Jane Doe, Raj Kumar' using the Users sheet; unknown names are title-cased."""
+        raw = str(appraiser_value or "").strip()
+        if not raw:
+            return "Not Assigned"
+        parts = _split_appraisers(raw)
+        if not parts:
+            return raw
+        matched_names = []
+        for part in parts:
+            names = self.full_names(part)
+            matched_names.extend(names if names else [part.title()])
+        return ", ".join(dict.fromkeys(matched_names))